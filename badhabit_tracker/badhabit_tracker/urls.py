@@ -19,6 +19,8 @@ from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path("api/async/", include("habits.async_urls")),
+    path("api/warehouse/", include("warehouse.urls")),
     path("api/", include("habits.urls")),
     path('', include('frontend.urls')),
 ]
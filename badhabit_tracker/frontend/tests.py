@@ -1,3 +1,116 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import get_resolver, reverse
+from habits import badges
+from habits.models import Habit, JournalEntry, Reminder
+from habits.seeding import seed_user
+from habits.tests import LARGE, SMALL, Fixture, QueryBudgetMixin, Route, route_names
 
-# Create your tests here.
+ROUTES = [
+    Route("dashboard", 7),
+    Route("habits", 2),
+    Route("habits", 5, "post", data=lambda f: {"name": "budgeted", "category": "health", "target_frequency": "3"}),
+    Route("reminders", 4),
+    Route("reminders", 5, "post", data=lambda f: {"habit": f.habit.id, "reminder_time": "21:30", "message": "breathe"}),
+    Route("delete_reminder", 6, "post", kwargs=lambda f: {"pk": f.reminder.id}),
+    Route("reports", 4),
+    Route("achievements", 3),
+    Route("journal", 4),
+    Route("journal", 5, "post", data=lambda f: {"entry": "budgeted", "mood": "calm", "habit": f.habit.id}),
+]
+
+
+class PageQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = seed_user("small", *SMALL)
+        cls.large = seed_user("large", *LARGE)
+
+    def call(self, user, route):
+        client = Client()
+        client.force_login(user)
+        f = Fixture(user)
+        url = reverse(route.name, kwargs=route.kwargs(f) if route.kwargs else None)
+        return self.measure(client, route.method, url, route.data(f) if route.data else None)
+
+    def test_every_route_has_a_budget(self):
+        self.assertEqual(route_names(get_resolver("frontend.urls").url_patterns) - {r.name for r in ROUTES}, set())
+
+    def test_query_count_does_not_grow_with_data(self):
+        for route in ROUTES:
+            key = f"frontend:{route.name}" + (f":{route.method}" if route.method != "get" else "")
+            with self.subTest(key):
+                if route.broken:
+                    self.skipTest(route.broken)
+                self.assert_budget(key, route.budget, self.call(self.small, route), self.call(self.large, route))
+
+
+class CachedPageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("pages", 3, 30)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_repeat_renders_reuse_the_fragment(self):
+        for name in ("dashboard", "reports"):
+            with self.subTest(name):
+                first = self.client.get(reverse(name))
+                # session and user only: the data version is cached and the fragment skips every data query
+                with self.assertNumQueries(2):
+                    second = self.client.get(reverse(name))
+                self.assertEqual(first.content, second.content)
+
+    def test_writes_show_up(self):
+        self.client.get(reverse("reports"))
+        habit = Habit.objects.filter(user=self.user).first()
+        habit.name = "renamed habit"
+        habit.save()
+        self.assertContains(self.client.get(reverse("reports")), "renamed habit")
+
+
+class PageFormTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("forms", 1, 3)
+        cls.habit = Habit.objects.get(user=cls.user)
+        cls.foreign = Habit.objects.get(user=seed_user("forms-other", 1, 3))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_habit_form(self):
+        self.assertContains(self.client.get(reverse("habits")), 'name="target_frequency"')
+        self.client.post(reverse("habits"), {"name": "nail biting", "category": "health", "target_frequency": "2"})
+        self.assertEqual(Habit.objects.get(user=self.user, name="nail biting").category, "health")
+        self.client.post(reverse("habits"), {"name": "no category"})
+        self.assertEqual(Habit.objects.get(user=self.user, name="no category").category, "other")
+
+    def test_reminders_page(self):
+        self.client.post(reverse("reminders"), {"habit": self.habit.id, "reminder_time": "21:30", "message": "breathe"})
+        reminder = Reminder.objects.get(habit=self.habit, message="breathe")
+        page = self.client.get(reverse("reminders"))
+        self.assertContains(page, "breathe")
+        self.assertContains(page, reverse("delete_reminder", kwargs={"pk": reminder.id}))
+        foreign_habit = self.client.post(reverse("reminders"), {"habit": self.foreign.id, "reminder_time": "08:00"})
+        self.assertEqual(foreign_habit.status_code, 404)
+
+        foreign = Reminder.objects.get(habit=self.foreign)
+        self.assertEqual(self.client.post(reverse("delete_reminder", kwargs={"pk": foreign.id})).status_code, 404)
+        self.assertEqual(self.client.get(reverse("delete_reminder", kwargs={"pk": reminder.id})).status_code, 405)
+        self.client.post(reverse("delete_reminder", kwargs={"pk": reminder.id}))
+        self.assertFalse(Reminder.objects.filter(id=reminder.id).exists())
+
+    def test_journal_page(self):
+        self.client.post(reverse("journal"), {"entry": "craved one after lunch", "mood": "tense",
+                                              "habit": self.habit.id})
+        self.assertTrue(JournalEntry.objects.filter(user=self.user, habit=self.habit, mood="tense").exists())
+        self.assertContains(self.client.get(reverse("journal")), "craved one after lunch")
+        self.assertContains(self.client.post(reverse("journal"), {"entry": ""}, follow=True), "cannot be empty")
@@ -6,6 +6,7 @@ urlpatterns = [
     path('dashboard', views.dashboard_view, name='dashboard'),
     path('habits/', views.habit_view, name='habits'),
     path('reminders/', views.reminders_view, name='reminders'),
+    path('reminders/<int:pk>/delete/', views.delete_reminder_view, name='delete_reminder'),
     path('reports/', views.reports_view, name='reports'),
     path('achievements/', views.achievements_view, name='achievements'),
     path('journal/', views.journal_view, name='journal'),
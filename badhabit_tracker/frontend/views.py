@@ -2,11 +2,35 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.contrib import messages
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 from habits.models import Habit, HabitLog, ReplacementPlan, Reminder, Achievement, JournalEntry
+from habits import caching, reports
+from habits.utils import today_utc_date
 from datetime import date
 from django.utils import timezone
 
+RECENT_LOGS = 10
+UPCOMING_REMINDERS = 10
+RECENT_ENTRIES = 50
+
+
+def _fragment_context(user):
+    # {% cache %} vary-on values: rendered fragments are reused until the user's data or the UTC day changes
+    return {
+        'cache_timeout': settings.REPORT_CACHE_TIMEOUT,
+        'data_version': caching.user_version(user.id),
+        'today': today_utc_date().isoformat(),
+    }
+
+
+def _habit_summaries(user):
+    # evaluated only when a fragment misses; the same aggregation and cache entry as /api/reports/summary/
+    return SimpleLazyObject(
+        lambda: caching.cached("reports-summary", user.id, lambda: reports.habits_summary(user))["habits"])
+
 
 def register_view(request):
     if request.method == 'POST':
@@ -44,14 +68,14 @@ def logout_view(request):
 
 @login_required
 def dashboard_view(request):
-    habits = Habit.objects.filter(user=request.user, is_deleted=False)
-    logs = HabitLog.objects.filter(habit__user=request.user).order_by('-log_date')[:10]
-    achievements = Achievement.objects.filter(user=request.user)
-    reminders = Reminder.objects.filter(user=request.user)
+    user = request.user
     return render(request, 'dashboard.html', {
-        'habits': habits,
-        'logs': logs,
-        'achievements': achievements
+        'habits': _habit_summaries(user),
+        'logs': HabitLog.objects.filter(user=user).select_related('habit').order_by('-log_date', '-id')[:RECENT_LOGS],
+        'reminders': Reminder.objects.filter(habit__user=user).select_related('habit')
+                                     .order_by('reminder_time', 'id')[:UPCOMING_REMINDERS],
+        'achievements': Achievement.objects.filter(user=user),
+        **_fragment_context(user),
     })
 
 
@@ -59,9 +83,9 @@ def dashboard_view(request):
 def habit_view(request):
     if request.method == 'POST':
         name = request.POST.get('name')
-        category = request.POST.get('category')
+        category = request.POST.get('category') or 'other'
         description = request.POST.get('description', '')
-        target_frequency = request.POST.get('target_frequency', 0)
+        target_frequency = request.POST.get('target_frequency') or 0
         if name:
             Habit.objects.create(
                 user=request.user,
@@ -72,30 +96,12 @@ def habit_view(request):
             )
             messages.success(request, f'Habit "{name}" added successfully!')
             return redirect('dashboard')
-    return render(request, 'add_habit.html')
+    return render(request, 'add_habits.html', {'categories': Habit.CATEGORY_CHOICES})
 
 
 @login_required
 def reports_view(request):
-    habits = Habit.objects.filter(user=request.user,  is_deleted=False)
-    reports: list = [] 
-    data = []
-    for habit in habits:
-       logs = HabitLog.objects.filter(habit=habit)
-       daily_count = logs.filter(date=timezone.now().date()).count()
-       weekly_count = logs.filter(date__gte=timezone.now().date() - timezone.timedelta(days=7)).count()
-       monthly_count = logs.filter(date__month=timezone.now().month).count()
-       streak = logs.count()  # Replace with actual streak logic later
-
-    reports.append({
-            'habit': habit,
-            'daily_count': daily_count,
-            'weekly_count': weekly_count,
-            'monthly_count': monthly_count,
-            'streak': streak,
-        })
-
-    context = {'reports': reports}
+    context = {'reports': _habit_summaries(request.user), **_fragment_context(request.user)}
     return render(request, 'reports.html', context)
 
 
@@ -108,35 +114,47 @@ def achievements_view(request):
 
 @login_required
 def journal_view(request):
-    entries = JournalEntry.objects.filter(user=request.user).order_by('-created_at')
+    entries = JournalEntry.objects.filter(user=request.user).select_related('habit').order_by('-created_at', '-id')
 
     if request.method == 'POST':
-        content = request.POST.get('content')
+        content = request.POST.get('entry')
         mood = request.POST.get('mood', 'Neutral')
+        habit_id = request.POST.get('habit')
+        habit = get_object_or_404(Habit, id=habit_id, user=request.user) if habit_id else None
 
         if content:
-            JournalEntry.objects.create(user=request.user, content=content, mood=mood)
+            JournalEntry.objects.create(user=request.user, habit=habit, entry=content, mood=mood)
             messages.success(request, "Journal entry added.")
             return redirect('journal')
         else:
             messages.error(request, "Journal entry cannot be empty.")
 
-    context = {'entries': entries}
+    context = {'entries': entries[:RECENT_ENTRIES], 'habits': Habit.objects.filter(user=request.user)}
     return render(request, 'journal.html', context)
 
 @login_required
 def reminders_view(request):
-    reminders = Reminder.objects.filter(user=request.user)
+    reminders = (Reminder.objects.filter(habit__user=request.user).select_related('habit')
+                 .order_by('reminder_time', 'id'))
     if request.method == 'POST':
         habit_id = request.POST.get('habit')
-        time = request.POST.get('time')
+        time = request.POST.get('reminder_time')
         message = request.POST.get('message')
 
         if habit_id and time:
-            habit = Habit.objects.get(id=habit_id, user=request.user)
-            Reminder.objects.create(user=request.user, habit=habit, time=time, message=message)
+            habit = get_object_or_404(Habit, id=habit_id, user=request.user)
+            Reminder.objects.create(habit=habit, reminder_time=time, **({'message': message} if message else {}))
             messages.success(request, "Reminder set successfully!")
             return redirect('reminders')
 
     habits = Habit.objects.filter(user=request.user)
-    return render(request, 'frontend/reminders.html', {'reminders': reminders, 'habits': habits})
+    return render(request, 'reminders.html', {'reminders': reminders, 'habits': habits})
+
+
+@login_required
+@require_POST
+def delete_reminder_view(request, pk):
+    reminder = get_object_or_404(Reminder, id=pk, habit__user=request.user)
+    reminder.delete()
+    messages.success(request, "Reminder deleted.")
+    return redirect('reminders')
@@ -1,66 +1,153 @@
+from datetime import date, time, timedelta
 from django.contrib import admin
-from django.contrib import admin
+from django.db.models import Max, Min, QuerySet
 from .models import (
     Habit,
     HabitLog,
     ReplacementPlan,
     Achievement,
     ActivityShare,
-    Reminder, 
-    JournalEntry, 
-    Badge, 
+    Reminder,
+    JournalEntry,
+    Badge,
     UserBadge
 )
+from .pagination import ApproximateCountPaginator
+from .utils import start_of_month, end_of_month
+
+
+class CalendarDatesQuerySet(QuerySet):
+    """dates() from the field's min and max (two index lookups) instead of a DISTINCT scan of every row.
+
+    Used for date_hierarchy: every year, month or day between the bounds is offered, with or without rows.
+    """
+
+    def dates(self, field_name, kind, order="ASC"):
+        bounds = self.aggregate(first=Min(field_name), last=Max(field_name))
+        first, last = bounds["first"], bounds["last"]
+        if first is None:
+            return []
+        if kind == "year":
+            periods = [date(year, 1, 1) for year in range(first.year, last.year + 1)]
+        elif kind == "month":
+            periods, month = [], start_of_month(first)
+            while month <= last:
+                periods.append(month)
+                month = end_of_month(month) + timedelta(days=1)
+        elif kind == "day":
+            periods = [first + timedelta(days=n) for n in range((last - first).days + 1)]
+        else:
+            return super().dates(field_name, kind, order)
+        return periods if order == "ASC" else periods[::-1]
+
+
+class ReminderHourFilter(admin.SimpleListFilter):
+    """Filter reminders by the hour they fire; the choices are fixed, so no DISTINCT scan of reminder_time."""
+    title = "reminder hour"
+    parameter_name = "reminder_hour"
+
+    def lookups(self, request, model_admin):
+        return [(str(hour), f"{hour:02d}:00") for hour in range(24)]
+
+    def queryset(self, request, queryset):
+        if self.value() not in {str(hour) for hour in range(24)}:
+            return queryset
+        hour = int(self.value())
+        queryset = queryset.filter(reminder_time__gte=time(hour))
+        return queryset.filter(reminder_time__lt=time(hour + 1)) if hour < 23 else queryset
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelists that stay fast on tables with millions of rows.
+
+    Counts are capped or estimated (and the unfiltered total is not counted again), FK columns are
+    joined in the page query, FK inputs are autocomplete widgets, and date_hierarchy is bounded.
+    """
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.date_hierarchy:
+            queryset = CalendarDatesQuerySet(model=queryset.model, query=queryset.query.chain(),
+                                             using=queryset._db, hints=queryset._hints)
+        return queryset
+
 
 @admin.register(Habit)
-class HabitAdmin(admin.ModelAdmin):
+class HabitAdmin(LargeTableAdmin):
     list_display = ("id", "user", "name", "category", "target_frequency", "created_at")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
     search_fields = ("name", "category", "user__username")
     list_filter = ("category", "created_at")
     ordering = ("-created_at",)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and "user" in form.changed_data:
+            # HabitLog.user is a copy of the habit's owner
+            obj.logs.update(user=obj.user)
+
 
 @admin.register(HabitLog)
-class HabitLogAdmin(admin.ModelAdmin):
+class HabitLogAdmin(LargeTableAdmin):
     list_display = ("id", "habit", "log_date", "occurrences", "created_at")
+    list_select_related = ("habit__user",)
+    autocomplete_fields = ("habit",)
     search_fields = ("habit__name",)
     list_filter = ("log_date",)
-    ordering = ("-log_date",)
+    date_hierarchy = "log_date"
+    # matches habitlog_admin_idx
+    ordering = ("-log_date", "-id")
 
 
 @admin.register(ReplacementPlan)
-class ReplacementPlanAdmin(admin.ModelAdmin):
+class ReplacementPlanAdmin(LargeTableAdmin):
     list_display = ("id", "habit", "activity", "created_at")
+    list_select_related = ("habit__user",)
+    autocomplete_fields = ("habit",)
     search_fields = ("activity", "habit__name")
     ordering = ("-created_at",)
 
 @admin.register(Achievement)
-class AchievementAdmin(admin.ModelAdmin):
+class AchievementAdmin(LargeTableAdmin):
     list_display = ("id", "user", "name", "earned_at")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
     search_fields = ("user__username", "name")
     ordering = ("-earned_at",)
 
 
 @admin.register(ActivityShare)
-class ActivityShareAdmin(admin.ModelAdmin):
+class ActivityShareAdmin(LargeTableAdmin):
     list_display = ("id", "user", "achievement", "shared_to", "shared_at")
+    list_select_related = ("user", "achievement__user")
+    autocomplete_fields = ("user", "achievement")
     search_fields = ("user__username", "achievement__name", "shared_to")
     ordering = ("-shared_at",)
 
 @admin.register(Reminder)
-class ReminderAdmin(admin.ModelAdmin):
+class ReminderAdmin(LargeTableAdmin):
     list_display = ('habit', 'reminder_time', 'message', 'created_at')
-    list_filter = ('reminder_time',)
+    list_select_related = ('habit__user',)
+    autocomplete_fields = ('habit',)
+    list_filter = (ReminderHourFilter,)
 
 @admin.register(JournalEntry)
-class JournalEntryAdmin(admin.ModelAdmin):
+class JournalEntryAdmin(LargeTableAdmin):
     list_display = ('id','user', 'habit', 'mood', 'created_at')
-    search_fields = ('title', 'entry', 'user__username')
+    list_select_related = ('user', 'habit__user')
+    autocomplete_fields = ('user', 'habit')
+    search_fields = ('entry', 'user__username')
 
 @admin.register(Badge)
 class BadgeAdmin(admin.ModelAdmin):
     list_display = ('name', 'description')
+    search_fields = ('name',)
 
 @admin.register(UserBadge)
-class UserBadgeAdmin(admin.ModelAdmin):
-    list_display = ('user', 'badge', 'awarded_at')
\ No newline at end of file
+class UserBadgeAdmin(LargeTableAdmin):
+    list_display = ('user', 'badge', 'awarded_at')
+    list_select_related = ('user', 'badge')
+    autocomplete_fields = ('user', 'badge')
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from django.db.models import FilteredRelation, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from .models import HabitDailyStat, HabitLog, HabitPeriodStat
+from .utils import start_of_week, start_of_month, start_of_prev_month
+
+WINDOW_FIELDS = ("today_count", "week_count", "prev_week_count", "month_count", "prev_month_count", "total_occurrences")
+
+
+def _period_sum(period, period_start=None):
+    match = Q(window_stats__period=period)
+    if period_start is not None:
+        match &= Q(window_stats__period_start=period_start)
+    return Coalesce(Sum("window_stats__occurrences", filter=match), 0)
+
+
+def with_window_counts(habits, today):
+    """Annotate a Habit queryset with windowed occurrence counts, computed in the same statement.
+
+    Everything but ``today_count`` is a conditional sum over the rollups joined once; the join only takes
+    the year rows and the week/month rows from the previous week or month on, so it doesn't grow with a
+    habit's history. ``today_count`` is a correlated lookup so it doesn't multiply the join.
+    """
+    week_start = start_of_week(today)
+    since = min(week_start - timedelta(days=7), start_of_prev_month(today))
+    todays = HabitDailyStat.objects.filter(habit=OuterRef("pk"), day=today).values("occurrences")[:1]
+    return habits.annotate(
+        window_stats=FilteredRelation("period_stats", condition=Q(period_stats__period=HabitPeriodStat.YEAR)
+                                      | Q(period_stats__period_start__gte=since)),
+        today_count=Coalesce(Subquery(todays, output_field=IntegerField()), 0),
+        week_count=_period_sum(HabitPeriodStat.WEEK, week_start),
+        prev_week_count=_period_sum(HabitPeriodStat.WEEK, week_start - timedelta(days=7)),
+        month_count=_period_sum(HabitPeriodStat.MONTH, start_of_month(today)),
+        prev_month_count=_period_sum(HabitPeriodStat.MONTH, start_of_prev_month(today)),
+        total_occurrences=_period_sum(HabitPeriodStat.YEAR),
+    )
+
+
+def with_last_log_date(habits):
+    latest = HabitLog.objects.filter(habit=OuterRef("pk")).order_by("-log_date").values("log_date")[:1]
+    return habits.annotate(last_log_date=Subquery(latest))
+
+
+def iter_window_counts(habits, today, *fields, chunk_size=500):
+    """Stream ``fields`` + WINDOW_FIELDS tuples for ``habits`` without building model instances."""
+    rows = with_window_counts(habits, today).values_list(*fields, *WINDOW_FIELDS)
+    return rows.iterator(chunk_size=chunk_size)
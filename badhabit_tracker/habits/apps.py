@@ -4,5 +4,6 @@ from django.apps import AppConfig
 class HabitsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'habits'
-def ready(self):
-    import habits.signals
\ No newline at end of file
+
+    def ready(self):
+        import habits.signals
@@ -0,0 +1,15 @@
+from django.urls import path
+from . import async_views
+
+# mounted at /api/async/; same paths and payloads as the sync endpoints in habits.urls
+urlpatterns = [
+    path("reports/summary/", async_views.reports_summary, name="async-reports-summary"),
+    path("reports/habits/summary/", async_views.user_habits_summary, name="async-user-habits-summary"),
+    path("dashboard/", async_views.dashboard, name="async-dashboard"),
+    path("habits/<int:pk>/report/", async_views.habit_report, name="async-habit-report"),
+    path("habits/<int:habit_id>/analytics/", async_views.habit_analytics, name="async-habit-analytics"),
+    path("leaderboards/top-users/", async_views.leaderboard_top_users, name="async-leaderboard-top-users"),
+    path("leaderboards/top-streaks/", async_views.leaderboard_top_streaks, name="async-leaderboard-top-streaks"),
+    path("leaderboards/<str:board>/", async_views.leaderboard, name="async-leaderboard"),
+    path("leaderboards/<str:board>/me/", async_views.leaderboard_rank, name="async-leaderboard-rank"),
+]
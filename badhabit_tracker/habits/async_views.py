@@ -0,0 +1,177 @@
+import asyncio
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import AuthenticationFailed, NotFound, ValidationError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .models import Habit, HabitLog, Achievement, UserBadge, LeaderboardEntry
+from .serializers import HabitLogSerializer, AchievementSerializer, UserBadgeSerializer
+from . import caching, conditional, leaderboards, reports, routing
+
+# Async twins of the report, analytics, summary and leaderboard endpoints, served under /api/async/.
+# Under an ASGI server (see README) a request waiting on the database holds no worker thread, and the
+# independent parts of a response are fetched concurrently.
+
+User = get_user_model()
+RECENT_LOGS = 10
+_jwt = JWTAuthentication()
+
+
+async def in_thread(fn, *args):
+    """Run blocking ORM code on a pool thread with its own database connection.
+
+    The async ORM runs a request's queries one after another on a single thread; work started with
+    this and gathered really overlaps, at the cost of one connection per busy pool thread.
+    """
+    def run():
+        try:
+            return fn(*args)
+        finally:
+            close_old_connections()
+    return await sync_to_async(run, thread_sensitive=False)()
+
+
+async def authenticate(request):
+    """Return the active user named by the request's JWT access token, or None; mirrors JWTAuthentication."""
+    try:
+        header = _jwt.get_header(request)
+        raw = header and _jwt.get_raw_token(header)
+        if not raw:
+            return None
+        token = _jwt.get_validated_token(raw)
+    except AuthenticationFailed:
+        return None
+    lookup = {jwt_settings.USER_ID_FIELD: token.get(jwt_settings.USER_ID_CLAIM)}
+    return await User.objects.filter(is_active=True, **lookup).afirst()
+
+
+def api_view(user_scoped=True):
+    """GET-only JSON view taking (request, user, ...); user-scoped views also get ETag/Last-Modified and 304s."""
+    def decorator(view):
+        @require_safe
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await authenticate(request)
+            if user is None:
+                response = JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+                response["WWW-Authenticate"] = 'Bearer realm="api"'
+                return response
+            # every async endpoint is an analytics read; in_thread carries the alias into the pool threads
+            replica_reads = routing.reads_from(routing.read_alias(user.id))
+            if not user_scoped:
+                with replica_reads:
+                    return await view(request, user, *args, **kwargs)
+            validators = await in_thread(conditional.validators, user.id)
+            response = get_conditional_response(request, *validators)
+            if response is None:
+                with replica_reads:
+                    response = await view(request, user, *args, **kwargs)
+            if response.status_code in (200, 304):
+                conditional.add_validators(response, *validators)
+            return response
+        return wrapper
+    return decorator
+
+
+def _owned_habit_report(user, pk):
+    habit = Habit.objects.filter(pk=pk, user=user).first()
+    return reports.habit_report(habit) if habit else None
+
+
+@api_view()
+async def habit_report(request, user, pk):
+    data = await in_thread(caching.cached, "habit-report", user.id, lambda: _owned_habit_report(user, pk), pk)
+    if data is None:
+        return JsonResponse({"detail": "No Habit matches the given query."}, status=404)
+    return JsonResponse(data)
+
+
+@api_view()
+async def habit_analytics(request, user, habit_id):
+    data = await in_thread(caching.cached, "habit-analytics", user.id,
+                           lambda: reports.habit_analytics(user, habit_id), habit_id)
+    if data is None:
+        return JsonResponse({"detail": "Not found"}, status=404)
+    return JsonResponse(data)
+
+
+def _habits_summary(user):
+    return caching.cached("reports-summary", user.id, lambda: reports.habits_summary(user))
+
+
+@api_view()
+async def reports_summary(request, user):
+    return JsonResponse(await in_thread(_habits_summary, user))
+
+
+@api_view()
+async def user_habits_summary(request, user):
+    return JsonResponse(await in_thread(reports.habit_occurrence_totals, user))
+
+
+def _recent_logs(user):
+    logs = HabitLog.objects.filter(user=user).order_by("-log_date", "-id")[:RECENT_LOGS]
+    return HabitLogSerializer(logs, many=True).data
+
+
+def _badges(user):
+    return UserBadgeSerializer(UserBadge.objects.filter(user=user).select_related("badge"), many=True).data
+
+
+def _achievements(user):
+    return AchievementSerializer(Achievement.objects.filter(user=user), many=True).data
+
+
+@api_view()
+async def dashboard(request, user):
+    """Habit summary, recent logs, badges and achievements in one response; the four parts load concurrently."""
+    summary, logs, badges, achievements = await asyncio.gather(
+        in_thread(_habits_summary, user),
+        in_thread(_recent_logs, user),
+        in_thread(_badges, user),
+        in_thread(_achievements, user),
+    )
+    return JsonResponse({"habits": summary["habits"], "recent_logs": logs, "badges": badges,
+                         "achievements": achievements})
+
+
+async def _leaderboard_page(request, board, score_key):
+    if board not in leaderboards.BOARDS:
+        return JsonResponse({"detail": "Not found"}, status=404)
+    try:
+        data = await in_thread(leaderboards.page, board, score_key, request.GET, request.build_absolute_uri())
+    except NotFound as exc:
+        return JsonResponse({"detail": exc.detail}, status=404)
+    except ValidationError as exc:
+        return JsonResponse(exc.detail, status=400)
+    return JsonResponse(data)
+
+
+@api_view(user_scoped=False)
+async def leaderboard_top_users(request, user):
+    return await _leaderboard_page(request, LeaderboardEntry.TOTAL, "total_occurrences")
+
+
+@api_view(user_scoped=False)
+async def leaderboard_top_streaks(request, user):
+    return await _leaderboard_page(request, LeaderboardEntry.STREAK, "current_streak")
+
+
+@api_view(user_scoped=False)
+async def leaderboard(request, user, board):
+    return await _leaderboard_page(request, board, "score")
+
+
+@api_view(user_scoped=False)
+async def leaderboard_rank(request, user, board):
+    if board not in leaderboards.BOARDS:
+        return JsonResponse({"detail": "Not found"}, status=404)
+    entry = await in_thread(leaderboards.rank_of, board, user)
+    if entry is None:
+        return JsonResponse({"detail": "Not ranked yet"}, status=404)
+    return JsonResponse(entry)
@@ -0,0 +1,119 @@
+from collections import defaultdict, namedtuple
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+from .models import Habit, HabitDailyStat, HabitPeriodStat, Badge, UserBadge, Achievement, PendingBadgeCheck
+from . import caching
+
+BATCH_SIZE = 1000
+BADGE, ACHIEVEMENT = "badge", "achievement"
+
+# metric is a key of user_stats(); "habit_days" counts (habit, day) pairs with occurrences, and
+# "habit_days:<category>" the same for one Habit category
+Rule = namedtuple("Rule", "kind name description metric threshold")
+
+RULES = (
+    Rule(BADGE, "First Habit Created", "Congratulations! You created your first habit", "habits", 1),
+    Rule(BADGE, "One Week Streak", "You logged habits for 7 days straight!", "best_streak", 7),
+    Rule(BADGE, "One Month Streak", "You logged a habit 30 days straight!", "best_streak", 30),
+    Rule(BADGE, "Hundred Check-ins", "You have logged habits on 100 days.", "habit_days", 100),
+    Rule(ACHIEVEMENT, "Habit Collector", "Tracking five habits at once.", "habits", 5),
+    Rule(ACHIEVEMENT, "Health Watch", "Tracked health habits on 30 days.", "habit_days:health", 30),
+    Rule(ACHIEVEMENT, "Money Watch", "Tracked finance habits on 30 days.", "habit_days:finance", 30),
+    Rule(ACHIEVEMENT, "Focus Watch", "Tracked productivity habits on 30 days.", "habit_days:productivity", 30),
+    Rule(ACHIEVEMENT, "Thousand Occurrences", "Logged 1000 occurrences in total.", "total_occurrences", 1000),
+)
+
+# badge name -> id for the rules above, per process; cleared when a Badge is deleted (habits.signals)
+_catalog = {}
+
+
+def catalog():
+    if not _catalog:
+        rules = {r.name: r for r in RULES if r.kind == BADGE}
+        Badge.objects.bulk_create([Badge(name=r.name, description=r.description) for r in rules.values()],
+                                  ignore_conflicts=True)
+        _catalog.update(Badge.objects.filter(name__in=rules).values_list("name", "id"))
+    return _catalog
+
+
+def reset_catalog():
+    _catalog.clear()
+
+
+def user_stats(user_ids):
+    """Return {user_id: {metric: value}} from habit state and the rollup tables, three queries per batch."""
+    stats = {uid: defaultdict(int) for uid in user_ids}
+    for uid, habits, best in (Habit.objects.filter(user_id__in=user_ids).values_list("user_id")
+                              .annotate(n=Count("id"), best=Max("longest_streak"))):
+        stats[uid]["habits"] = habits
+        stats[uid]["best_streak"] = best or 0
+    for uid, category, days in (HabitDailyStat.objects.filter(habit__user_id__in=user_ids)
+                                .values_list("habit__user_id", "habit__category").annotate(n=Count("id"))):
+        stats[uid]["habit_days"] += days
+        stats[uid][f"habit_days:{category}"] = days
+    for uid, total in (HabitPeriodStat.objects.filter(habit__user_id__in=user_ids, period=HabitPeriodStat.YEAR)
+                       .values_list("habit__user_id").annotate(total=Sum("occurrences"))):
+        stats[uid]["total_occurrences"] = total
+    return stats
+
+
+def evaluate(user_ids):
+    """Award every rule ``user_ids`` now satisfy; already-held awards are left alone.
+
+    Returns how many awards the users qualify for, held before or not. Only users who gained an award
+    get their data version bumped, so re-running over everyone does not invalidate every cache.
+    """
+    user_ids = sorted(set(user_ids))
+    badge_ids = catalog()
+    written = 0
+    for i in range(0, len(user_ids), BATCH_SIZE):
+        chunk = user_ids[i:i + BATCH_SIZE]
+        stats = user_stats(chunk)
+        held_badges = set(UserBadge.objects.filter(user_id__in=chunk).values_list("user_id", "badge_id"))
+        held_achievements = set(Achievement.objects.filter(user_id__in=chunk).values_list("user_id", "name"))
+        badges, achievements = [], []
+        for uid, values in stats.items():
+            for rule in RULES:
+                if values[rule.metric] < rule.threshold:
+                    continue
+                written += 1
+                if rule.kind == BADGE:
+                    if (uid, badge_ids[rule.name]) not in held_badges:
+                        badges.append(UserBadge(user_id=uid, badge_id=badge_ids[rule.name]))
+                elif (uid, rule.name) not in held_achievements:
+                    achievements.append(Achievement(user_id=uid, name=rule.name, description=rule.description))
+        UserBadge.objects.bulk_create(badges, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        Achievement.objects.bulk_create(achievements, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        # awards show up on cached pages (frontend dashboard)
+        caching.bump({award.user_id for award in badges + achievements})
+    return written
+
+
+def mark_dirty(user_ids):
+    """Queue users for the next evaluate_pending() run; one upsert, so writers stay cheap.
+
+    A user already queued gets a fresh ``queued_at``, which keeps a row that evaluate_pending() is
+    busy with from being dropped after it.
+    """
+    PendingBadgeCheck.objects.bulk_create([PendingBadgeCheck(user_id=uid) for uid in set(user_ids)],
+                                          update_conflicts=True, unique_fields=["user"],
+                                          update_fields=["queued_at"])
+
+
+def evaluate_pending():
+    """Drain the queue in batches.
+
+    A batch's rows are deleted in the same transaction as its awards, so a crash leaves them queued;
+    rows re-marked while the batch ran are newer than ``started`` and stay for the next pass.
+    """
+    evaluated = 0
+    while True:
+        started = timezone.now()
+        with transaction.atomic():
+            batch = dict(PendingBadgeCheck.objects.order_by("id").values_list("id", "user_id")[:BATCH_SIZE])
+            if not batch:
+                return evaluated
+            evaluate(batch.values())
+            PendingBadgeCheck.objects.filter(id__in=list(batch), queued_at__lte=started).delete()
+        evaluated += len(batch)
@@ -0,0 +1,66 @@
+from collections import defaultdict
+from django.db import transaction
+from .models import Habit, HabitLog
+from . import rollups, streaks, leaderboards, badges, caching
+from .signals import sync_log_changes
+
+BATCH_SIZE = 1000
+
+
+def upsert_logs(entries):
+    """Insert or update HabitLog rows keyed on (habit, log_date) with one bulk statement per batch.
+
+    ``entries`` are dicts with habit_id, user_id (the habit's owner), log_date, occurrences and optionally
+    note; a missing note leaves an existing row's note untouched. Later entries for the same day win. Derived stats are
+    refreshed once for the whole batch and the users are queued for badge evaluation. Returns {habit_id: set of dates} that were written.
+    """
+    latest = {}
+    for entry in entries:
+        latest[(entry["habit_id"], entry["log_date"])] = entry
+
+    with_note, without_note = [], []
+    changes = defaultdict(set)
+    for (habit_id, log_date), entry in latest.items():
+        log = HabitLog(habit_id=habit_id, user_id=entry.get("user_id"), log_date=log_date,
+                       occurrences=entry.get("occurrences", 1))
+        if "note" in entry:
+            log.note = entry["note"]
+            with_note.append(log)
+        else:
+            log.note = ""
+            without_note.append(log)
+        changes[habit_id].add(log_date)
+
+    with transaction.atomic():
+        for logs, fields in ((with_note, ("occurrences", "note", "updated_at")),
+                             (without_note, ("occurrences", "updated_at"))):
+            if logs:
+                HabitLog.objects.bulk_create(logs, batch_size=BATCH_SIZE, update_conflicts=True,
+                                             unique_fields=("habit", "log_date"), update_fields=fields)
+        sync_log_changes(changes)
+    return changes
+
+
+def rebuild_derived(habit_ids):
+    """Recompute rollups, streaks and leaderboard scores of ``habit_ids`` from raw logs, then award badges.
+
+    Returns the number of active (habit, day) rollup rows rebuilt.
+
+    Meant for writers that bypass the HabitLog signals (imports, raw backfills) and fix up once at the end.
+    """
+    habit_ids = sorted(set(habit_ids))
+    days = 0
+    for i in range(0, len(habit_ids), BATCH_SIZE):
+        chunk = habit_ids[i:i + BATCH_SIZE]
+        for habit_id in chunk:
+            days += rollups.rebuild_habit(habit_id)
+        habits = list(Habit.objects.filter(id__in=chunk).only("id", "user_id", *streaks.STREAK_FIELDS))
+        for habit in habits:
+            streaks.recompute(habit)
+        Habit.objects.bulk_update(habits, streaks.STREAK_FIELDS, batch_size=BATCH_SIZE)
+        user_ids = {habit.user_id for habit in habits}
+        leaderboards.refresh_users(user_ids)
+        # bulk_update sends no signals; reports and ETags read the rebuilt rollups and streaks
+        caching.bump(user_ids)
+        badges.evaluate(user_ids)
+    return days
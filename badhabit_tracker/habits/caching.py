@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import UserDataVersion
+from . import routing
+from .utils import today_utc_date
+
+# report kinds served through cached(); hit/miss counters are kept per kind
+KINDS = ("habit-report", "habit-analytics", "habit-series", "habits-series", "reports", "reports-summary")
+# the version key is normally replaced on every bump; the timeout only bounds a lost update
+VERSION_TIMEOUT = 24 * 3600
+# a local-memory cache never sees bumps made by other processes (commands, celery, other workers),
+# so there the timeout is how stale their writes can look
+LOCAL_VERSION_TIMEOUT = 5
+
+
+def _version_key(user_id):
+    return f"datamark:{user_id}"
+
+
+def _version_timeout():
+    return LOCAL_VERSION_TIMEOUT if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache) else VERSION_TIMEOUT
+
+
+def user_marker(user_id):
+    """Return (version, updated_at) of the user's data; (0, None) before their first write."""
+    key = _version_key(user_id)
+    marker = cache.get(key)
+    if marker is None:
+        # always from the primary: a lagging replica would pin an old version into the cache
+        marker = (UserDataVersion.objects.using(DEFAULT_DB_ALIAS).filter(user_id=user_id)
+                  .values_list("version", "updated_at").first() or (0, None))
+        # add, not set: a bump that landed meanwhile has already stored the newer value
+        cache.add(key, marker, _version_timeout())
+    return marker
+
+
+def user_version(user_id):
+    return user_marker(user_id)[0]
+
+
+def bump(user_ids):
+    """Invalidate every cached report of ``user_ids`` by moving their data version on; no key scans.
+
+    The cached versions are dropped at once (so this transaction reads its own writes) and the
+    committed values are stored after commit, overwriting anything a concurrent reader cached.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    updated = UserDataVersion.objects.filter(user_id__in=user_ids).update(version=F("version") + 1,
+                                                                          updated_at=timezone.now())
+    if updated < len(user_ids):
+        UserDataVersion.objects.bulk_create([UserDataVersion(user_id=uid, version=1) for uid in user_ids],
+                                            ignore_conflicts=True)
+    cache.delete_many([_version_key(uid) for uid in user_ids])
+    routing.pin(user_ids)
+
+    def publish():
+        markers = UserDataVersion.objects.filter(user_id__in=user_ids).values_list("user_id", "version", "updated_at")
+        cache.set_many({_version_key(uid): (version, updated_at) for uid, version, updated_at in markers},
+                       _version_timeout())
+    transaction.on_commit(publish)
+
+
+def _count(kind, outcome):
+    key = f"report-stats:{kind}:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def cached(kind, user_id, compute, *parts):
+    """Return ``compute()`` for the user's current data version and UTC day, from the cache when possible.
+
+    ``parts`` (e.g. a habit id) complete the key; a None result is returned but not stored.
+    """
+    key = ":".join(str(p) for p in ("report", kind, user_id, user_version(user_id), today_utc_date(), *parts))
+    data = cache.get(key)
+    if data is not None:
+        _count(kind, "hits")
+        return data
+    _count(kind, "misses")
+    data = compute()
+    if data is not None:
+        cache.set(key, data, settings.REPORT_CACHE_TIMEOUT)
+    return data
+
+
+def stats(reset=False):
+    """Return {kind: {"hits", "misses"}} as counted by this cache (shared backends count across workers)."""
+    keys = [f"report-stats:{kind}:{outcome}" for kind in KINDS for outcome in ("hits", "misses")]
+    values = cache.get_many(keys)
+    if reset:
+        cache.delete_many(keys)
+    return {kind: {outcome: values.get(f"report-stats:{kind}:{outcome}", 0) for outcome in ("hits", "misses")}
+            for kind in KINDS}
@@ -0,0 +1,64 @@
+from datetime import datetime, time, timezone as dt_timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from . import caching
+from .utils import today_utc_date
+
+# part of every ETag; bump when response bodies change shape so clients drop what they hold
+REVISION = 1
+
+
+def validators(user_id):
+    """Return (etag, last_modified timestamp) for everything the user's GETs can show today.
+
+    Derived from the per-user data marker only, so computing them needs no query on a warm cache.
+    The UTC day is part of both because streaks and rolling windows move with the calendar.
+    """
+    version, updated_at = caching.user_marker(user_id)
+    today = today_utc_date()
+    etag = f'W/"{REVISION}.{user_id}.{version}.{today:%Y%m%d}"'
+    midnight = datetime.combine(today, time.min, tzinfo=dt_timezone.utc)
+    return etag, int(max(updated_at or midnight, midnight).timestamp())
+
+
+def add_validators(response, etag, last_modified):
+    response.headers.setdefault("ETag", etag)
+    response.headers.setdefault("Last-Modified", http_date(last_modified))
+    # per-user bodies behind one URL: keep them out of shared caches and revalidate every time
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Authorization",))
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """ETag / Last-Modified for user-scoped GETs; a matching If-None-Match or If-Modified-Since gets a 304.
+
+    The check runs after authentication and permissions but before the handler, so an unchanged
+    resource is answered without queryset, serializer or report work.
+    """
+    conditional_validators = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ("GET", "HEAD") or not request.user.is_authenticated:
+            return
+        self.conditional_validators = validators(request.user.id)
+        etag, last_modified = self.conditional_validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.conditional_validators and response.status_code in (200, 304):
+            add_validators(response, *self.conditional_validators)
+        return response
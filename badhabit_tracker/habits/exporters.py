@@ -0,0 +1,103 @@
+import csv
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Habit, HabitLog, JournalEntry, UserBadge
+
+CHUNK_SIZE = 2000
+# bytes buffered before a chunk is handed to the response
+FLUSH_BYTES = 64 * 1024
+
+# dataset -> (queryset factory, columns); columns are values_list() lookups, renamed on output
+DATASETS = {
+    "habits": (
+        lambda user: Habit.objects.filter(user=user).order_by("id"),
+        ("id", "name", "category", "description", "target_frequency", "is_active", "created_at"),
+    ),
+    "logs": (
+        lambda user: HabitLog.objects.filter(habit__user=user).order_by("habit_id", "log_date"),
+        ("id", "habit_id", "habit__name", "log_date", "occurrences", "note", "created_at"),
+    ),
+    "journal": (
+        lambda user: JournalEntry.objects.filter(user=user).order_by("id"),
+        ("id", "habit_id", "entry", "mood", "created_at"),
+    ),
+    "badges": (
+        lambda user: UserBadge.objects.filter(user=user).order_by("id"),
+        ("id", "badge__name", "badge__description", "awarded_at"),
+    ),
+}
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _header(columns):
+    return [c.replace("__", "_") for c in columns]
+
+
+def iter_rows(user, dataset, chunk_size=CHUNK_SIZE):
+    factory, columns = DATASETS[dataset]
+    return factory(user).values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    # csv.writer target that hands back each formatted line instead of storing it
+    def write(self, value):
+        return value
+
+
+def iter_csv(user, dataset, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(_header(DATASETS[dataset][1]))
+    for row in iter_rows(user, dataset, chunk_size):
+        yield writer.writerow([v.isoformat() if hasattr(v, "isoformat") else v for v in row])
+
+
+def iter_ndjson(user, datasets, chunk_size=CHUNK_SIZE):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for dataset in datasets:
+        header = _header(DATASETS[dataset][1])
+        for row in iter_rows(user, dataset, chunk_size):
+            record = dict(zip(header, row))
+            record["type"] = dataset
+            yield encoder.encode(record) + "\n"
+
+
+def buffered(lines, flush_bytes=FLUSH_BYTES):
+    """Group text lines into byte chunks; the first line goes out alone so clients get a byte at once."""
+    buf, size, first = [], 0, True
+    for line in lines:
+        data = line.encode()
+        if first:
+            yield data
+            first = False
+            continue
+        buf.append(data)
+        size += len(data)
+        if size >= flush_bytes:
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        # sync-flush so every chunk is decodable as soon as it arrives
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def stream(user, fmt, datasets, gzip=False, chunk_size=CHUNK_SIZE):
+    """Return an iterator of bytes for the export; ``datasets`` must hold exactly one entry for csv."""
+    if fmt == "csv":
+        lines = iter_csv(user, datasets[0], chunk_size)
+    else:
+        lines = iter_ndjson(user, datasets, chunk_size)
+    chunks = buffered(lines)
+    return gzipped(chunks) if gzip else chunks
+
+
+def filename(user, fmt, datasets, gzip=False):
+    name = f"badhabit-{user.username}-{'-'.join(datasets)}.{fmt}"
+    return name + ".gz" if gzip else name
@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from . import caching
+from .models import Habit, HabitLog
+from .signals import sync_log_changes
+
+# "+1" taps. Each write is one INSERT ... ON CONFLICT DO UPDATE SET occurrences = occurrences + n
+# (SQLite 3.35+ / PostgreSQL), so parallel taps never lose updates. With INCREMENT_COALESCE_SECONDS set,
+# taps are summed in the cache instead and written once per window by habits.tasks.flush_increment_task.
+# Rollups, streaks, leaderboards and badges follow off the request, in habits.tasks.sync_increment_task.
+
+# a refresh whose task was lost stops holding back the next one after this long
+SYNC_WINDOW_SECONDS = 60
+
+
+def _upsert_sql():
+    q = connection.ops.quote_name
+    log, habit = q(HabitLog._meta.db_table), q(Habit._meta.db_table)
+    col = {f.name: q(f.column) for f in HabitLog._meta.concrete_fields}
+    # INSERT ... SELECT checks ownership in the same statement; the WHERE also keeps SQLite's parser
+    # from reading ON CONFLICT as a join constraint
+    return (
+        f"INSERT INTO {log} ({col['habit']}, {col['user']}, {col['log_date']}, {col['occurrences']}, {col['note']}, "
+        f"{col['created_at']}, {col['updated_at']}) "
+        f"SELECT {habit}.{q('id')}, {habit}.{q('user_id')}, %s, %s, '', %s, %s FROM {habit} "
+        f"WHERE {habit}.{q('id')} = %s AND {habit}.{q('user_id')} = %s "
+        f"ON CONFLICT ({col['habit']}, {col['log_date']}) DO UPDATE SET "
+        f"{col['occurrences']} = {log}.{col['occurrences']} + excluded.{col['occurrences']}, "
+        f"{col['updated_at']} = excluded.{col['updated_at']} "
+        f"RETURNING {col['occurrences']}"
+    )
+
+
+def increment(habit_id, user_id, log_date, n=1):
+    """Add ``n`` occurrences to the habit's log of ``log_date``; returns the new total, or None if not the user's habit.
+
+    Only the log and the user's data version are written; call sync() (or schedule it with open_sync()) to
+    bring the derived stats in line.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(_upsert_sql(), [log_date, n, now, now, habit_id, user_id])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        # the log itself is part of cached reports and ETags
+        caching.bump([user_id])
+    return row[0]
+
+
+def _sync_key(habit_id, log_date):
+    return f"increment-sync:{habit_id}:{log_date.isoformat()}"
+
+
+def open_sync(habit_id, log_date):
+    """True if the caller should schedule sync() for (habit, day); taps until it starts are covered by that run.
+
+    Needs a cache shared with the worker (Redis), like coalesce().
+    """
+    return cache.add(_sync_key(habit_id, log_date), 1, SYNC_WINDOW_SECONDS)
+
+
+def sync(habit_id, log_date):
+    """Refresh rollups, streaks, leaderboards and badges after taps on (habit, day); later taps open the next run."""
+    cache.delete(_sync_key(habit_id, log_date))
+    with transaction.atomic():
+        sync_log_changes({habit_id: {log_date}})
+
+
+def _pending_key(habit_id, log_date):
+    return f"increment:{habit_id}:{log_date.isoformat()}"
+
+
+def _window_key(habit_id, log_date):
+    return f"increment-window:{habit_id}:{log_date.isoformat()}"
+
+
+def coalesce(habit_id, log_date, n=1):
+    """Add ``n`` to the pending taps of (habit, day); returns (pending total, True if this tap opened the window).
+
+    The caller schedules flush() once per opened window. Needs a cache shared with the flushing worker (Redis).
+    """
+    key = _pending_key(habit_id, log_date)
+    timeout = settings.INCREMENT_COALESCE_SECONDS * 10 + 60
+    try:
+        pending = cache.incr(key, n)
+    except ValueError:
+        pending = n if cache.add(key, n, timeout) else cache.incr(key, n)
+    return pending, cache.add(_window_key(habit_id, log_date), 1, settings.INCREMENT_COALESCE_SECONDS)
+
+
+def flush(habit_id, user_id, log_date):
+    """Write the taps pending for (habit, day) as one increment; taps landing meanwhile open the next window."""
+    cache.delete(_window_key(habit_id, log_date))
+    key = _pending_key(habit_id, log_date)
+    pending = cache.get(key) or 0
+    if pending <= 0:
+        return None
+    cache.decr(key, pending)
+    try:
+        total = increment(habit_id, user_id, log_date, pending)
+    except Exception:
+        coalesce(habit_id, log_date, pending)  # keep them for the task's retry or the next window
+        raise
+    if total is not None:
+        sync(habit_id, log_date)  # already off the request path
+    return total
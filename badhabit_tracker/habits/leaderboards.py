@@ -0,0 +1,115 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db.models import Q, Sum
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.utils.urls import replace_query_param
+from .models import HabitDailyStat, HabitPeriodStat, Habit, LeaderboardEntry
+from .pagination import decode_cursor, encode_cursor
+from .streaks import live_streak
+from .utils import today_utc_date
+
+User = get_user_model()
+
+BOARDS = [board for board, _ in LeaderboardEntry.BOARD_CHOICES]
+WINDOWS = {LeaderboardEntry.LAST_7_DAYS: 7, LeaderboardEntry.LAST_30_DAYS: 30}
+BATCH_SIZE = 1000
+MAX_LIMIT = 100
+# rank_of counts the entries ahead of a user along the rank index, so a rank costs O(rank); past this it stops counting
+MAX_EXACT_RANK = 10000
+
+
+def compute_scores(user_ids, today=None):
+    """Return {board: {user_id: score}} for ``user_ids`` from the rollup and streak state."""
+    today = today or today_utc_date()
+    scores = {board: dict.fromkeys(user_ids, 0) for board in BOARDS}
+
+    totals = (HabitPeriodStat.objects.filter(habit__user_id__in=user_ids, period=HabitPeriodStat.YEAR)
+              .values_list("habit__user_id").annotate(total=Sum("occurrences")))
+    scores[LeaderboardEntry.TOTAL].update(totals)
+
+    for board, days in WINDOWS.items():
+        window = (HabitDailyStat.objects.filter(habit__user_id__in=user_ids, day__range=(today - timedelta(days=days - 1), today))
+                  .values_list("habit__user_id").annotate(total=Sum("occurrences")))
+        scores[board].update(window)
+
+    # a future-dated log moves last_logged_date past today; live_streak counts the part of its run up to today
+    streaks = scores[LeaderboardEntry.STREAK]
+    live = (Habit.objects.filter(user_id__in=user_ids, last_logged_date__gte=today)
+            .values_list("id", "user_id", "current_streak", "longest_streak", "last_logged_date"))
+    for hid, uid, current_streak, longest_streak, last_logged_date in live:
+        streaks[uid] = max(streaks[uid], live_streak(current_streak, last_logged_date, today, hid, longest_streak))
+    return scores
+
+
+def refresh_users(user_ids, today=None):
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return
+    scores = compute_scores(user_ids, today)
+    rows = [LeaderboardEntry(board=board, user_id=uid, score=score or 0)
+            for board, by_user in scores.items() for uid, score in by_user.items()]
+    LeaderboardEntry.objects.bulk_create(rows, batch_size=BATCH_SIZE, update_conflicts=True,
+                                         unique_fields=("board", "user"), update_fields=("score", "updated_at"))
+
+
+def reconcile(today=None):
+    """Rescore every user; rolling windows and streaks decay with the calendar, not with writes."""
+    today = today or today_utc_date()
+    batch = []
+    count = 0
+    for uid in User.objects.order_by("id").values_list("id", flat=True).iterator(chunk_size=BATCH_SIZE):
+        batch.append(uid)
+        if len(batch) >= BATCH_SIZE:
+            refresh_users(batch, today)
+            count += len(batch)
+            batch = []
+    refresh_users(batch, today)
+    return count + len(batch)
+
+
+def top(board, limit=10, cursor=None):
+    """Return (rows, next_cursor) - one page of ``board`` ordered by score, ties broken by user id."""
+    qs = LeaderboardEntry.objects.filter(board=board).order_by("-score", "user_id")
+    position = decode_cursor(cursor)
+    rank = 0
+    if position:
+        try:
+            score, user_id, rank = (int(v) for v in position)
+        except (TypeError, ValueError):
+            raise NotFound("Invalid cursor")
+        qs = qs.filter(Q(score__lt=score) | Q(score=score, user_id__gt=user_id))
+    entries = list(qs.values_list("user_id", "user__username", "score")[:limit + 1])
+
+    rows = [{"rank": rank + i + 1, "user_id": uid, "username": username, "score": score}
+            for i, (uid, username, score) in enumerate(entries[:limit])]
+    next_cursor = None
+    if len(entries) > limit and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor([last["score"], last["user_id"], last["rank"]])
+    return rows, next_cursor
+
+
+def page(board, score_key, params, url):
+    """The API payload for one page of ``board``: ``params`` are the query parameters, ``url`` the absolute request URL."""
+    limit = params.get("limit", "10")
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_LIMIT:
+        raise ValidationError({"limit": [f"Must be an integer from 1 to {MAX_LIMIT}."]})
+    limit = int(limit)
+    rows, next_cursor = top(board, limit=limit, cursor=params.get("cursor"))
+    for row in rows:
+        row[score_key] = row.pop("score")
+    next_url = None
+    if next_cursor:
+        next_url = replace_query_param(url, "cursor", next_cursor)
+    return {"leaderboard": rows, "next": next_url}
+
+
+def rank_of(board, user):
+    """The user's entry on ``board``; outside the top MAX_EXACT_RANK, "rank" is MAX_EXACT_RANK + 1, "exact" false."""
+    entry = LeaderboardEntry.objects.filter(board=board, user=user).values_list("score", flat=True).first()
+    if entry is None:
+        return None
+    ahead = LeaderboardEntry.objects.filter(board=board).filter(
+        Q(score__gt=entry) | Q(score=entry, user_id__lt=user.id)).order_by()[:MAX_EXACT_RANK].count()
+    return {"rank": ahead + 1, "exact": ahead < MAX_EXACT_RANK, "user_id": user.id, "username": user.username,
+            "score": entry}
@@ -0,0 +1,92 @@
+import gc
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from habits.timeseries import OccurrenceSeries
+from habits.utils import today_utc_date, start_of_week, start_of_month, start_of_prev_month, daterange, compute_streaks
+
+
+def _windows(today):
+    week_start = start_of_week(today)
+    month_start = start_of_month(today)
+    return [
+        (week_start, today),
+        (week_start - timedelta(days=7), week_start - timedelta(days=1)),
+        (month_start, today),
+        (start_of_prev_month(today), month_start - timedelta(days=1)),
+    ]
+
+
+# the per-request work the report views did with plain dicts
+
+def _dict_windows(occ_map, windows):
+    return [sum(v for d, v in occ_map.items() if lo <= d <= hi) for lo, hi in windows] + [sum(occ_map.values())]
+
+
+def _dict_streaks(occ_map, today):
+    return compute_streaks({d for d, v in occ_map.items() if v > 0}, upto_date=today)
+
+
+def _dict_series(occ_map, start, end):
+    return [{"date": d.isoformat(), "occurrences": occ_map.get(d, 0)} for d in daterange(start, end)]
+
+
+def _series_windows(series, windows):
+    sums = series.window_sums([lo for lo, _ in windows], [hi for _, hi in windows])
+    return sums.tolist() + [series.total()]
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark the dict-based report analytics against OccurrenceSeries on synthetic histories."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--habits", type=int, default=2000)
+        parser.add_argument("--years", type=int, default=10)
+        parser.add_argument("--density", type=float, default=0.6, help="Share of days with a log")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def _time(self, label, fn, items):
+        # like timeit, keep collector pauses over the synthetic histories out of the measurement
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            out = [fn(item) for item in items]
+            return label, time.perf_counter() - started, out
+        finally:
+            gc.enable()
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        today = today_utc_date()
+        start_30 = today - timedelta(days=29)
+        windows = _windows(today)
+        days = [today - timedelta(days=n) for n in range(options["years"] * 365)]
+        histories = [
+            {d: rng.randint(1, 5) for d in days if rng.random() < options["density"]}
+            for _ in range(options["habits"])
+        ]
+        self.stdout.write(f"{len(histories)} habits, {sum(map(len, histories))} logged days")
+
+        _, build_secs, series = self._time("build", lambda h: OccurrenceSeries.from_pairs(h.items()), histories)
+        self.stdout.write(f"{'series build':<10} {build_secs:8.3f}s (once per history)")
+
+        pairs = [
+            (self._time("windows", lambda h: _dict_windows(h, windows), histories),
+             self._time("windows", lambda s: _series_windows(s, windows), series)),
+            (self._time("streaks", lambda h: _dict_streaks(h, today), histories),
+             self._time("streaks", lambda s: s.streaks(upto_date=today), series)),
+            (self._time("30d series", lambda h: _dict_series(h, start_30, today), histories),
+             self._time("30d series", lambda s: s.series(start_30, today), series)),
+        ]
+        dict_total = series_total = 0.0
+        for (label, dict_secs, expected), (_, series_secs, got) in pairs:
+            if expected != got:
+                self.stderr.write(self.style.ERROR(f"{label}: results differ between implementations"))
+                return
+            dict_total += dict_secs
+            series_total += series_secs
+            self.stdout.write(f"{label:<10} dict {dict_secs:8.3f}s  series {series_secs:8.3f}s  "
+                              f"{dict_secs / series_secs:6.1f}x")
+        self.stdout.write(self.style.SUCCESS(f"overall {dict_total / series_total:.1f}x faster per report pass"))
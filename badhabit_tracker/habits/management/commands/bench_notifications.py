@@ -0,0 +1,81 @@
+import asyncio
+import json
+import random
+import socket
+from aiohttp import web
+from django.core.management.base import BaseCommand
+from habits import notifications
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def sink_app(latency, fail_rate, seed):
+    """Stand-in SMS gateway: accepts JSON messages after ``latency`` seconds, answers 503 for ``fail_rate`` of them."""
+    rng = random.Random(seed)
+    received = []
+
+    async def receive(request):
+        received.append(await request.json())
+        if latency:
+            await asyncio.sleep(latency)
+        if rng.random() < fail_rate:
+            return web.Response(status=503)
+        return web.json_response({"status": "queued"}, status=201)
+
+    app = web.Application()
+    app.router.add_post("/messages", receive)
+    app["received"] = received
+    return app
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure notification throughput without an external provider: start a local HTTP sink in-process "
+        "and push --messages through the HTTP backend (pooled connections, retries) at --concurrency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=5000)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--latency", type=float, default=0.02, help="Seconds the sink waits per request")
+        parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 503")
+        parser.add_argument("--backend", choices=("http", "memory"), default="http")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--output", help="Also write the stats as JSON to this path")
+
+    def handle(self, *args, **options):
+        messages = [notifications.Message(to="+15550000000", body=f"Bench message {i}", key=i)
+                    for i in range(options["messages"])]
+        stats = asyncio.run(self._run(messages, options))
+        self.stdout.write(f"{stats['backend']}: {stats['sent']} sent, {stats['failed']} failed in "
+                          f"{stats['seconds']:.2f}s ({stats['per_second']:.0f}/s)")
+        for key, error in stats["errors"][:5]:
+            self.stdout.write(f"  message {key}: {error}")
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(stats, fh, indent=2)
+
+    async def _run(self, messages, options):
+        if options["backend"] == "memory":
+            backend = notifications.MemoryBackend(concurrency=options["concurrency"])
+            stats = await backend.send_batch_async(messages)
+            notifications.MemoryBackend.outbox.clear()
+            return stats
+
+        app = sink_app(options["latency"], options["fail_rate"], options["seed"])
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        port = free_port()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        try:
+            backend = notifications.HttpBackend(url=f"http://127.0.0.1:{port}/messages",
+                                                concurrency=options["concurrency"])
+            stats = await backend.send_batch_async(messages)
+        finally:
+            await runner.cleanup()
+        stats["requests"] = len(app["received"])
+        return stats
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from habits import caching
+
+
+class Command(BaseCommand):
+    help = "Show report cache hits and misses per endpoint (per process for the memory cache, shared for Redis)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing")
+
+    def handle(self, *args, **options):
+        for kind, counts in caching.stats(reset=options["reset"]).items():
+            total = counts["hits"] + counts["misses"]
+            ratio = f"{counts['hits'] / total:.1%}" if total else "-"
+            self.stdout.write(f"{kind:<16} {counts['hits']:>8} hits {counts['misses']:>8} misses  {ratio}")
@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from habits import badges
+
+
+class Command(BaseCommand):
+    help = "Run the badge and achievement rules: for queued users (default), --all users, or given --user ids."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Evaluate every user, e.g. after adding a rule")
+        parser.add_argument("--user", type=int, action="append", help="Evaluate this user id (repeatable)")
+
+    def handle(self, *args, **options):
+        if options["all"] or options["user"]:
+            user_ids = options["user"] or list(get_user_model().objects.values_list("id", flat=True))
+            awards = badges.evaluate(user_ids)
+            self.stdout.write(self.style.SUCCESS(f"Evaluated {len(set(user_ids))} users ({awards} qualifying awards)."))
+            return
+        evaluated = badges.evaluate_pending()
+        self.stdout.write(self.style.SUCCESS(f"Evaluated {evaluated} queued users."))
@@ -0,0 +1,39 @@
+import sys
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from habits import exporters
+
+
+class Command(BaseCommand):
+    help = "Stream a user's habits, logs, journal entries and badges to a CSV/NDJSON file (optionally gzipped)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("user", help="User id or username")
+        parser.add_argument("--format", dest="fmt", choices=exporters.FORMATS, default="ndjson")
+        parser.add_argument("--dataset", action="append", choices=list(exporters.DATASETS),
+                            help="Dataset to export (repeatable); csv takes exactly one, default logs")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--chunk-size", type=int, default=exporters.CHUNK_SIZE)
+        parser.add_argument("--output", "-o", help="File to write, default stdout")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        ref = options["user"]
+        user = User.objects.filter(**({"pk": int(ref)} if ref.isdigit() else {"username": ref})).first()
+        if user is None:
+            raise CommandError(f"No such user: {ref}")
+
+        fmt = options["fmt"]
+        datasets = options["dataset"] or (["logs"] if fmt == "csv" else list(exporters.DATASETS))
+        if fmt == "csv" and len(datasets) != 1:
+            raise CommandError("csv exports take exactly one --dataset")
+
+        chunks = exporters.stream(user, fmt, datasets, gzip=options["gzip"], chunk_size=options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "wb") as out:
+                written = sum(out.write(chunk) for chunk in chunks)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
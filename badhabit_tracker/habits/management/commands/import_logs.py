@@ -0,0 +1,171 @@
+import csv
+import json
+import os
+import time
+from datetime import date
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from habits.models import Habit, HabitLog
+from habits.bulk import rebuild_derived
+
+
+class _ByteCounter:
+    """Line iterator over a binary file that tracks how many bytes have been handed out."""
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.offset = fh.tell()
+
+    def __iter__(self):
+        for raw in self.fh:
+            self.offset += len(raw)
+            yield raw.decode("utf-8")
+
+
+class Command(BaseCommand):
+    help = (
+        "Import HabitLog rows from a large CSV or NDJSON file in fixed-size bulk chunks. "
+        "Columns/keys: habit (name), log_date, occurrences, note, plus user (id or username) unless --user is given. "
+        "Progress is checkpointed after every chunk; rerun with --resume to continue after a failure."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=("csv", "ndjson"), help="Default: from the file extension")
+        parser.add_argument("--user", help="Import every row for this user id or username")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--create-habits", action="store_true", help="Create habits whose names are unknown")
+        parser.add_argument("--skip-existing", action="store_true",
+                            help="Keep existing logs for the same day instead of overwriting them")
+        parser.add_argument("--checkpoint", help="Checkpoint file, default <path>.checkpoint")
+        parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint offset")
+        parser.add_argument("--max-errors", type=int, default=1000, help="Abort after this many bad rows")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+        checkpoint_path = options["checkpoint"] or f"{path}.checkpoint"
+        self.options = options
+        self.users = {}
+        self.habit_maps = {}
+        self.errors = 0
+
+        state = {"offset": 0, "rows": 0, "habits": []}
+        if options["resume"] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as fh:
+                state = json.load(fh)
+            self.stdout.write(f"Resuming at byte {state['offset']} after {state['rows']} rows")
+        default_user = self._user(options["user"]) if options["user"] else None
+        touched = set(state["habits"])
+
+        started = time.perf_counter()
+        imported = 0
+        with open(path, "rb") as fh:
+            records = self._records(fh, fmt, state["offset"])
+            chunk = {}
+            for offset, record in records:
+                row = self._parse(record, default_user)
+                if row is not None:
+                    chunk[(row.habit_id, row.log_date)] = row
+                if len(chunk) >= options["chunk_size"]:
+                    imported += self._flush(chunk, touched, state, offset, checkpoint_path)
+                    chunk = {}
+                    self.stdout.write(f"{state['rows']} rows, {imported / (time.perf_counter() - started):.0f} rows/s")
+            if chunk:
+                imported += self._flush(chunk, touched, state, offset, checkpoint_path)
+
+        self.stdout.write(f"Imported {imported} rows; recomputing stats for {len(touched)} habits")
+        rebuild_derived(touched)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {state['rows']} rows, {self.errors} skipped, {time.perf_counter() - started:.1f}s"))
+
+    def _records(self, fh, fmt, offset):
+        """Yield (byte offset after the record, record dict)."""
+        if fmt == "ndjson":
+            fh.seek(offset)
+            lines = _ByteCounter(fh)
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    self._skip(line.strip(), exc)
+                    continue
+                yield lines.offset, record
+            return
+        header = next(csv.reader([fh.readline().decode("utf-8")]))
+        fh.seek(max(offset, fh.tell()))
+        lines = _ByteCounter(fh)
+        for values in csv.reader(lines):
+            if values:
+                yield lines.offset, dict(zip(header, values))
+
+    def _user(self, ref):
+        key = str(ref)
+        if key not in self.users:
+            lookup = {"pk": int(key)} if key.isdigit() else {"username": key}
+            user_id = get_user_model().objects.filter(**lookup).values_list("id", flat=True).first()
+            if user_id is None:
+                raise CommandError(f"No such user: {ref}")
+            self.users[key] = user_id
+        return self.users[key]
+
+    def _habit_id(self, user_id, name):
+        # one query per user: every habit name the user has, then new names as they get created
+        habits = self.habit_maps.get(user_id)
+        if habits is None:
+            habits = self.habit_maps[user_id] = dict(Habit.objects.filter(user_id=user_id).values_list("name", "id"))
+        if name not in habits and self.options["create_habits"]:
+            habits[name] = Habit.objects.get_or_create(user_id=user_id, name=name)[0].id
+        return habits.get(name)
+
+    def _parse(self, record, default_user):
+        try:
+            user_id = default_user if default_user is not None else self._user(record["user"])
+            habit_id = self._habit_id(user_id, record["habit"])
+            if habit_id is None:
+                raise ValueError(f"unknown habit {record['habit']!r}")
+            raw = record.get("occurrences")
+            occurrences = 1 if raw in (None, "") else int(raw)
+            if occurrences < 0:
+                raise ValueError("negative occurrences")
+            log = HabitLog(habit_id=habit_id, user_id=user_id, log_date=date.fromisoformat(record["log_date"]),
+                           occurrences=occurrences, note=record.get("note") or "")
+            # a file (or NDJSON record) without a note column leaves existing notes alone
+            log._has_note = "note" in record
+            return log
+        except (KeyError, ValueError, TypeError, CommandError) as exc:
+            self._skip(record, exc)
+            return None
+
+    def _skip(self, record, exc):
+        self.errors += 1
+        if self.errors <= 20:
+            self.stderr.write(f"skipping {record!r}: {exc}")
+        if self.errors > self.options["max_errors"]:
+            raise CommandError("Too many bad rows, aborting (rerun with --resume after fixing the file)")
+
+    def _flush(self, chunk, touched, state, offset, checkpoint_path):
+        logs = list(chunk.values())
+        # bulk_create skips post_save, so no per-row signal work; derived stats are rebuilt at the end
+        with transaction.atomic():
+            for has_note in (True, False):
+                rows = [log for log in logs if log._has_note == has_note]
+                if not rows:
+                    continue
+                update_fields = ("occurrences", "note", "updated_at") if has_note else ("occurrences", "updated_at")
+                conflict = ({"ignore_conflicts": True} if self.options["skip_existing"] else
+                            {"update_conflicts": True, "unique_fields": ("habit", "log_date"),
+                             "update_fields": update_fields})
+                HabitLog.objects.bulk_create(rows, batch_size=1000, **conflict)
+        touched.update(log.habit_id for log in logs)
+        state.update(offset=offset, rows=state["rows"] + len(logs), habits=sorted(touched))
+        tmp = f"{checkpoint_path}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(state, fh)
+        os.replace(tmp, checkpoint_path)
+        return len(logs)
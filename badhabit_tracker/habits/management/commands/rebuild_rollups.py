@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from habits.models import Habit
+from habits import rollups, caching
+
+
+class Command(BaseCommand):
+    help = "Backfill or repair the per-habit daily/week/month/year rollups from raw HabitLog rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="Only rebuild habits of this user id")
+        parser.add_argument("--habit", type=int, action="append", help="Only rebuild this habit id (repeatable)")
+
+    def handle(self, *args, **options):
+        habits = Habit.objects.order_by("id")
+        if options["user"]:
+            habits = habits.filter(user_id=options["user"])
+        if options["habit"]:
+            habits = habits.filter(id__in=options["habit"])
+
+        rebuilt = days = 0
+        user_ids = set()
+        for habit_id, user_id in habits.values_list("id", "user_id").iterator(chunk_size=1000):
+            days += rollups.rebuild_habit(habit_id)
+            rebuilt += 1
+            user_ids.add(user_id)
+        caching.bump(user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups for {rebuilt} habits ({days} active days)."))
@@ -0,0 +1,64 @@
+import multiprocessing
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import django
+from django.core.management.base import BaseCommand
+from habits import recompute
+from habits.models import RecomputeCheckpoint
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute rollups, streaks, leaderboard scores and badges for every user, sharded by user id over "
+        "--workers processes. Progress is checkpointed per shard; rerun the same --job to resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes (1 runs in this process)")
+        parser.add_argument("--shard-size", type=int, default=1000, help="User ids per shard")
+        parser.add_argument("--batch-size", type=int, default=recompute.USER_BATCH,
+                            help="Users per committed batch (the checkpoint granularity)")
+        parser.add_argument("--job", default="recompute-stats", help="Checkpoint namespace of this run")
+        parser.add_argument("--restart", action="store_true", help="Drop the job's checkpoints and start over")
+
+    def handle(self, *args, **options):
+        job = options["job"]
+        if options["restart"]:
+            RecomputeCheckpoint.objects.filter(job=job).delete()
+        shards = recompute.plan_shards(job, options["shard_size"])
+        if not shards:
+            self.stdout.write(self.style.SUCCESS(f"Job {job!r}: every shard is already done (use --restart)."))
+            return
+        self.stdout.write(f"Job {job!r}: {len(shards)} shards to run on {options['workers']} worker(s).")
+
+        started = time.perf_counter()
+        workers = defaultdict(lambda: defaultdict(float))
+        for result in self._run(shards, options):
+            lo, hi = result["shard"]
+            self.stdout.write(f"  shard {lo}-{hi}: {result['users']} users, {result['habits']} habits, "
+                              f"{result['rows']} rows in {result['seconds']:.2f}s "
+                              f"({result['rows'] / max(result['seconds'], 1e-9):.0f} rows/s, pid {result['pid']})")
+            for name in ("users", "habits", "rows", "seconds"):
+                workers[result["pid"]][name] += result[name]
+
+        elapsed = time.perf_counter() - started
+        for pid, totals in sorted(workers.items()):
+            self.stdout.write(f"worker {pid}: {totals['rows']:.0f} rows, {totals['users']:.0f} users in "
+                              f"{totals['seconds']:.2f}s busy ({totals['rows'] / max(totals['seconds'], 1e-9):.0f} rows/s)")
+        rows = sum(t["rows"] for t in workers.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {sum(t['users'] for t in workers.values()):.0f} users, {rows:.0f} rows in {elapsed:.2f}s "
+            f"({rows / max(elapsed, 1e-9):.0f} rows/s overall)."))
+
+    def _run(self, shards, options):
+        if options["workers"] <= 1:
+            for shard in shards:
+                yield recompute.run_shard(shard.id, options["batch_size"])
+            return
+        # spawned workers set Django up afresh and open their own database connections
+        with ProcessPoolExecutor(max_workers=options["workers"], mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=django.setup) as pool:
+            futures = [pool.submit(recompute.run_shard, shard.id, options["batch_size"]) for shard in shards]
+            for future in as_completed(futures):
+                yield future.result()
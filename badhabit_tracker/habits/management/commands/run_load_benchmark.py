@@ -0,0 +1,211 @@
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from habits import leaderboards
+from habits.models import Habit
+from habits.seeding import make_rng
+from habits.utils import today_utc_date
+
+DEFAULT_MIX = "habit_list=30,report=15,analytics=15,summary=10,leaderboard=20,log_post=10"
+
+
+def _habit_list(rng, habit_id):
+    return "get", reverse("habit-list"), None
+
+
+def _report(rng, habit_id):
+    return "get", reverse("habit-report", kwargs={"pk": habit_id}), None
+
+
+def _analytics(rng, habit_id):
+    return "get", reverse("habit-analytics", kwargs={"habit_id": habit_id}), None
+
+
+def _summary(rng, habit_id):
+    return "get", reverse("user-habits-summary"), None
+
+
+def _leaderboard(rng, habit_id):
+    return "get", reverse("leaderboard", kwargs={"board": rng.choice(leaderboards.BOARDS)}), None
+
+
+def _log_post(rng, habit_id):
+    return "post", reverse("habit-logs", kwargs={"pk": habit_id}), {
+        "log_date": today_utc_date().isoformat(), "occurrences": rng.randint(1, 5)}
+
+
+def _async_report(rng, habit_id):
+    return "get", reverse("async-habit-report", kwargs={"pk": habit_id}), None
+
+
+def _async_analytics(rng, habit_id):
+    return "get", reverse("async-habit-analytics", kwargs={"habit_id": habit_id}), None
+
+
+def _async_dashboard(rng, habit_id):
+    return "get", reverse("async-dashboard"), None
+
+
+# endpoint name -> (rng, habit id) -> (method, path, json body)
+ENDPOINTS = {
+    "habit_list": _habit_list,
+    "report": _report,
+    "analytics": _analytics,
+    "summary": _summary,
+    "leaderboard": _leaderboard,
+    "log_post": _log_post,
+    # native async views (habits.async_views); compare against report/analytics with --interface asgi
+    "async_report": _async_report,
+    "async_analytics": _async_analytics,
+    "async_dashboard": _async_dashboard,
+}
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS or not weight.isdigit():
+            raise CommandError(f"Bad --mix entry {part!r}; endpoints: {', '.join(ENDPOINTS)}")
+        mix[name] = int(weight)
+    return mix
+
+
+def allowed_host():
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted mix of API calls against the in-process WSGI or ASGI app with concurrent workers "
+        "and report throughput and p50/p95/p99 latency per endpoint. Run seed_load_data first; the request "
+        "plan is fixed by --seed, so runs on the same dataset are comparable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="load", help="Act as users named <prefix>-*")
+        parser.add_argument("--users", type=int, default=100, help="How many seeded users to spread calls over")
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--warmup", type=int, default=50, help="Untimed requests per worker before the run")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help="Comma-separated endpoint=weight")
+        parser.add_argument("--interface", choices=("wsgi", "asgi"), default="wsgi")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--output", help="Also write the results as JSON to this path")
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options["mix"])
+        users = list(get_user_model().objects.filter(username__startswith=f"{options['prefix']}-")
+                     .order_by("id")[:options["users"]])
+        habits = defaultdict(list)
+        for habit_id, user_id in Habit.objects.filter(user__in=users).order_by("id").values_list("id", "user_id"):
+            habits[user_id].append(habit_id)
+        users = [u for u in users if habits[u.id]]
+        if not users:
+            raise CommandError(f"No {options['prefix']}-* users with habits; run seed_load_data first")
+        tokens = {u.id: f"Bearer {AccessToken.for_user(u)}" for u in users}
+
+        workers = options["workers"]
+        per_worker = -(-options["requests"] // workers)
+        plans = []
+        for w in range(workers):
+            rng = make_rng(options["seed"], "bench", w)
+            plan = []
+            for _ in range(options["warmup"] + per_worker):
+                name = rng.choices(list(mix), weights=list(mix.values()))[0]
+                user = rng.choice(users)
+                method, path, body = ENDPOINTS[name](rng, rng.choice(habits[user.id]))
+                plan.append((name, tokens[user.id], method, path, body))
+            plans.append(plan)
+
+        run = self._run_asgi if options["interface"] == "asgi" else self._run_wsgi
+        samples, wall = run(plans, options["warmup"])
+        self._report(samples, wall, options)
+
+    def _run_wsgi(self, plans, warmup):
+        results = [None] * len(plans)
+        barrier = threading.Barrier(len(plans) + 1)
+
+        def worker(i):
+            client = Client(raise_request_exception=False, headers={"host": allowed_host()})
+            samples = []
+            try:
+                for n, (name, token, method, path, body) in enumerate(plans[i]):
+                    if n == warmup:
+                        barrier.wait()
+                    started = time.perf_counter()
+                    response = getattr(client, method)(path, body, content_type="application/json",
+                                                       headers={"authorization": token})
+                    if n >= warmup:
+                        samples.append((name, response.status_code, time.perf_counter() - started))
+            finally:
+                results[i] = samples
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(plans))]
+        for t in threads:
+            t.start()
+        barrier.wait()  # every worker has finished its warmup
+        started = time.perf_counter()
+        for t in threads:
+            t.join()
+        return [s for samples in results for s in samples], time.perf_counter() - started
+
+    def _run_asgi(self, plans, warmup):
+        # sync DRF views run through sync_to_async, so this measures what an ASGI server would see
+        async def worker(plan, client, timed):
+            samples = []
+            for name, token, method, path, body in plan:
+                started = time.perf_counter()
+                response = await getattr(client, method)(path, body, content_type="application/json",
+                                                         headers={"authorization": token})
+                samples.append((name, response.status_code, time.perf_counter() - started))
+            return samples if timed else []
+
+        async def main():
+            client = AsyncClient(raise_request_exception=False, headers={"host": allowed_host()})
+            await asyncio.gather(*(worker(p[:warmup], client, False) for p in plans))
+            started = time.perf_counter()
+            results = await asyncio.gather(*(worker(p[warmup:], client, True) for p in plans))
+            return [s for samples in results for s in samples], time.perf_counter() - started
+
+        return asyncio.run(main())
+
+    def _report(self, samples, wall, options):
+        by_endpoint = defaultdict(list)
+        for name, status, secs in samples:
+            by_endpoint[name].append((status, secs))
+        rows = {}
+        for name, calls in sorted(by_endpoint.items()) + [("TOTAL", [(s, t) for _, s, t in samples])]:
+            latencies = np.array([secs for _, secs in calls]) * 1000
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            rows[name] = {
+                "requests": len(calls),
+                "errors": sum(1 for status, _ in calls if status >= 400),
+                "rps": len(calls) / wall,
+                "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+            }
+
+        self.stdout.write(f"{options['interface']}, {options['workers']} workers, {len(samples)} requests "
+                          f"in {wall:.2f}s")
+        self.stdout.write(f"{'endpoint':<12} {'reqs':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, r in rows.items():
+            self.stdout.write(f"{name:<12} {r['requests']:>6} {r['errors']:>6} {r['rps']:>8.1f} "
+                              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump({"interface": options["interface"], "workers": options["workers"], "seconds": wall,
+                           "endpoints": rows}, fh, indent=2)
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from habits import reminders
+from habits.tasks import deliver_reminders_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Long-running alternative to the dispatch-reminders beat entry: once a minute, enqueue delivery "
+        "batches for the reminders due in that minute (plus any missed minutes). Safe to run next to beat "
+        "or to restart; batches already claimed are not sent again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Dispatch the current minute and exit")
+        parser.add_argument("--catch-up", type=int, default=reminders.CATCH_UP_MINUTES,
+                            help="Earlier minutes re-checked on every run")
+
+    def enqueue(self, ids, minute):
+        deliver_reminders_task.delay(ids, minute.isoformat())
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            sent = reminders.dispatch(self.enqueue, catch_up=options["catch_up"])
+            for minute, count in sent.items():
+                if count:
+                    self.stdout.write(f"{minute:%H:%M}: enqueued {count} reminders")
+            if options["once"]:
+                return
+            now = timezone.now()
+            time.sleep(60 - now.second - now.microsecond / 1e6 + 0.05)
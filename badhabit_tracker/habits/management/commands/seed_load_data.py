@@ -0,0 +1,150 @@
+import time
+from collections import defaultdict
+from datetime import date, time as dt_time, timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from habits.models import (
+    Habit, HabitLog, HabitDailyStat, HabitPeriodStat, JournalEntry, Reminder,
+)
+from habits import leaderboards, badges
+from habits.rollups import PERIODS
+from habits.seeding import activity_level, active_runs, habit_specs, journal_text, make_rng, MOODS
+from habits.utils import today_utc_date
+
+class _Writer:
+    """Buffers row tuples per model and inserts them with executemany.
+
+    The history tables hold nearly all generated rows; skipping model instances and the bulk_create
+    compiler for them is what keeps seeding in the millions of rows per minute.
+    """
+    columns = {
+        HabitLog: ("habit", "user", "log_date", "occurrences", "note", "created_at", "updated_at"),
+        HabitDailyStat: ("habit", "day", "occurrences"),
+        HabitPeriodStat: ("habit", "period", "period_start", "occurrences"),
+    }
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.buffers = defaultdict(list)
+        self.written = 0
+
+    def add(self, model, row):
+        buf = self.buffers[model]
+        buf.append(row)
+        if len(buf) >= self.batch_size:
+            self.flush(model)
+
+    def _sql(self, model):
+        qn = connection.ops.quote_name
+        cols = [model._meta.get_field(f).column for f in self.columns[model]]
+        return (f"INSERT INTO {qn(model._meta.db_table)} ({', '.join(map(qn, cols))}) "
+                f"VALUES ({', '.join(['%s'] * len(cols))})")
+
+    def flush(self, model=None):
+        for m in [model] if model else list(self.buffers):
+            rows = self.buffers.pop(m, [])
+            if rows:
+                with connection.cursor() as cursor:
+                    cursor.executemany(self._sql(m), rows)
+                self.written += len(rows)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset for load testing: skewed (Pareto) activity per user, "
+        "streaky log histories, journal entries, reminders and badges, written with bulk_create. "
+        "Rollups, streak state and leaderboards are computed in memory, so the data is ready to query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--habits-per-user", type=int, default=5)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--end-date", type=date.fromisoformat, help="Last day of history, default today (UTC)")
+        parser.add_argument("--prefix", default="load", help="Usernames are <prefix>-<n>")
+        parser.add_argument("--password", default="load-pass", help="Password set on every generated user")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--user-chunk", type=int, default=200, help="Users written per transaction")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Users named {prefix}-* already exist; pick another --prefix")
+        self.options = options
+        self.end = options["end_date"] or today_utc_date()
+        self.start = self.end - timedelta(days=options["days"] - 1)
+        self.password = make_password(options["password"])  # hashed once, shared by every user
+        self.now = connection.ops.adapt_datetimefield_value(timezone.now())
+        writer = _Writer(options["batch_size"])
+
+        started = time.perf_counter()
+        user_ids = []
+        for first in range(0, options["users"], options["user_chunk"]):
+            numbers = range(first, min(first + options["user_chunk"], options["users"]))
+            with transaction.atomic():
+                user_ids += self._seed_users(User, numbers, writer)
+                writer.flush()
+                JournalEntry.objects.bulk_create(self.entries, batch_size=options["batch_size"])
+                Reminder.objects.bulk_create(self.reminders, batch_size=options["batch_size"])
+                writer.written += len(self.entries) + len(self.reminders)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{len(user_ids)} users, {writer.written} rows, {writer.written / elapsed:.0f} rows/s")
+
+        leaderboards.refresh_users(user_ids, self.end)
+        badges.evaluate(user_ids)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(user_ids)} users, {writer.written} rows in {elapsed:.1f}s "
+            f"({writer.written / elapsed * 60 / 1e6:.2f}M rows/min)"))
+
+    def _seed_users(self, User, numbers, writer):
+        prefix, seed = self.options["prefix"], self.options["seed"]
+        self.entries, self.reminders = [], []
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix}-{n}", email=f"{prefix}-{n}@example.com", password=self.password) for n in numbers])
+        for n, user in zip(numbers, users):
+            rng = make_rng(seed, "user", n)
+            level = activity_level(rng)
+            specs = habit_specs(rng, self.options["habits_per_user"])
+            habits = Habit.objects.bulk_create([
+                Habit(user=user, name=name, category=category, target_frequency=rng.randint(0, 3))
+                for name, category in specs])
+            for i, habit in enumerate(habits):
+                self._seed_habit(make_rng(seed, "habit", n, i), habit, level, writer)
+            Habit.objects.bulk_update(habits, ("current_streak", "longest_streak", "last_logged_date"))
+
+            for _ in range(int(self.options["days"] * level / 7) + 1):
+                habit = rng.choice(habits)
+                self.entries.append(JournalEntry(user=user, habit=habit, entry=journal_text(rng, habit.name),
+                                                 mood=rng.choice(MOODS)))
+        return [u.id for u in users]
+
+    def _seed_habit(self, rng, habit, level, writer):
+        """Queue the habit's logs, daily and period rollups and reminders; set its streak fields."""
+        adapt = connection.ops.adapt_datefield_value
+        periods = {period: defaultdict(int) for period, _, _ in PERIODS}
+        longest = 0
+        for first, length in active_runs(rng, self.start, self.end, level):
+            longest = max(longest, length)
+            day = first
+            for _ in range(length):
+                occurrences = 1 + int(rng.expovariate(0.6))
+                value = adapt(day)
+                writer.add(HabitLog, (habit.id, habit.user_id, value, occurrences, "", self.now, self.now))
+                writer.add(HabitDailyStat, (habit.id, value, occurrences))
+                for period, floor, _ in PERIODS:
+                    periods[period][floor(day)] += occurrences
+                day += timedelta(days=1)
+            habit.current_streak, habit.last_logged_date = length, day - timedelta(days=1)
+        habit.longest_streak = longest
+
+        for period, totals in periods.items():
+            for period_start, occurrences in totals.items():
+                writer.add(HabitPeriodStat, (habit.id, period, adapt(period_start), occurrences))
+        for _ in range(rng.choice((0, 0, 1, 1, 2))):
+            self.reminders.append(Reminder(habit=habit, reminder_time=dt_time(rng.randint(6, 22), rng.choice((0, 15, 30, 45)))))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from habits.models import Habit
+from habits import streaks, caching
+
+
+class Command(BaseCommand):
+    help = "Recompute habit streak state from raw HabitLog rows and report (or fix) any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="Only verify habits of this user id")
+        parser.add_argument("--fix", action="store_true", help="Write the recomputed state back")
+
+    def handle(self, *args, **options):
+        habits = Habit.objects.only("id", "user_id", *streaks.STREAK_FIELDS).order_by("id")
+        if options["user"]:
+            habits = habits.filter(user_id=options["user"])
+
+        checked = drifted = 0
+        fixed_users = set()
+        for habit in habits.iterator(chunk_size=1000):
+            stored = tuple(getattr(habit, f) for f in streaks.STREAK_FIELDS)
+            streaks.recompute(habit, source="logs")
+            expected = tuple(getattr(habit, f) for f in streaks.STREAK_FIELDS)
+            checked += 1
+            if stored == expected:
+                continue
+            drifted += 1
+            self.stdout.write(f"habit {habit.id}: stored {stored} != expected {expected}")
+            if options["fix"]:
+                habit.save(update_fields=streaks.STREAK_FIELDS)
+                fixed_users.add(habit.user_id)
+        caching.bump(fixed_users)
+
+        msg = f"Checked {checked} habits, {drifted} drifted" + (" (fixed)." if options["fix"] and drifted else ".")
+        self.stdout.write(self.style.SUCCESS(msg) if not drifted or options["fix"] else self.style.WARNING(msg))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0003_badge_journalentry_reminder_userbadge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabitDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('occurrences', models.PositiveIntegerField(default=0)),
+                ('habit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='habits.habit')),
+            ],
+            options={
+                'ordering': ('-day',),
+                'unique_together': {('habit', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='HabitPeriodStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month'), ('year', 'Year')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('occurrences', models.PositiveIntegerField(default=0)),
+                ('habit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='period_stats', to='habits.habit')),
+            ],
+            options={
+                'ordering': ('period', '-period_start'),
+                'unique_together': {('habit', 'period', 'period_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0004_habitdailystat_habitperiodstat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='habit',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='last_logged_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='longest_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
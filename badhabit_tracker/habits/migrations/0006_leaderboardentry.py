@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0005_habit_streak_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('total', 'All-time occurrences'), ('7d', 'Occurrences, last 7 days'), ('30d', 'Occurrences, last 30 days'), ('streak', 'Best current streak')], max_length=10)),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('board', '-score', 'user'),
+                'indexes': [models.Index(fields=['board', '-score', 'user'], name='leaderboard_rank_idx')],
+                'unique_together': {('board', 'user')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0006_leaderboardentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='habitlog',
+            index=models.Index(fields=['-log_date', '-id'], name='habitlog_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='journal_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(fields=['habit', '-created_at', '-id'], name='reminder_keyset_idx'),
+        ),
+    ]
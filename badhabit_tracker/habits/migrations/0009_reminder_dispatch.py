@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0008_badge_rules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderDispatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minute', models.DateTimeField()),
+                ('batch', models.PositiveIntegerField()),
+                ('reminders', models.PositiveIntegerField()),
+                ('complete', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(fields=['reminder_time', 'id'], name='reminder_due_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reminderdispatch',
+            unique_together={('minute', 'batch')},
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:28
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # existing rows get the migration time from AddField; their creation time is the better guess
+    for name in ('Habit', 'HabitLog', 'JournalEntry', 'Reminder', 'ReplacementPlan'):
+        apps.get_model('habits', name).objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0010_user_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='habit',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='habitlog',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='journalentry',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='reminder',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='replacementplan',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0011_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecomputeCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=50)),
+                ('first_user_id', models.PositiveIntegerField()),
+                ('last_user_id', models.PositiveIntegerField()),
+                ('processed_through', models.PositiveIntegerField(blank=True, null=True)),
+                ('users', models.PositiveIntegerField(default=0)),
+                ('habits', models.PositiveIntegerField(default=0)),
+                ('rows', models.PositiveBigIntegerField(default=0)),
+                ('seconds', models.FloatField(default=0)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('job', 'first_user_id'),
+                'unique_together': {('job', 'first_user_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0012_recompute_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RenameIndex(
+            model_name='habitlog',
+            new_name='habitlog_admin_idx',
+            old_name='habitlog_keyset_idx',
+        ),
+        migrations.AddIndex(
+            model_name='habitlog',
+            index=models.Index(fields=['habit', '-log_date', '-id'], name='habitlog_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:05
+
+from django.db import migrations
+
+
+def merge_duplicate_badges(apps, schema_editor):
+    # get_or_create on a non-unique name could race into duplicates; keep the oldest row per name
+    Badge = apps.get_model('habits', 'Badge')
+    UserBadge = apps.get_model('habits', 'UserBadge')
+    keep = {}
+    for badge_id, name in Badge.objects.order_by('id').values_list('id', 'name'):
+        if name not in keep:
+            keep[name] = badge_id
+            continue
+        owners = set(UserBadge.objects.filter(badge_id=keep[name]).values_list('user_id', flat=True))
+        UserBadge.objects.filter(badge_id=badge_id, user_id__in=owners).delete()
+        UserBadge.objects.filter(badge_id=badge_id).update(badge_id=keep[name])
+        Badge.objects.filter(id=badge_id).delete()
+
+
+class Migration(migrations.Migration):
+    # data only; the unique constraint follows in its own migration (and transaction), 0015
+
+    dependencies = [
+        ('habits', '0013_habitlog_keyset_per_habit'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_badges, migrations.RunPython.noop),
+    ]
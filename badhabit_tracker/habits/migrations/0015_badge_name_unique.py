@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0014_merge_duplicate_badges'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='badge',
+            name='name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:10
+
+import datetime
+from django.db import migrations, models
+
+
+def drop_unranged_dispatches(apps, schema_editor):
+    # claims without a key range cannot be resumed from; at worst the last CATCH_UP_MINUTES are re-checked
+    apps.get_model('habits', 'ReminderDispatch').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0015_badge_name_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_unranged_dispatches, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='reminderdispatch',
+            name='first_time',
+            field=models.TimeField(default=datetime.time(0, 0)),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='reminderdispatch',
+            name='first_id',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='reminderdispatch',
+            name='last_time',
+            field=models.TimeField(default=datetime.time(0, 0)),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='reminderdispatch',
+            name='last_id',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def copy_habit_owner(apps, schema_editor):
+    # one bounded UPDATE per id range, so no single statement rewrites the whole table
+    HabitLog = apps.get_model('habits', 'HabitLog')
+    Habit = apps.get_model('habits', 'Habit')
+    owner = Subquery(Habit.objects.filter(id=OuterRef('habit_id')).values('user_id')[:1])
+    last = HabitLog.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    for start in range(0, last, BATCH_SIZE):
+        HabitLog.objects.filter(id__gt=start, id__lte=start + BATCH_SIZE).update(user_id=owner)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0016_reminderdispatch_key_range'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='habitlog',
+            name='user',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE,
+                                    related_name='habit_logs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(copy_habit_owner, migrations.RunPython.noop),
+    ]
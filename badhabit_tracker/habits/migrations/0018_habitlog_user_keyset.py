@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0017_habitlog_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='habitlog',
+            name='user',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE,
+                                    related_name='habit_logs', to=settings.AUTH_USER_MODEL),
+        ),
+        # the unique (habit, log_date) already orders one habit's logs
+        migrations.RemoveIndex(
+            model_name='habitlog',
+            name='habitlog_keyset_idx',
+        ),
+        migrations.AddIndex(
+            model_name='habitlog',
+            index=models.Index(fields=['user', '-log_date', '-id'], name='habitlog_user_keyset_idx'),
+        ),
+    ]
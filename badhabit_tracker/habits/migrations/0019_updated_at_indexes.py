@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0018_habitlog_user_keyset'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='habit',
+            index=models.Index(fields=['updated_at'], name='habit_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='habitlog',
+            index=models.Index(fields=['updated_at', 'id'], name='habitlog_updated_idx'),
+        ),
+    ]
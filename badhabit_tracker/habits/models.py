@@ -18,31 +18,114 @@ class Habit(models.Model):
     description = models.TextField(blank=True, null=True)
     target_frequency = models.IntegerField(default=0)  # number of occurrences expected
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # streak state, maintained by habits.streaks; current_streak is the run ending at last_logged_date
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_logged_date = models.DateField(blank=True, null=True)
 
     class Meta:
         unique_together = ("user", "name")
         ordering = ("-created_at",)
+        # warehouse.etl reads the habits edited since its watermark
+        indexes = [models.Index(fields=["updated_at"], name="habit_updated_idx")]
 
     def __str__(self):
         return f"{self.name} ({self.user})"
 
 
+class HabitLogQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # rows built with only a habit get its owner; one lookup for the habits that are not loaded
+        objs = list(objs)
+        missing = {log.habit_id for log in objs if log.user_id is None and not HabitLog.habit.is_cached(log)}
+        owners = dict(Habit.objects.filter(id__in=missing).values_list("id", "user_id")) if missing else {}
+        for log in objs:
+            if log.user_id is None:
+                log.user_id = log.habit.user_id if HabitLog.habit.is_cached(log) else owners.get(log.habit_id)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class HabitLog(models.Model):
     id = models.AutoField(primary_key=True)
     habit = models.ForeignKey(Habit, related_name="logs", on_delete=models.CASCADE)
+    # the habit's owner, copied so a user's logs across habits are one index range (see save())
+    user = models.ForeignKey(User, related_name="habit_logs", on_delete=models.CASCADE, editable=False)
     log_date = models.DateField()  # date of the log
     occurrences = models.PositiveIntegerField(default=1)
     note = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = HabitLogQuerySet.as_manager()
 
     class Meta:
         unique_together = ("habit", "log_date")
         ordering = ("-log_date",)
+        # keyset pagination: a user's cross-habit pages (/api/logs/) walk the user index; per-habit pages walk
+        # the unique (habit, log_date), where log_date already decides the order. The global index serves the
+        # admin changelist, its date_hierarchy bounds and its log_date filter over every user's rows. warehouse.etl
+        # pages through the logs edited since its watermark in (updated_at, id) order
+        indexes = [models.Index(fields=["user", "-log_date", "-id"], name="habitlog_user_keyset_idx"),
+                   models.Index(fields=["-log_date", "-id"], name="habitlog_admin_idx"),
+                   models.Index(fields=["updated_at", "id"], name="habitlog_updated_idx")]
 
     def __str__(self):
         return f"Log {self.habit.name} @ {self.log_date}"
 
+    def save(self, *args, **kwargs):
+        if self.user_id is None or self.habit_id != getattr(self, "_loaded_key", (None,))[0]:
+            self.user_id = self.habit.user_id
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "user"}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember where the row lived so edits that move it can refresh both days
+        loaded = dict(zip(field_names, values))
+        instance._loaded_key = (loaded.get("habit_id"), loaded.get("log_date"))
+        return instance
+
+
+class HabitDailyStat(models.Model):
+    habit = models.ForeignKey(Habit, related_name="daily_stats", on_delete=models.CASCADE)
+    day = models.DateField()
+    occurrences = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("habit", "day")
+        ordering = ("-day",)
+
+    def __str__(self):
+        return f"{self.habit_id} @ {self.day}: {self.occurrences}"
+
+
+class HabitPeriodStat(models.Model):
+    WEEK = "week"
+    MONTH = "month"
+    YEAR = "year"
+    PERIOD_CHOICES = [
+        (WEEK, "Week"),
+        (MONTH, "Month"),
+        (YEAR, "Year"),
+    ]
+
+    habit = models.ForeignKey(Habit, related_name="period_stats", on_delete=models.CASCADE)
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    occurrences = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("habit", "period", "period_start")
+        ordering = ("period", "-period_start")
+
+    def __str__(self):
+        return f"{self.habit_id} {self.period} {self.period_start}: {self.occurrences}"
+
 
 class ReplacementPlan(models.Model):
     id = models.AutoField(primary_key=True)
@@ -50,6 +133,7 @@ class ReplacementPlan(models.Model):
     activity = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("habit", "activity")
@@ -88,9 +172,15 @@ class Reminder(models.Model):
     reminder_time = models.TimeField()
     message = models.CharField(max_length=255, default="Stay strong 💪")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["habit", "-created_at", "-id"], name="reminder_keyset_idx"),
+            # the scheduler reads each minute's reminders in (reminder_time, id) order
+            models.Index(fields=["reminder_time", "id"], name="reminder_due_idx"),
+        ]
 
     def __str__(self):
         return f"Reminder {self.habit.name} @ {self.reminder_time}"
@@ -103,15 +193,17 @@ class JournalEntry(models.Model):
     entry = models.TextField()
     mood = models.CharField(max_length=50, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [models.Index(fields=["user", "-created_at", "-id"], name="journal_keyset_idx")]
 
     def __str__(self):
         return f"Journal by {self.user} @ {self.created_at}"
 
 class Badge(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     icon = models.CharField(max_length=100, blank=True, null=True)  # e.g., emoji or icon path
 
@@ -128,4 +220,91 @@ class UserBadge(models.Model):
         unique_together = ('user', 'badge')
 
     def __str__(self):
-        return f"{self.user} - {self.badge.name}"
\ No newline at end of file
+        return f"{self.user} - {self.badge.name}"
+
+
+class LeaderboardEntry(models.Model):
+    TOTAL = "total"
+    LAST_7_DAYS = "7d"
+    LAST_30_DAYS = "30d"
+    STREAK = "streak"
+    BOARD_CHOICES = [
+        (TOTAL, "All-time occurrences"),
+        (LAST_7_DAYS, "Occurrences, last 7 days"),
+        (LAST_30_DAYS, "Occurrences, last 30 days"),
+        (STREAK, "Best current streak"),
+    ]
+
+    board = models.CharField(max_length=10, choices=BOARD_CHOICES)
+    user = models.ForeignKey(User, related_name="leaderboard_entries", on_delete=models.CASCADE)
+    score = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("board", "user")
+        indexes = [models.Index(fields=["board", "-score", "user"], name="leaderboard_rank_idx")]
+        ordering = ("board", "-score", "user")
+
+    def __str__(self):
+        return f"{self.board}: {self.user} ({self.score})"
+
+
+class PendingBadgeCheck(models.Model):
+    """Users whose stats changed since the badge rules last ran; drained in batches by habits.badges."""
+    user = models.OneToOneField(User, related_name="+", on_delete=models.CASCADE)
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+
+class ReminderDispatch(models.Model):
+    """One enqueued delivery batch; the unique (minute, batch) key stops a restarted scheduler re-sending it."""
+    minute = models.DateTimeField()
+    batch = models.PositiveIntegerField()
+    reminders = models.PositiveIntegerField()
+    # (reminder_time, id) keys of the batch's first and last reminder; later runs resume after the last one
+    first_time = models.TimeField()
+    first_id = models.PositiveIntegerField()
+    last_time = models.TimeField()
+    last_id = models.PositiveIntegerField()
+    # set on the minute's last batch once every batch is claimed, so catch-up runs skip the minute
+    complete = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("minute", "batch")
+
+    def __str__(self):
+        return f"{self.minute:%Y-%m-%d %H:%M} batch {self.batch} ({self.reminders})"
+
+
+class UserDataVersion(models.Model):
+    """Bumped on every write to a user's habits, logs, plans, reminders or journal.
+
+    Part of every cached report key (habits.caching) and of the API's ETag/Last-Modified validators (habits.conditional).
+    """
+    user = models.OneToOneField(User, primary_key=True, related_name="+", on_delete=models.CASCADE)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} v{self.version}"
+
+
+class RecomputeCheckpoint(models.Model):
+    """Progress of one user-id shard of a recompute_stats job; a rerun resumes after ``processed_through``."""
+    job = models.CharField(max_length=50)
+    first_user_id = models.PositiveIntegerField()
+    last_user_id = models.PositiveIntegerField()
+    processed_through = models.PositiveIntegerField(blank=True, null=True)
+    users = models.PositiveIntegerField(default=0)
+    habits = models.PositiveIntegerField(default=0)
+    rows = models.PositiveBigIntegerField(default=0)
+    seconds = models.FloatField(default=0)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("job", "first_user_id")
+        ordering = ("job", "first_user_id")
+
+    def __str__(self):
+        return f"{self.job} [{self.first_user_id}, {self.last_user_id}] through {self.processed_through}"
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from collections import namedtuple
+from functools import lru_cache
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from aiohttp_retry import ExponentialRetry, RetryClient
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.rest import Client
+
+# ``to`` may be None for the backend's default recipient; ``key`` identifies the message in stats
+Message = namedtuple("Message", "to body key", defaults=(None,))
+
+
+class BaseBackend:
+    """Delivers messages with bounded concurrency on one event loop; subclasses implement ``send``.
+
+    ``open``/``close`` bracket a whole batch, so clients and their connection pools are shared by
+    every message in it.
+    """
+
+    def __init__(self, concurrency=None, **options):
+        self.concurrency = concurrency or settings.NOTIFICATION_CONCURRENCY
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send(self, message):
+        raise NotImplementedError
+
+    async def send_batch_async(self, messages):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        failed = []
+
+        async def deliver(message):
+            async with semaphore:
+                try:
+                    await self.send(message)
+                except Exception as exc:
+                    failed.append((message.key, f"{type(exc).__name__}: {exc}"))
+
+        started = time.perf_counter()
+        await self.open()
+        try:
+            await asyncio.gather(*(deliver(m) for m in messages))
+        finally:
+            await self.close()
+        seconds = time.perf_counter() - started
+        sent = len(messages) - len(failed)
+        return {
+            "backend": type(self).__name__,
+            "sent": sent,
+            "failed": len(failed),
+            "errors": failed[:20],
+            "seconds": round(seconds, 4),
+            "per_second": round(sent / seconds, 1) if seconds else 0.0,
+        }
+
+    def send_batch(self, messages):
+        """Deliver ``messages`` and return the batch stats: sent, failed, errors (first 20), seconds, per_second."""
+        return asyncio.run(self.send_batch_async(list(messages)))
+
+
+class ConsoleBackend(BaseBackend):
+    async def send(self, message):
+        print(f"[notification to {message.to or 'default'}] {message.body}")
+
+
+class MemoryBackend(BaseBackend):
+    """Keeps messages in ``MemoryBackend.outbox`` instead of sending them; for tests."""
+    outbox = []
+
+    async def send(self, message):
+        self.outbox.append(message)
+
+
+class HttpBackend(BaseBackend):
+    """POSTs {"to", "body", "key"} as JSON to ``url``; retries 429/5xx and connection errors with backoff.
+
+    Meant for a local stand-in service (see ``bench_notifications``) or an internal gateway.
+    """
+
+    def __init__(self, url=None, attempts=3, timeout=10, **options):
+        super().__init__(**options)
+        self.url = url or settings.NOTIFICATION_HTTP_URL
+        self.attempts = attempts
+        self.timeout = timeout
+        self.client = None
+
+    async def open(self):
+        session = ClientSession(connector=TCPConnector(limit=self.concurrency),
+                                timeout=ClientTimeout(total=self.timeout))
+        retry = ExponentialRetry(attempts=self.attempts, start_timeout=0.05, statuses={429, 500, 502, 503, 504})
+        self.client = RetryClient(client_session=session, retry_options=retry)
+
+    async def close(self):
+        await self.client.close()
+
+    async def send(self, message):
+        async with self.client.post(self.url, json=message._asdict()) as response:
+            response.raise_for_status()
+
+
+class TwilioBackend(BaseBackend):
+    """Sends SMS through Twilio's async client; one pooled aiohttp session per batch."""
+
+    def __init__(self, attempts=3, **options):
+        super().__init__(**options)
+        self.attempts = attempts
+        self.client = None
+
+    async def open(self):
+        if not all([settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN,
+                    settings.TWILIO_FROM_NUMBER, settings.TWILIO_TO_NUMBER]):
+            raise ImproperlyConfigured("Twilio configuration incomplete.")
+        self.http = AsyncTwilioHttpClient(max_retries=self.attempts)
+        self.client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, http_client=self.http)
+
+    async def close(self):
+        await self.http.close()
+
+    async def send(self, message):
+        await self.client.messages.create_async(
+            body=message.body, from_=settings.TWILIO_FROM_NUMBER, to=message.to or settings.TWILIO_TO_NUMBER)
+
+
+@lru_cache(maxsize=None)
+def _backend_class(path):
+    return import_string(path)
+
+
+def get_backend(path=None, **options):
+    """Instantiate ``path`` or settings.NOTIFICATION_BACKEND with NOTIFICATION_OPTIONS overridden by ``options``."""
+    path = path or settings.NOTIFICATION_BACKEND
+    return _backend_class(path)(**{**settings.NOTIFICATION_OPTIONS, **options})
+
+
+def send_batch(messages, **options):
+    return get_backend(**options).send_batch(messages)
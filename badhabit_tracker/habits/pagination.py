@@ -0,0 +1,132 @@
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(position):
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        return json.loads(raw)
+    except (ValueError, TypeError):
+        raise NotFound("Invalid cursor")
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only keyset pagination: the cursor carries the last row's ordering values.
+
+    Pages are read with ``WHERE (ordering) < (cursor) ... LIMIT n`` against a matching index, so page 500 costs
+    the same as page 1 and no COUNT(*) is ever run. The last ``ordering`` field must be unique.
+    """
+    ordering = ("-id",)
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _after(self, position):
+        # lexicographic "comes after" for the ordering tuple, e.g. a < x OR (a = x AND b < y)
+        condition = Q()
+        for i in reversed(range(len(self.ordering))):
+            field = self.ordering[i].lstrip("-")
+            op = "lt" if self.ordering[i].startswith("-") else "gt"
+            step = Q(**{f"{field}__{op}": position[i]})
+            condition = step if i == len(self.ordering) - 1 else step | (Q(**{field: position[i]}) & condition)
+        return condition
+
+    def _position(self, model, position):
+        # the cursor is client input: every value must convert to its field's type
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound("Invalid cursor")
+        values = []
+        for name, value in zip(self.ordering, position):
+            try:
+                value = model._meta.get_field(name.lstrip("-")).to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound("Invalid cursor")
+            if value is None:
+                raise NotFound("Invalid cursor")
+            values.append(value)
+        return values
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self.get_page_size(request)
+        position = decode_cursor(request.query_params.get(self.cursor_query_param))
+        if position is not None:
+            position = self._position(queryset.model, position)
+
+        qs = queryset.order_by(*self.ordering)
+        if position is not None:
+            qs = qs.filter(self._after(position))
+        rows = list(qs[:size + 1])
+        self.next_position = None
+        if len(rows) > size:
+            rows = rows[:size]
+            last = rows[-1]
+            self.next_position = [_cursor_value(getattr(last, f.lstrip("-"))) for f in self.ordering]
+        return rows
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param,
+                                   encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+
+def _cursor_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+class HabitLogPagination(KeysetPagination):
+    ordering = ("-log_date", "-id")
+
+
+class CreatedAtPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class ApproximateCountPaginator(Paginator):
+    """Django paginator (for the admin) that never runs an exact COUNT(*) over a huge table.
+
+    Unfiltered lists on PostgreSQL use the planner's row estimate once it passes ``count_cap``; anything
+    else counts at most ``count_cap`` + 1 rows, so pages beyond the cap are reached by filtering, not by number.
+    """
+    count_cap = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                               [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] > self.count_cap:
+                return row[0]
+        return queryset.order_by()[:self.count_cap + 1].count()
@@ -0,0 +1,58 @@
+import os
+import time
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from .models import Habit, RecomputeCheckpoint
+from . import bulk
+
+# Sharded, resumable recomputation of every user's derived stats (see the recompute_stats command).
+# Each shard is a user-id range; progress is committed with every batch of users, so a crashed or
+# interrupted run picks up after the last committed user.
+
+User = get_user_model()
+
+USER_BATCH = 200
+
+
+def plan_shards(job, shard_size):
+    """Return the unfinished checkpoints of ``job``, first creating shards for user ids not covered yet.
+
+    Existing shards keep their bounds, so a resumed run may use a different ``shard_size``.
+    """
+    covered = RecomputeCheckpoint.objects.filter(job=job).aggregate(end=Max("last_user_id"))["end"]
+    users = User.objects.all() if covered is None else User.objects.filter(id__gt=covered)
+    bounds = users.aggregate(lo=Min("id"), hi=Max("id"))
+    if bounds["lo"] is not None:
+        RecomputeCheckpoint.objects.bulk_create([
+            RecomputeCheckpoint(job=job, first_user_id=lo, last_user_id=min(lo + shard_size - 1, bounds["hi"]))
+            for lo in range(bounds["lo"], bounds["hi"] + 1, shard_size)
+        ], ignore_conflicts=True)
+    return list(RecomputeCheckpoint.objects.filter(job=job, finished_at__isnull=True))
+
+
+def run_shard(checkpoint_id, batch_size=USER_BATCH):
+    """Recompute the shard's remaining users batch by batch; returns this call's counts and its worker pid."""
+    checkpoint = RecomputeCheckpoint.objects.get(id=checkpoint_id)
+    done = {"users": 0, "habits": 0, "rows": 0, "seconds": 0.0}
+    start = checkpoint.processed_through or checkpoint.first_user_id - 1
+    while True:
+        started = time.perf_counter()
+        user_ids = list(User.objects.filter(id__gt=start, id__lte=checkpoint.last_user_id)
+                        .order_by("id").values_list("id", flat=True)[:batch_size])
+        if not user_ids:
+            break
+        habit_ids = list(Habit.objects.filter(user_id__in=user_ids).values_list("id", flat=True))
+        with transaction.atomic():
+            rows = bulk.rebuild_derived(habit_ids)
+            batch = {"users": len(user_ids), "habits": len(habit_ids), "rows": rows,
+                     "seconds": time.perf_counter() - started}
+            for name, value in batch.items():
+                done[name] += value
+                setattr(checkpoint, name, getattr(checkpoint, name) + value)
+            checkpoint.processed_through = start = user_ids[-1]
+            checkpoint.save()
+    checkpoint.finished_at = timezone.now()
+    checkpoint.save(update_fields=["finished_at", "updated_at"])
+    return {"shard": (checkpoint.first_user_id, checkpoint.last_user_id), "pid": os.getpid(), **done}
@@ -0,0 +1,159 @@
+from datetime import date, timedelta
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import ValidationError
+from .models import Habit, HabitPeriodStat
+from . import rollups, aggregates
+from .streaks import live_streak
+from .utils import today_utc_date, safe_percent_change
+
+# Report payloads, shared by the DRF views and their async twins (habits.async_views).
+
+# span of a series when ?from= is omitted, and the most buckets (per habit) / habits one request may ask for
+SERIES_DEFAULT_DAYS = {rollups.DAY: 30, HabitPeriodStat.WEEK: 12 * 7, HabitPeriodStat.MONTH: 365, HabitPeriodStat.YEAR: 3653}
+SERIES_MIN_BUCKET_DAYS = {rollups.DAY: 1, HabitPeriodStat.WEEK: 7, HabitPeriodStat.MONTH: 28, HabitPeriodStat.YEAR: 365}
+MAX_SERIES_POINTS = 3660
+MAX_SERIES_HABITS = 50
+
+
+def habit_report(habit, today=None):
+    today = today or today_utc_date()
+    start_30 = today - timedelta(days=29)
+
+    totals = aggregates.with_window_counts(Habit.objects.filter(pk=habit.pk), today).values(*aggregates.WINDOW_FIELDS).get()
+    series = rollups.daily_series(habit.id, start_30, today)
+    last_30_series = series.series(start_30, today)
+    avg_daily_last_30 = series.total() / 30.0
+
+    return {
+        "habit_id": habit.id,
+        "habit_name": habit.name,
+        "daily_count": totals["today_count"],
+        "weekly_count": totals["week_count"],
+        "monthly_count": totals["month_count"],
+        "total_occurrences": totals["total_occurrences"],
+        "avg_daily_last_30": round(avg_daily_last_30, 2),
+        "last_30_days": last_30_series,
+        "current_streak_days": live_streak(habit.current_streak, habit.last_logged_date, today, habit.id,
+                                           habit.longest_streak),
+        "longest_streak_days": habit.longest_streak,
+    }
+
+
+def habit_analytics(user, habit_id, today=None):
+    """Return the analytics payload of one of ``user``'s habits, or None if it isn't theirs."""
+    today = today or today_utc_date()
+    habit = aggregates.with_window_counts(Habit.objects.filter(id=habit_id, user=user), today).first()
+    if not habit:
+        return None
+
+    start_30 = today - timedelta(days=29)
+    last_30 = rollups.daily_series(habit.id, start_30, today).series(start_30, today)
+
+    return {
+        "habit_id": habit.id,
+        "name": habit.name,
+        "last_30_days": last_30,
+        "current_streak": live_streak(habit.current_streak, habit.last_logged_date, today, habit.id,
+                                      habit.longest_streak),
+        "longest_streak": habit.longest_streak,
+        "week_count": habit.week_count,
+        "week_percent_change": safe_percent_change(habit.week_count, habit.prev_week_count),
+        "month_count": habit.month_count,
+        "month_percent_change": safe_percent_change(habit.month_count, habit.prev_month_count),
+        "total_occurrences": habit.total_occurrences,
+    }
+
+
+def habit_totals(user):
+    habits = Habit.objects.filter(user=user).annotate(
+        total_logs=Count("logs"),
+        last_log=Max("logs__log_date")
+    ).values("id", "name", "category", "target_frequency", "total_logs", "last_log")
+    return {"habits": list(habits)}
+
+
+def habits_summary(user, today=None):
+    today = today or today_utc_date()
+
+    habits = Habit.objects.filter(user=user).order_by('-created_at')
+    rows = aggregates.iter_window_counts(habits, today, 'id', 'name', 'current_streak', 'longest_streak', 'last_logged_date')
+
+    out = []
+    for (hid, name, current_streak, longest_streak, last_logged_date,
+         today_count, week_count, prev_week_count, month_count, prev_month_count, total) in rows:
+        out.append({
+            "habit_id": hid,
+            "name": name,
+            "today_count": today_count,
+            "week_count": week_count,
+            "week_percent_change": safe_percent_change(week_count, prev_week_count),
+            "month_count": month_count,
+            "month_percent_change": safe_percent_change(month_count, prev_month_count),
+            "total_occurrences": total,
+            "current_streak": live_streak(current_streak, last_logged_date, today, hid, longest_streak),
+            "longest_streak": longest_streak,
+        })
+    return {"habits": out}
+
+
+def habit_occurrence_totals(user):
+    habits = aggregates.with_last_log_date(Habit.objects.filter(user=user)).annotate(
+        total_occurrences=Coalesce(Sum("period_stats__occurrences", filter=Q(period_stats__period=HabitPeriodStat.YEAR)), 0)
+    ).values_list("id", "name", "total_occurrences", "last_log_date")
+    summary = []
+    for habit_id, name, total, last_log_date in habits.iterator(chunk_size=500):
+        summary.append({
+            "habit_id": habit_id,
+            "name": name,
+            "total_occurrences": total,
+            "last_log_date": last_log_date.isoformat() if last_log_date else None,
+        })
+    return {"habits": summary}
+
+
+def series_range(params, today=None):
+    """Validate ?resolution=day|week|month|year&from=&to= (ISO dates) into (resolution, bucket starts)."""
+    today = today or today_utc_date()
+    resolution = params.get("resolution", rollups.DAY)
+    if resolution not in rollups.RESOLUTIONS:
+        raise ValidationError({"resolution": [f"Choose one of {', '.join(rollups.RESOLUTIONS)}."]})
+    bounds = {}
+    for name in ("from", "to"):
+        try:
+            bounds[name] = date.fromisoformat(params[name]) if params.get(name) else None
+        except ValueError:
+            raise ValidationError({name: ["Use YYYY-MM-DD."]})
+    end = bounds["to"] or today
+    # clamped: the default window before ?to=0001-01-05 would start before date.min
+    start = bounds["from"] or end - timedelta(days=min(SERIES_DEFAULT_DAYS[resolution] - 1, (end - date.min).days))
+    if start > end:
+        raise ValidationError({"from": ["Must not be after 'to'."]})
+    too_many = {"from": [f"At most {MAX_SERIES_POINTS} {resolution} buckets per series; use a coarser resolution."]}
+    if (end - start).days // SERIES_MIN_BUCKET_DAYS[resolution] >= MAX_SERIES_POINTS:
+        raise ValidationError(too_many)
+    try:
+        starts = rollups.bucket_starts(resolution, start, end)
+        rollups.RESOLUTIONS[resolution][1](starts[-1])
+    except OverflowError:
+        raise ValidationError({"to": [f"The last {resolution} would end after {date.max}."]})
+    if len(starts) > MAX_SERIES_POINTS:
+        raise ValidationError(too_many)
+    return resolution, starts
+
+
+def habit_series(habits, resolution, starts):
+    """Per-bucket occurrences of ``habits`` ((id, name) pairs), read from the rollup rows of ``resolution``."""
+    values = rollups.period_series([habit_id for habit_id, _ in habits], resolution, starts)
+    ceiling = rollups.RESOLUTIONS[resolution][1]
+    return {
+        "resolution": resolution,
+        "from": starts[0].isoformat(),
+        "to": ceiling(starts[-1]).isoformat(),
+        "habits": [{
+            "habit_id": habit_id,
+            "name": name,
+            "total": sum(values[habit_id]),
+            "points": [{"start": s.isoformat(), "occurrences": v} for s, v in zip(starts, values[habit_id])],
+        } for habit_id, name in habits],
+    }
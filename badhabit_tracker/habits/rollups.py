@@ -0,0 +1,149 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from .models import HabitLog, HabitDailyStat, HabitPeriodStat
+from .timeseries import OccurrenceSeries
+from .utils import (
+    start_of_week, end_of_week, start_of_month, end_of_month, start_of_year, end_of_year,
+)
+
+# (period, floor, ceiling) - weeks and months are summed from daily rows, years from month rows
+PERIODS = (
+    (HabitPeriodStat.WEEK, start_of_week, end_of_week),
+    (HabitPeriodStat.MONTH, start_of_month, end_of_month),
+    (HabitPeriodStat.YEAR, start_of_year, end_of_year),
+)
+
+# series resolutions: "day" reads HabitDailyStat, the rest read the matching HabitPeriodStat rows
+DAY = "day"
+RESOLUTIONS = {DAY: (lambda d: d, lambda d: d), **{period: (floor, ceiling) for period, floor, ceiling in PERIODS}}
+
+CHUNK_SIZE = 500
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _upsert_daily(habit_id, totals):
+    rows = [HabitDailyStat(habit_id=habit_id, day=d, occurrences=v) for d, v in totals.items() if v > 0]
+    if rows:
+        HabitDailyStat.objects.bulk_create(rows, batch_size=CHUNK_SIZE, update_conflicts=True,
+                                           unique_fields=("habit", "day"), update_fields=("occurrences",))
+    empty = [d for d, v in totals.items() if v <= 0]
+    for chunk in _chunks(empty):
+        HabitDailyStat.objects.filter(habit_id=habit_id, day__in=chunk).delete()
+
+
+def _upsert_periods(habit_id, period, totals):
+    rows = [HabitPeriodStat(habit_id=habit_id, period=period, period_start=s, occurrences=v)
+            for s, v in totals.items() if v > 0]
+    if rows:
+        HabitPeriodStat.objects.bulk_create(rows, batch_size=CHUNK_SIZE, update_conflicts=True,
+                                            unique_fields=("habit", "period", "period_start"),
+                                            update_fields=("occurrences",))
+    empty = [s for s, v in totals.items() if v <= 0]
+    for chunk in _chunks(empty):
+        HabitPeriodStat.objects.filter(habit_id=habit_id, period=period, period_start__in=chunk).delete()
+
+
+def _bucket(rows, floor, starts):
+    totals = dict.fromkeys(starts, 0)
+    for day, occurrences in rows:
+        key = floor(day)
+        if key in totals:
+            totals[key] += occurrences or 0
+    return totals
+
+
+def _refresh_periods(habit_id, days):
+    for period, floor, ceiling in PERIODS:
+        starts = {floor(d) for d in days}
+        lo, hi = min(starts), ceiling(max(starts))
+        if period == HabitPeriodStat.YEAR:
+            rows = HabitPeriodStat.objects.filter(habit_id=habit_id, period=HabitPeriodStat.MONTH,
+                                                  period_start__range=(lo, hi)).values_list("period_start", "occurrences")
+        else:
+            rows = HabitDailyStat.objects.filter(habit_id=habit_id, day__range=(lo, hi)).values_list("day", "occurrences")
+        _upsert_periods(habit_id, period, _bucket(rows, floor, starts))
+
+
+def refresh_days(changes):
+    """Re-derive the rollups touched by ``changes`` ({habit_id: iterable of dates}).
+
+    Returns {habit_id: (activated, deactivated)} - the days whose "has activity" state flipped.
+    """
+    flips = {}
+    for habit_id, days in changes.items():
+        days = {d for d in days if d is not None}
+        if not habit_id or not days:
+            continue
+        lo, hi = min(days), max(days)
+        with transaction.atomic():
+            before = set(HabitDailyStat.objects.filter(habit_id=habit_id, day__range=(lo, hi))
+                         .values_list("day", flat=True)) & days
+            logged = HabitLog.objects.filter(habit_id=habit_id, log_date__range=(lo, hi))
+            totals = dict.fromkeys(days, 0)
+            for log_date, occurrences in logged.values_list("log_date", "occurrences"):
+                if log_date in totals:
+                    totals[log_date] += occurrences or 0
+            _upsert_daily(habit_id, totals)
+            _refresh_periods(habit_id, days)
+        active = {d for d, v in totals.items() if v > 0}
+        flips[habit_id] = (active - before, before - active)
+    return flips
+
+
+def rebuild_habit(habit_id):
+    """Drop and recompute every rollup row of a habit from its raw logs."""
+    with transaction.atomic():
+        HabitDailyStat.objects.filter(habit_id=habit_id).delete()
+        HabitPeriodStat.objects.filter(habit_id=habit_id).delete()
+        daily = defaultdict(int)
+        logs = HabitLog.objects.filter(habit_id=habit_id).values_list("log_date", "occurrences")
+        for log_date, occurrences in logs.iterator(chunk_size=2000):
+            daily[log_date] += occurrences or 0
+        _upsert_daily(habit_id, daily)
+        for period, floor, _ in PERIODS:
+            totals = defaultdict(int)
+            for day, occurrences in daily.items():
+                totals[floor(day)] += occurrences
+            _upsert_periods(habit_id, period, totals)
+    return len(daily)
+
+
+def daily_series(habit_id, start, end):
+    """Return the dense OccurrenceSeries of ``habit_id`` over [start, end]."""
+    rows = HabitDailyStat.objects.filter(habit_id=habit_id, day__range=(start, end))
+    return OccurrenceSeries.from_pairs(rows.values_list("day", "occurrences"), start, end)
+
+
+def bucket_starts(resolution, start, end):
+    """Start dates of the ``resolution`` buckets overlapping [start, end], oldest first."""
+    floor, ceiling = RESOLUTIONS[resolution]
+    starts, current = [], floor(start)
+    while current <= end:
+        starts.append(current)
+        last = ceiling(current)
+        if last >= end:  # stop here, not a day later: the bucket after December 9999 would overflow
+            break
+        current = last + timedelta(days=1)
+    return starts
+
+
+def period_series(habit_ids, resolution, starts):
+    """Return {habit_id: [occurrences per bucket in ``starts``]} in one query over the precomputed rollups.
+
+    Only non-empty buckets are stored, so a 10-year monthly series reads at most 120 rows per habit.
+    """
+    if resolution == DAY:
+        rows = HabitDailyStat.objects.filter(habit_id__in=habit_ids, day__range=(starts[0], starts[-1]))
+        rows = rows.values_list("habit_id", "day", "occurrences")
+    else:
+        rows = HabitPeriodStat.objects.filter(habit_id__in=habit_ids, period=resolution,
+                                              period_start__range=(starts[0], starts[-1]))
+        rows = rows.values_list("habit_id", "period_start", "occurrences")
+    found = {(habit_id, start): occurrences for habit_id, start, occurrences in rows}
+    return {habit_id: [found.get((habit_id, start), 0) for start in starts] for habit_id in habit_ids}
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+# Read-replica routing for the analytics endpoints (reports, analytics, series, leaderboards, exports).
+# Views opt in with ReplicaReadMixin (or reads_from); everything else, and every write, stays on default.
+# A user who just wrote is pinned to default for REPLICA_STICKY_SECONDS, so they read their own writes.
+
+_read_alias = ContextVar("read_alias", default=None)
+
+
+def replica_alias():
+    return settings.DATABASE_READ_REPLICA
+
+
+def _pin_key(user_id):
+    return f"replica-pin:{user_id}"
+
+
+def pin(user_ids):
+    """Keep ``user_ids`` on the primary until the replica has caught up with their latest write."""
+    if replica_alias() and user_ids:
+        cache.set_many({_pin_key(uid): 1 for uid in user_ids}, settings.REPLICA_STICKY_SECONDS)
+
+
+def read_alias(user_id=None):
+    """The alias an analytics read for ``user_id`` should use: the replica unless none is set up or they're pinned."""
+    alias = replica_alias()
+    if not alias or (user_id is not None and cache.get(_pin_key(user_id))):
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+@contextmanager
+def reads_from(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def stream_from(alias, iterable):
+    """Re-enter ``reads_from(alias)`` around every step of a lazily consumed iterable (streaming responses)."""
+    iterator = iter(iterable)
+    while True:
+        with reads_from(alias):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def current_alias():
+    return _read_alias.get() or DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as default
+        return True
+
+
+class ReplicaReadMixin:
+    """Run the view's handler with reads on the replica (for viewsets, only ``replica_actions``).
+
+    Authentication and the conditional-GET check still read default, before the switch.
+    """
+    replica_actions = None
+    _replica_reads = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.replica_actions is None or getattr(self, "action", None) in self.replica_actions:
+            self._replica_reads = reads_from(read_alias(request.user.id))
+            self._replica_reads.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._replica_reads is not None:
+            self._replica_reads.__exit__(None, None, None)
+            self._replica_reads = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,87 @@
+import random
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from .models import Habit, HabitLog, ReplacementPlan, Reminder, JournalEntry, Achievement
+from .bulk import rebuild_derived
+from .utils import today_utc_date
+
+BATCH_SIZE = 1000
+
+
+def seed_user(username, habits=10, days=365, password=None, today=None):
+    """Create a user with ``habits`` habits, ``days`` of logs each and a few related rows per habit.
+
+    Writes go through bulk_create, then derived stats (rollups, streaks, leaderboards) are rebuilt and
+    badges awarded once, so seeding years of history stays fast. Every fifth day has zero occurrences.
+    """
+    today = today or today_utc_date()
+    user = get_user_model().objects.create_user(username, password=password)
+    rows = Habit.objects.bulk_create([Habit(user=user, name=f"habit {i}", category="other") for i in range(habits)])
+
+    logs = []
+    for i, habit in enumerate(rows):
+        for n in range(days):
+            logs.append(HabitLog(habit=habit, user=user, log_date=today - timedelta(days=n), occurrences=(n + i) % 5))
+            if len(logs) >= BATCH_SIZE:
+                HabitLog.objects.bulk_create(logs)
+                logs = []
+    HabitLog.objects.bulk_create(logs)
+
+    ReplacementPlan.objects.bulk_create([ReplacementPlan(habit=h, activity="walk") for h in rows])
+    Reminder.objects.bulk_create([Reminder(habit=h, reminder_time="09:00") for h in rows])
+    JournalEntry.objects.bulk_create([JournalEntry(user=user, habit=h, entry="seeded") for h in rows])
+    Achievement.objects.bulk_create([Achievement(user=user, name=f"seeded {i}") for i in range(habits)])
+    rebuild_derived([h.id for h in rows])
+    return user
+
+
+HABIT_NAMES = (
+    ("smoking", "health"), ("vaping", "health"), ("soda", "health"), ("late-night snacking", "health"),
+    ("skipping the gym", "health"), ("nail biting", "health"), ("impulse buying", "finance"),
+    ("takeout orders", "finance"), ("lottery tickets", "finance"), ("doomscrolling", "productivity"),
+    ("procrastinating", "productivity"), ("hitting snooze", "productivity"), ("checking email in bed", "productivity"),
+    ("gaming past midnight", "other"), ("swearing", "other"), ("gossiping", "other"),
+)
+MOODS = ("great", "good", "okay", "low", "rough")
+JOURNAL_OPENERS = ("Today I", "This morning I", "After work I", "Honestly I", "Again I")
+JOURNAL_MIDDLES = ("slipped on {habit}", "resisted {habit}", "caught myself {habit}", "cut back on {habit}",
+                   "thought a lot about {habit}")
+JOURNAL_CLOSERS = ("and felt fine about it.", "but the plan helped.", "after a stressful call.",
+                   "and want to do better tomorrow.", "with a friend keeping me honest.")
+
+
+def activity_level(rng):
+    """Share of days a user logs; Pareto-distributed, so most users are casual and a few log almost daily."""
+    return min(0.95, 0.05 * rng.paretovariate(1.16))
+
+
+def active_runs(rng, start, end, level):
+    """Yield (first day, length) of streaks covering roughly ``level`` of [start, end].
+
+    Engaged users keep longer streaks; gaps are sized so the active share matches ``level``.
+    """
+    mean_run = 1 + 20 * level
+    mean_gap = mean_run * (1 - level) / level
+    day = start + timedelta(days=int(rng.expovariate(1 / mean_gap)))
+    while day <= end:
+        length = min(1 + int(rng.expovariate(1 / mean_run)), (end - day).days + 1)
+        yield day, length
+        day += timedelta(days=length + 1 + int(rng.expovariate(1 / mean_gap)))
+
+
+def journal_text(rng, habit):
+    return " ".join((rng.choice(JOURNAL_OPENERS), rng.choice(JOURNAL_MIDDLES).format(habit=habit),
+                     rng.choice(JOURNAL_CLOSERS)))
+
+
+def habit_specs(rng, count):
+    """``count`` distinct (name, category) pairs for one user."""
+    picks = rng.sample(HABIT_NAMES, min(count, len(HABIT_NAMES)))
+    picks += [(f"{name} #{i}", category) for i, (name, category) in
+              enumerate(rng.choices(HABIT_NAMES, k=count - len(picks)), start=2)]
+    return picks
+
+
+def make_rng(seed, *parts):
+    """Independent deterministic stream per (seed, parts), so output does not depend on batch sizes."""
+    return random.Random(f"{seed}:" + ":".join(map(str, parts)))
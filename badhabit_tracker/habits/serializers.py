@@ -28,39 +28,102 @@ class UserSerializer(serializers.ModelSerializer):
 class HabitLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = HabitLog
-        fields = ("id", "habit", "log_date", "occurrences", "note", "created_at")
-        read_only_fields = ("created_at", "id", "habit")
+        fields = ("id", "habit", "log_date", "occurrences", "note", "created_at", "updated_at")
+        read_only_fields = ("created_at", "updated_at", "id", "habit")
+
+
+class HabitLogBulkSerializer(serializers.Serializer):
+    # plain fields: a batch is validated without any per-row queries, ownership is checked once for all habits
+    habit = serializers.IntegerField(required=False)
+    log_date = serializers.DateField()
+    occurrences = serializers.IntegerField(min_value=0, default=1)
+    note = serializers.CharField(allow_blank=True, allow_null=True, required=False)
+
+    # rows per request; a full batch stays well inside Django's default DATA_UPLOAD_MAX_MEMORY_SIZE
+    MAX_ROWS = 10000
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        kwargs.setdefault("allow_empty", False)
+        kwargs.setdefault("max_length", cls.MAX_ROWS)
+        return super().many_init(*args, **kwargs)
+
+
+class HabitLogIncrementSerializer(serializers.Serializer):
+    by = serializers.IntegerField(min_value=1, max_value=1000, default=1)
+    log_date = serializers.DateField(required=False)
 
 
 class ReplacementPlanSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReplacementPlan
-        fields = ("id", "habit", "activity", "description", "created_at")
-        read_only_fields = ("created_at", "id", "habit")
+        fields = ("id", "habit", "activity", "description", "created_at", "updated_at")
+        read_only_fields = ("created_at", "updated_at", "id", "habit")
 
 class ReminderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reminder
-        fields = ("id", "habit", "reminder_time", "message", "created_at")
-        read_only_fields = ("created_at", "id", "habit")
+        fields = ("id", "habit", "reminder_time", "message", "created_at", "updated_at")
+        read_only_fields = ("created_at", "updated_at", "id", "habit")
 
 
 class JournalEntrySerializer(serializers.ModelSerializer):
     class Meta:
         model = JournalEntry
-        fields = ("id", "user", "habit", "entry", "mood", "created_at")
-        read_only_fields = ("created_at", "id", "user")
+        fields = ("id", "user", "habit", "entry", "mood", "created_at", "updated_at")
+        read_only_fields = ("created_at", "updated_at", "id", "user")
+
+def split_param(value):
+    return [v for v in (value or "").split(",") if v]
+
 
 class HabitSerializer(serializers.ModelSerializer):
-    logs = HabitLogSerializer(many=True, read_only=True)
-    plans = ReplacementPlanSerializer(many=True, read_only=True)
-    reminders = ReminderSerializer(many=True, read_only=True)
-    journal_entries = JournalEntrySerializer(many=True, read_only=True)
+    """Lean by default; ``?fields=`` picks columns and ``?expand=`` adds bounded nested collections.
+
+    Nested collections read the ``recent_*`` attributes the viewset prefetches for the requested expansions.
+    """
+    # expand name -> attribute filled by the prefetch
+    EXPANDABLE = {
+        "logs": "recent_logs",
+        "plans": "recent_plans",
+        "reminders": "recent_reminders",
+        "journal_entries": "recent_journal_entries",
+    }
+    COUNTS = ("logs_count", "plans_count", "reminders_count", "journal_entries_count")
+
+    logs = HabitLogSerializer(many=True, read_only=True, source="recent_logs")
+    plans = ReplacementPlanSerializer(many=True, read_only=True, source="recent_plans")
+    reminders = ReminderSerializer(many=True, read_only=True, source="recent_reminders")
+    journal_entries = JournalEntrySerializer(many=True, read_only=True, source="recent_journal_entries")
+    # annotated by the viewset; skipped when absent (e.g. on create)
+    logs_count = serializers.IntegerField(read_only=True)
+    plans_count = serializers.IntegerField(read_only=True)
+    reminders_count = serializers.IntegerField(read_only=True)
+    journal_entries_count = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = Habit
-        fields = ("id", "user", "name", "category", "description", "target_frequency", "created_at", "is_active",
+        fields = ("id", "user", "name", "category", "description", "target_frequency", "created_at", "updated_at",
+                  "is_active", "logs_count", "plans_count", "reminders_count", "journal_entries_count",
                   "logs", "plans", "reminders", "journal_entries")
-        read_only_fields = ("id", "user", "created_at", "logs", "plans", "reminders", "journal_entries")
+        read_only_fields = ("id", "user", "created_at", "updated_at", "logs", "plans", "reminders", "journal_entries")
+
+    @classmethod
+    def requested(cls, request):
+        """Return (fields or None, expansions) asked for on ``request``."""
+        params = request.query_params if request is not None else {}
+        fields = split_param(params.get("fields")) or None
+        expand = [name for name in split_param(params.get("expand")) if name in cls.EXPANDABLE]
+        return fields, expand
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, expand = self.requested(self.context.get("request"))
+        for name in set(self.EXPANDABLE) - set(expand):
+            self.fields.pop(name)
+        if fields:
+            for name in set(self.fields) - set(fields) - set(expand):
+                self.fields.pop(name)
 
 class AchievementSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,19 +1,70 @@
-from django.db.models.signals import post_save
+from collections import defaultdict
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Habit, HabitLog, Badge, UserBadge
+from .models import Habit, HabitLog, Badge, Reminder, ReplacementPlan, JournalEntry
+from . import rollups, streaks, leaderboards, badges, caching
 
-def award_badge(user, badge_name, description):
-    badge, _ = Badge.objects.get_or_create(name=badge_name, defaults={'description': description})
-    UserBadge.objects.get_or_create(user=user, badge=badge)
+
+def sync_log_changes(changes):
+    """Bring derived stats in line after logs were written; ``changes`` is {habit_id: set of dates}."""
+    flips = rollups.refresh_days(changes)
+    streaks.apply_flips(flips)
+    user_ids = set(Habit.objects.filter(id__in=list(changes)).values_list("user_id", flat=True))
+    leaderboards.refresh_users(user_ids)
+    # badge rules run in batches off the request path (habits.tasks.evaluate_badges_task)
+    badges.mark_dirty(user_ids)
+    caching.bump(user_ids)
+
+
+def _log_changes(instance):
+    changes = defaultdict(set)
+    changes[instance.habit_id].add(instance.log_date)
+    loaded_habit, loaded_date = getattr(instance, "_loaded_key", (None, None))
+    if loaded_habit:
+        changes[loaded_habit].add(loaded_date)
+    return changes
 
 @receiver(post_save, sender=Habit)
-def on_habit_created(sender, instance, created, **kwargs):
+def on_habit_saved(sender, instance, created, update_fields=None, **kwargs):
     if created:
-        award_badge(instance.user, "First Habit Created", "Congratulations! You created your first habit")
+        badges.mark_dirty([instance.user_id])
+    # streak-only saves come from sync_log_changes and rebuild_derived, which bump the version themselves
+    if not (update_fields and set(update_fields) <= set(streaks.STREAK_FIELDS)):
+        caching.bump([instance.user_id])
+
+@receiver(post_delete, sender=Habit)
+def on_habit_deleted(sender, instance, origin=None, **kwargs):
+    # a deleted user has nothing left to invalidate
+    if getattr(origin, "model", type(origin)) is Habit:
+        caching.bump([instance.user_id])
 
 @receiver(post_save, sender=HabitLog)
 def on_habit_log_created(sender, instance, created, **kwargs):
-    if created:
-        count = HabitLog.objects.filter(habit__user=instance.habit.user).count()
-        if count == 7:
-            award_badge(instance.habit.user, "One Week Streak", "You logged habits for 7 days straight!")
+    sync_log_changes(_log_changes(instance))
+    instance._loaded_key = (instance.habit_id, instance.log_date)
+
+@receiver(post_delete, sender=HabitLog)
+def on_habit_log_deleted(sender, instance, origin=None, **kwargs):
+    # logs removed by a habit/user cascade take their rollups with them
+    if getattr(origin, "model", type(origin)) is not HabitLog:
+        return
+    sync_log_changes(_log_changes(instance))
+
+@receiver(post_save, sender=Reminder)
+@receiver(post_delete, sender=Reminder)
+@receiver(post_save, sender=ReplacementPlan)
+@receiver(post_delete, sender=ReplacementPlan)
+def on_habit_item_changed(sender, instance, origin=None, **kwargs):
+    if origin is None or getattr(origin, "model", type(origin)) is sender:
+        caching.bump([instance.habit.user_id])
+
+@receiver(post_save, sender=JournalEntry)
+@receiver(post_delete, sender=JournalEntry)
+def on_journal_entry_changed(sender, instance, origin=None, **kwargs):
+    if origin is None or getattr(origin, "model", type(origin)) is JournalEntry:
+        caching.bump([instance.user_id])
+
+
+@receiver(post_delete, sender=Badge)
+def on_badge_deleted(sender, instance, **kwargs):
+    badges.reset_catalog()
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from django.db import transaction
+from .models import Habit, HabitDailyStat, HabitLog
+from .timeseries import OccurrenceSeries
+
+STREAK_FIELDS = ("current_streak", "longest_streak", "last_logged_date")
+
+ONE_DAY = timedelta(days=1)
+
+
+def live_streak(current_streak, last_logged_date, today, habit_id=None, longest_streak=0):
+    """Length of the run of active days ending at ``today``, from the stored streak state.
+
+    A future-dated log moves ``last_logged_date`` past today: the part of its run up to today still
+    counts, and a run starting after today is looked up in the rollups of ``habit_id``.
+    """
+    if last_logged_date is None or last_logged_date < today:
+        return 0
+    run_start = last_logged_date - timedelta(days=current_streak - 1)
+    if run_start <= today:
+        return (today - run_start).days + 1
+    if habit_id is None:
+        return 0
+    active = _active_days(habit_id, today - timedelta(days=longest_streak), today)
+    return 1 + _run_length(active, today, -ONE_DAY) if today in active else 0
+
+
+def state_from_days(days):
+    """Return (current, longest, last) for a set of active days; ``current`` is the run ending at ``last``."""
+    series = OccurrenceSeries.from_days(days)
+    if not len(series):
+        return 0, 0, None
+    current, longest = series.streaks(upto_date=series.end)
+    return current, longest, series.end
+
+
+def _active_days(habit_id, lo, hi):
+    return set(HabitDailyStat.objects.filter(habit_id=habit_id, day__range=(lo, hi)).values_list("day", flat=True))
+
+
+def _run_length(active, day, step):
+    n = 0
+    d = day + step
+    while d in active:
+        n += 1
+        d += step
+    return n
+
+
+def recompute(habit, source="rollups"):
+    """Recompute the streak state of ``habit`` in place from every active day."""
+    if source == "logs":
+        qs = HabitLog.objects.filter(habit_id=habit.id, occurrences__gt=0).values_list("log_date", flat=True)
+    else:
+        qs = HabitDailyStat.objects.filter(habit_id=habit.id).values_list("day", flat=True)
+    habit.current_streak, habit.longest_streak, habit.last_logged_date = state_from_days(set(qs.iterator(chunk_size=5000)))
+
+
+def _append(habit, days):
+    for d in sorted(days):
+        if habit.last_logged_date and d == habit.last_logged_date + ONE_DAY:
+            habit.current_streak += 1
+        else:
+            habit.current_streak = 1
+        habit.last_logged_date = d
+        habit.longest_streak = max(habit.longest_streak, habit.current_streak)
+
+
+def _activate(habit, day):
+    # a run through ``day`` can be at most longest + 1 + longest long, so that window is enough
+    reach = timedelta(days=habit.longest_streak + 1)
+    active = _active_days(habit.id, day - reach, day + reach)
+    left, right = _run_length(active, day, -ONE_DAY), _run_length(active, day, ONE_DAY)
+    run = left + 1 + right
+    habit.longest_streak = max(habit.longest_streak, run)
+    if day + timedelta(days=right) == habit.last_logged_date:
+        habit.current_streak = run
+
+
+def _deactivate(habit, day):
+    reach = timedelta(days=habit.longest_streak + 1)
+    active = _active_days(habit.id, day - reach, day + reach)
+    left, right = _run_length(active, day, -ONE_DAY), _run_length(active, day, ONE_DAY)
+    last = habit.last_logged_date
+
+    if day == last:
+        if left:
+            habit.last_logged_date, habit.current_streak = day - ONE_DAY, left
+        else:
+            prev = HabitDailyStat.objects.filter(habit_id=habit.id, day__lt=day).order_by("-day").values_list("day", flat=True).first()
+            if prev is None:
+                habit.current_streak, habit.last_logged_date = 0, None
+            else:
+                before = _active_days(habit.id, prev - reach, prev)
+                habit.current_streak, habit.last_logged_date = 1 + _run_length(before, prev, -ONE_DAY), prev
+    elif last and day > last - timedelta(days=habit.current_streak):
+        habit.current_streak = right
+
+    # the split run may have been the longest one; only a full pass can tell what replaces it
+    if left + 1 + right >= habit.longest_streak:
+        recompute(habit)
+
+
+def apply_flips(flips):
+    """Update streak state from ``rollups.refresh_days`` output ({habit_id: (activated, deactivated)})."""
+    for habit_id, (activated, deactivated) in flips.items():
+        if not activated and not deactivated:
+            continue
+        with transaction.atomic():
+            habit = Habit.objects.select_for_update().only("id", *STREAK_FIELDS).filter(pk=habit_id).first()
+            if habit is None:
+                continue
+            last = habit.last_logged_date
+            if not deactivated and (last is None or min(activated) > last):
+                _append(habit, activated)
+            elif len(activated) + len(deactivated) > 1:
+                recompute(habit)
+            elif activated:
+                _activate(habit, next(iter(activated)))
+            else:
+                _deactivate(habit, next(iter(deactivated)))
+            habit.save(update_fields=STREAK_FIELDS)
@@ -1,21 +1,44 @@
-import os
 from celery import shared_task
-from twilio.rest import Client
+from datetime import date
+from . import leaderboards, badges, reminders, notifications, increments
+from .models import Reminder
+
 
 @shared_task
 def send_sms_reminder_task(username, message):
-    account_sid = os.environ.get('TWILIO_ACCOUNT_SID')
-    auth_token = os.environ.get('TWILIO_AUTH_TOKEN')
-    from_number = os.environ.get('TWILIO_FROM_NUMBER')
-    to_number = os.environ.get('TEST_PHONE_NUMBER')  
-
-    if not all([account_sid, auth_token, from_number, to_number]):
-        print("Twilio configuration incomplete.")
-        return
-
-    client = Client(account_sid, auth_token)
-    client.messages.create(
-        body=f"Hello {username}! {message}",
-        from_=from_number,
-        to=to_number
-    )
+    return notifications.send_batch([notifications.Message(to=None, body=f"Hello {username}! {message}")])
+
+
+@shared_task
+def dispatch_reminders_task():
+    sent = reminders.dispatch(lambda ids, minute: deliver_reminders_task.delay(ids, minute.isoformat()))
+    return sum(sent.values())
+
+
+@shared_task
+def deliver_reminders_task(reminder_ids, minute):
+    """Send one scheduler batch concurrently through the configured backend; returns the delivery stats."""
+    batch = Reminder.objects.filter(id__in=reminder_ids).select_related("habit__user")
+    messages = [notifications.Message(to=None, body=f"Hello {r.habit.user.username}! {r.message}", key=r.id)
+                for r in batch]
+    return notifications.send_batch(messages)
+
+
+@shared_task
+def reconcile_leaderboards_task():
+    return leaderboards.reconcile()
+
+
+@shared_task
+def evaluate_badges_task():
+    return badges.evaluate_pending()
+
+
+@shared_task
+def flush_increment_task(habit_id, user_id, log_date):
+    return increments.flush(habit_id, user_id, date.fromisoformat(log_date))
+
+
+@shared_task
+def sync_increment_task(habit_id, log_date):
+    increments.sync(habit_id, date.fromisoformat(log_date))
@@ -1,3 +1,1488 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+import zlib
+from collections import Counter, namedtuple
+from unittest import mock, skipIf
+from datetime import date, datetime, time as time_of_day, timedelta, timezone as dt_timezone
+from io import StringIO
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F, Q
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import (Habit, HabitDailyStat, HabitPeriodStat, HabitLog, ReplacementPlan, Reminder, JournalEntry,
+                     Achievement, Badge, UserBadge, RecomputeCheckpoint, LeaderboardEntry,
+                     PendingBadgeCheck, ReminderDispatch, UserDataVersion)
+from . import (aggregates, badges, caching, exporters, increments, leaderboards, notifications, reminders, rollups,
+               streaks, tasks)
+from .management.commands import import_logs
+from .bulk import rebuild_derived
+from .seeding import seed_user
+from .pagination import HabitLogPagination, encode_cursor
+from .serializers import HabitLogBulkSerializer, HabitSerializer
+from .timeseries import OccurrenceSeries
+from .utils import compute_streaks, today_utc_date, start_of_week, start_of_month, end_of_month, start_of_prev_month
 
-# Create your tests here.
+# wall-time baselines per endpoint; refresh with PERF_RECORD=1 python manage.py test
+BASELINES = os.path.join(os.path.dirname(__file__), "perf_baselines.json")
+# seeded (habits, days of logs) for the two users every endpoint is called as
+SMALL = (2, 14)
+LARGE = (12, 400)
+PASSWORD = "budget-pass"
+
+
+def route_names(patterns):
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= route_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+class QueryBudgetMixin:
+    """Calls endpoints as a small and a large seeded user and compares their SQL query counts.
+
+    The count must be identical for both users (so it cannot grow with habit or log count) and stay
+    within the endpoint's budget. Wall time of the large user's call is kept per endpoint and checked
+    against perf_baselines.json when PERF_TIME_TOLERANCE (a factor, e.g. 3) is set.
+    """
+    timings = None
+
+    @classmethod
+    def setUpClass(cls):
+        # badge rows from earlier test classes are rolled back, so start from an empty catalog
+        badges.reset_catalog()
+        super().setUpClass()
+        cls.timings = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if os.environ.get("PERF_RECORD") and cls.timings:
+            baselines = cls.load_baselines()
+            baselines.update({key: round(secs, 4) for key, secs in cls.timings.items()})
+            with open(BASELINES, "w") as fh:
+                json.dump(dict(sorted(baselines.items())), fh, indent=2)
+                fh.write("\n")
+        super().tearDownClass()
+
+    @staticmethod
+    def load_baselines():
+        if not os.path.exists(BASELINES):
+            return {}
+        with open(BASELINES) as fh:
+            return json.load(fh)
+
+    def measure(self, client, method, url, data=None):
+        # every call is measured against a cold cache (report entries, per-user data markers), the worst case
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data, **({"format": "json"} if data is not None else {}))
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        return response, len(queries), elapsed
+
+    def assert_budget(self, key, budget, small, large):
+        (small_response, small_queries, _), (large_response, large_queries, elapsed) = small, large
+        self.assertLess(small_response.status_code, 500, key)
+        self.assertLess(large_response.status_code, 500, key)
+        self.assertEqual(small_queries, large_queries,
+                         f"{key}: {small_queries} queries for {SMALL} but {large_queries} for {LARGE} (habits, days)")
+        self.assertLessEqual(large_queries, budget, f"{key}: {large_queries} queries, budget {budget}")
+
+        self.timings[key] = elapsed
+        tolerance = os.environ.get("PERF_TIME_TOLERANCE")
+        baseline = self.load_baselines().get(key)
+        if tolerance and baseline is not None:
+            self.assertLessEqual(elapsed, baseline * float(tolerance) + 0.01,
+                                 f"{key}: {elapsed:.3f}s against a {baseline:.3f}s baseline")
+
+
+# f is the per-user fixture namespace built in setUpTestData
+Route = namedtuple("Route", "name budget method kwargs data broken", defaults=("get", None, None, None))
+HABIT = lambda f: {"pk": f.habit.id}
+
+API_ROUTES = [
+    Route("api-root", 1),
+    Route("register", 3, "post", data=lambda f: {"username": f"new-{f.user.username}", "password": PASSWORD}),
+    Route("token_obtain_pair", 1, "post", data=lambda f: {"username": f.user.username, "password": PASSWORD}),
+    Route("token_refresh", 1, "post", data=lambda f: {"refresh": f.refresh}),
+    Route("logout", 1, "post", data=lambda f: {"refresh": f.refresh}),
+    Route("reports-summary", 3),
+    Route("user-habits-summary", 3),
+    Route("habit-analytics", 4, kwargs=lambda f: {"habit_id": f.habit.id}),
+    Route("achievement-share", 2, "post", kwargs=lambda f: {"achievement_id": f.achievement.id}, data=lambda f: {},
+          broken="ActivityShareSerializer lists fields ActivityShare does not have"),
+    Route("activity-share", 1, "post", data=lambda f: {},
+          broken="ActivityShareSerializer lists fields ActivityShare does not have"),
+    Route("leaderboard-top-users", 2),
+    Route("leaderboard-top-streaks", 2),
+    Route("leaderboard", 2, kwargs=lambda f: {"board": "total"}),
+    Route("leaderboard-rank", 3, kwargs=lambda f: {"board": "total"}),
+    Route("export", 5),
+    Route("habit-list", 3),
+    Route("habit-list", 4, "post", data=lambda f: {"name": "budgeted"}),
+    Route("habit-detail", 3, kwargs=HABIT),
+    Route("habit-logs", 4, kwargs=HABIT),
+    Route("habit-logs", 27, "post", kwargs=HABIT, data=lambda f: {"log_date": str(f.today), "occurrences": 7}),
+    Route("habit-logs-bulk", 29, "post", kwargs=HABIT,
+          data=lambda f: [{"log_date": str(f.today - timedelta(days=n)), "occurrences": 2} for n in range(30)]),
+    Route("habit-increment", 5, "post", kwargs=HABIT, data=lambda f: {"by": 2}),
+    Route("habit-plans", 4, kwargs=HABIT),
+    Route("habit-reminders", 4, kwargs=HABIT),
+    Route("habit-report", 5, kwargs=HABIT),
+    Route("habit-series", 4, kwargs=HABIT),
+    Route("habit-series-list", 4),
+    Route("habitlog-list", 3),
+    Route("habitlog-list", 25, "post", broken="HabitLogSerializer has habit read-only, so perform_create gets None",
+          data=lambda f: {"habit": f.habit.id, "log_date": str(f.today - timedelta(days=1000)), "occurrences": 1}),
+    Route("habitlog-detail", 3, kwargs=lambda f: {"pk": f.log.id}),
+    Route("habitlog-bulk", 24, "post",
+          data=lambda f: [{"habit": f.habit.id, "log_date": str(f.today - timedelta(days=n))} for n in range(30)]),
+    Route("replacementplan-list", 3),
+    Route("replacementplan-detail", 3, kwargs=lambda f: {"pk": f.plan.id}),
+    Route("achievement-list", 2),
+    Route("achievement-detail", 2, kwargs=lambda f: {"pk": f.achievement.id}),
+    Route("reminders-list", 3),
+    Route("reminders-detail", 3, kwargs=lambda f: {"pk": f.reminder.id}),
+    Route("journal-list", 3),
+    Route("journal-detail", 3, kwargs=lambda f: {"pk": f.entry.id}),
+    Route("badges-list", 2),
+    Route("badges-detail", 2, kwargs=lambda f: {"pk": f.badge.id}),
+    Route("user-badges-list", 2),
+    Route("user-badges-detail", 2, kwargs=lambda f: {"pk": f.user_badge.id}),
+]
+
+
+class Fixture:
+    def __init__(self, user):
+        self.user = user
+        self.today = today_utc_date()
+        self.habit = Habit.objects.filter(user=user).order_by("id").first()
+        self.log = HabitLog.objects.filter(habit=self.habit).first()
+        self.plan = ReplacementPlan.objects.filter(habit=self.habit).first()
+        self.reminder = Reminder.objects.filter(habit=self.habit).first()
+        self.entry = JournalEntry.objects.filter(user=user).first()
+        self.achievement = Achievement.objects.filter(user=user).first()
+        self.user_badge = UserBadge.objects.filter(user=user).first()
+        self.badge = Badge.objects.first()
+        self.refresh = str(RefreshToken.for_user(user))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ApiQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = seed_user("small", *SMALL, password=PASSWORD)
+        cls.large = seed_user("large", *LARGE, password=PASSWORD)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+        return client
+
+    def call(self, user, route):
+        f = Fixture(user)
+        url = reverse(route.name, kwargs=route.kwargs(f) if route.kwargs else None)
+        return self.measure(self.client_for(user), route.method, url, route.data(f) if route.data else None)
+
+    def test_every_route_has_a_budget(self):
+        self.assertEqual(route_names(get_resolver("habits.urls").url_patterns) - {r.name for r in API_ROUTES}, set())
+
+    def test_query_count_does_not_grow_with_data(self):
+        for route in API_ROUTES:
+            key = f"api:{route.name}:{route.method}"
+            with self.subTest(key):
+                if route.broken:
+                    self.skipTest(route.broken)
+                self.assert_budget(key, route.budget, self.call(self.small, route), self.call(self.large, route))
+
+
+# session + user + capped count + page, plus date_hierarchy bounds (habitlog)
+ADMIN_CHANGELISTS = {
+    "habit": 4, "habitlog": 6, "replacementplan": 4, "achievement": 4, "activityshare": 4,
+    "reminder": 4, "journalentry": 4, "userbadge": 4,
+}
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AdminQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_user("admin-small", *SMALL)
+        cls.staff = get_user_model().objects.create_superuser("admin", password=PASSWORD)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def changelists(self):
+        return {model: self.measure(self.client, "get", reverse(f"admin:habits_{model}_changelist"))
+                for model in ADMIN_CHANGELISTS}
+
+    def test_changelists_do_not_grow_with_data(self):
+        small = self.changelists()
+        seed_user("admin-large", *LARGE)
+        large = self.changelists()
+        for model, budget in ADMIN_CHANGELISTS.items():
+            key = f"admin:{model}:changelist"
+            with self.subTest(key):
+                self.assert_budget(key, budget, small[model], large[model])
+
+    def test_counts_are_capped_and_date_hierarchy_bounded(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("admin:habits_habitlog_changelist"))
+        self.assertEqual(response.status_code, 200)
+        counts = [q["sql"] for q in queries if "COUNT(" in q["sql"]]
+        self.assertTrue(counts and all("LIMIT" in sql for sql in counts), counts)
+        for params in ({"log_date__year": today_utc_date().year},
+                       {"log_date__year": today_utc_date().year, "log_date__month": today_utc_date().month}):
+            with self.subTest(params):
+                self.assertEqual(self.client.get(reverse("admin:habits_habitlog_changelist"), params).status_code, 200)
+        # FK inputs are autocomplete widgets, not a <select> of every habit
+        form = self.client.get(reverse("admin:habits_habitlog_change", args=[HabitLog.objects.first().id]))
+        self.assertContains(form, "admin-autocomplete")
+
+    def test_changelists_and_filters_run_no_distinct_scan(self):
+        pages = [(model, {}) for model in ADMIN_CHANGELISTS] + [("reminder", {"reminder_hour": "8"}),
+                                                                ("reminder", {"reminder_hour": "23"})]
+        for model, params in pages:
+            with self.subTest(model=model, params=params):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(reverse(f"admin:habits_{model}_changelist"), params)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse([q["sql"] for q in queries if "DISTINCT" in q["sql"]])
+        reminder = Reminder.objects.first()
+        shown = self.client.get(reverse("admin:habits_reminder_changelist"),
+                                {"reminder_hour": str(reminder.reminder_time.hour)})
+        self.assertContains(shown, reverse("admin:habits_reminder_change", args=[reminder.id]))
+
+
+class OccurrenceSeriesTests(SimpleTestCase):
+    """OccurrenceSeries against plain-Python sums and utils.compute_streaks on random histories."""
+
+    def history(self, rng):
+        start = date(2024, 1, 1)
+        return [(start + timedelta(days=rng.randrange(120)), rng.choice((0, 1, 1, 2, 5)))
+                for _ in range(rng.randrange(1, 90))]
+
+    def test_statistics_match_a_plain_python_reference(self):
+        rng = random.Random(5)
+        for case in range(50):
+            pairs = self.history(rng)
+            daily = Counter()
+            for d, v in pairs:
+                daily[d] += v
+            series = OccurrenceSeries.from_pairs(pairs)
+            with self.subTest(case=case):
+                self.assertEqual((series.start, series.end), (min(daily), max(daily)))
+                self.assertEqual(series.total(), sum(daily.values()))
+                for _ in range(10):
+                    lo = date(2023, 12, 20) + timedelta(days=rng.randrange(150))
+                    hi = lo + timedelta(days=rng.randrange(-3, 60))
+                    self.assertEqual(series.window_sum(lo, hi), sum(v for d, v in daily.items() if lo <= d <= hi))
+                    self.assertEqual(series.slice(lo, lo + timedelta(days=9)).tolist(),
+                                     [daily.get(lo + timedelta(days=n), 0) for n in range(10)])
+                active = {d for d, v in daily.items() if v}
+                for upto in (series.end, series.start, date(2024, 2, 15), date(2025, 1, 1)):
+                    self.assertEqual(series.streaks(upto_date=upto), compute_streaks(active, upto_date=upto))
+                starts, lengths = series.runs()
+                self.assertEqual(sum(lengths.tolist()), len(active))
+
+    def test_bounds_empty_and_series_payload(self):
+        day = date(2024, 3, 1)
+        empty = OccurrenceSeries.from_pairs([], day, day + timedelta(days=2))
+        self.assertEqual((empty.total(), empty.streaks(upto_date=day)), (0, (0, 0)))
+        clipped = OccurrenceSeries.from_pairs([(day - timedelta(days=1), 4), (day, 2), (day, 1)], day, day)
+        self.assertEqual(clipped.values.tolist(), [3])
+        self.assertEqual(clipped.series(day - timedelta(days=1), day),
+                         [{"date": "2024-02-29", "occurrences": 0}, {"date": "2024-03-01", "occurrences": 3}])
+        self.assertEqual(len(OccurrenceSeries.from_days([])), 0)
+
+
+class SeedLoadDataTests(TestCase):
+    """The load-test seeder is deterministic per --seed and its precomputed stats match the raw logs."""
+
+    def setUp(self):
+        badges.reset_catalog()
+
+    def seed(self, prefix, seed=1, *args):
+        call_command("seed_load_data", "--users", "4", "--habits-per-user", "3", "--days", "90", "--seed", str(seed),
+                     "--end-date", "2025-06-30", "--prefix", prefix, *args, stdout=StringIO())
+        return self.snapshot(prefix)
+
+    def snapshot(self, prefix):
+        out = []
+        for user in get_user_model().objects.filter(username__startswith=f"{prefix}-").order_by("id"):
+            habits = []
+            for habit in Habit.objects.filter(user=user).order_by("id"):
+                logs = list(HabitLog.objects.filter(habit=habit).order_by("log_date")
+                            .values_list("log_date", "occurrences"))
+                times = sorted(Reminder.objects.filter(habit=habit).values_list("reminder_time", flat=True))
+                habits.append((habit.name, habit.category, habit.target_frequency, habit.current_streak,
+                               habit.longest_streak, habit.last_logged_date, logs, times))
+            entries = list(JournalEntry.objects.filter(user=user).order_by("id")
+                           .values_list("habit__name", "entry", "mood"))
+            out.append((user.username.split("-", 1)[1], habits, entries))
+        return out
+
+    def test_same_seed_same_data_regardless_of_batching(self):
+        first = self.seed("a")
+        self.assertEqual(len(first), 4)
+        self.assertTrue(any(habit[6] for _, habits, _ in first for habit in habits))
+        self.assertEqual(self.seed("b", 1, "--user-chunk", "1", "--batch-size", "7"), first)
+        self.assertNotEqual(self.seed("c", 2), first)
+        with self.assertRaises(CommandError):
+            self.seed("a")
+
+    def test_precomputed_stats_match_the_logs(self):
+        self.seed("stats")
+        for habit in Habit.objects.filter(user__username__startswith="stats-"):
+            with self.subTest(habit=habit.id):
+                daily = dict(HabitDailyStat.objects.filter(habit=habit).values_list("day", "occurrences"))
+                logs = HabitLog.objects.filter(habit=habit).values_list("log_date", "occurrences")
+                self.assertEqual(daily, dict(logs))
+                years = HabitPeriodStat.objects.filter(habit=habit, period=HabitPeriodStat.YEAR)
+                self.assertEqual(sum(years.values_list("occurrences", flat=True)), sum(daily.values()))
+                expected = Habit(id=habit.id)
+                streaks.recompute(expected, source="logs")
+                self.assertEqual([getattr(habit, f) for f in streaks.STREAK_FIELDS],
+                                 [getattr(expected, f) for f in streaks.STREAK_FIELDS])
+
+
+class RollupTests(TestCase):
+    """Daily, weekly, monthly and yearly rollups follow every log insert, update, move and delete."""
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.habit = Habit.objects.create(user=get_user_model().objects.create_user("rolled"), name="rolled")
+
+    def assert_rollups_match_logs(self):
+        daily = Counter()
+        for log_date, occurrences in HabitLog.objects.filter(habit=self.habit).values_list("log_date", "occurrences"):
+            daily[log_date] += occurrences
+        expected = {(rollups.DAY, d): v for d, v in daily.items() if v}
+        for period, floor, _ in rollups.PERIODS:
+            totals = Counter()
+            for d, v in daily.items():
+                totals[floor(d)] += v
+            expected.update({(period, start): v for start, v in totals.items() if v})
+        stored = {(rollups.DAY, d): v for d, v in HabitDailyStat.objects.filter(habit=self.habit)
+                  .values_list("day", "occurrences")}
+        stored.update({(p, start): v for p, start, v in HabitPeriodStat.objects.filter(habit=self.habit)
+                       .values_list("period", "period_start", "occurrences")})
+        self.assertEqual(stored, expected)
+
+    def test_writes_keep_every_rollup_in_line(self):
+        # around a year end, which is also a week, month and year boundary
+        days = [date(2024, 12, 28) + timedelta(days=n) for n in range(8)]
+        logs = [HabitLog.objects.create(habit=self.habit, log_date=d, occurrences=n % 3 + 1)
+                for n, d in enumerate(days)]
+        self.assert_rollups_match_logs()
+
+        logs[2].occurrences = 9
+        logs[2].save()
+        self.assert_rollups_match_logs()
+        logs[3].occurrences = 0
+        logs[3].save()
+        self.assert_rollups_match_logs()
+        logs[4].log_date = date(2023, 6, 1)  # moved into another year: both sides are refreshed
+        logs[4].save()
+        self.assert_rollups_match_logs()
+        logs[5].delete()
+        self.assert_rollups_match_logs()
+        self.assertFalse(HabitDailyStat.objects.filter(habit=self.habit, day__in=[days[3], days[4], days[5]]).exists())
+
+    def test_refresh_days_reports_flipped_days_and_matches_a_rebuild(self):
+        day = date(2025, 3, 31)
+        HabitLog.objects.bulk_create([HabitLog(habit=self.habit, log_date=day, occurrences=2)])
+        self.assertEqual(rollups.refresh_days({self.habit.id: {day, day + timedelta(days=1)}}),
+                         {self.habit.id: ({day}, set())})
+        self.assertEqual(rollups.refresh_days({self.habit.id: {day}}), {self.habit.id: (set(), set())})
+        HabitLog.objects.filter(habit=self.habit).update(occurrences=0)
+        self.assertEqual(rollups.refresh_days({self.habit.id: {day}}), {self.habit.id: (set(), {day})})
+        self.assert_rollups_match_logs()
+
+        HabitLog.objects.bulk_create([HabitLog(habit=self.habit, log_date=day - timedelta(days=n), occurrences=n)
+                                      for n in range(1, 60)])
+        self.assertEqual(rollups.rebuild_habit(self.habit.id), 60)  # logged days, the emptied one included
+        self.assert_rollups_match_logs()
+
+
+class WindowCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("windowed", 1, 800)
+
+    def test_window_counts_match_the_logs_and_join_only_recent_rollups(self):
+        today = today_utc_date()
+        habits = Habit.objects.filter(user=self.user)
+        logs = dict(HabitLog.objects.filter(habit__user=self.user).values_list("log_date", "occurrences"))
+
+        def between(lo, hi):
+            return sum(v for d, v in logs.items() if lo <= d <= hi)
+        week, month, prev_month = start_of_week(today), start_of_month(today), start_of_prev_month(today)
+        expected = {
+            "today_count": logs.get(today, 0),
+            "week_count": between(week, week + timedelta(days=6)),
+            "prev_week_count": between(week - timedelta(days=7), week - timedelta(days=1)),
+            "month_count": between(month, end_of_month(month)),
+            "prev_month_count": between(prev_month, month - timedelta(days=1)),
+            "total_occurrences": sum(logs.values()),
+        }
+        self.assertEqual(aggregates.with_window_counts(habits, today).values(*aggregates.WINDOW_FIELDS).get(), expected)
+        sql = str(aggregates.with_window_counts(habits, today).values("week_count").query)
+        self.assertIn('"period_start" >=', sql)
+
+
+class StreakMaintenanceTests(TestCase):
+    """Streak state kept up by the log signals always equals a full recompute from the rollups."""
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = get_user_model().objects.create_user("streaky")
+        cls.habit = Habit.objects.create(user=cls.user, name="streaky")
+        cls.today = today_utc_date()
+
+    def day(self, n):
+        return self.today - timedelta(days=n)
+
+    def log(self, *ago, occurrences=1):
+        for n in ago:
+            HabitLog.objects.create(habit=self.habit, log_date=self.day(n), occurrences=occurrences)
+
+    def state(self):
+        habit = Habit.objects.get(id=self.habit.id)
+        expected = Habit(id=habit.id)
+        streaks.recompute(expected, source="logs")
+        self.assertEqual([getattr(expected, f) for f in streaks.STREAK_FIELDS],
+                         [getattr(habit, f) for f in streaks.STREAK_FIELDS])
+        return habit.current_streak, habit.longest_streak, habit.last_logged_date
+
+    def test_back_dated_logs_merge_and_split_runs(self):
+        self.log(9, 8, 7, 6, 5, 3, 2, 1)
+        self.assertEqual(self.state(), (3, 5, self.day(1)))
+        self.log(4)  # joins the two runs
+        self.assertEqual(self.state(), (9, 9, self.day(1)))
+        HabitLog.objects.get(habit=self.habit, log_date=self.day(6)).delete()  # splits the longest run
+        self.assertEqual(self.state(), (5, 5, self.day(1)))
+        HabitLog.objects.filter(habit=self.habit, log_date=self.day(1)).update(occurrences=0)
+        HabitLog.objects.get(habit=self.habit, log_date=self.day(1)).save()
+        self.assertEqual(self.state(), (4, 4, self.day(2)))
+
+    def test_random_inserts_updates_and_deletes_match_a_full_recompute(self):
+        rng = random.Random(7)
+        for step in range(200):
+            day = self.day(rng.randrange(-3, 40))  # a few future-dated logs too
+            log = HabitLog.objects.filter(habit=self.habit, log_date=day).first()
+            action = rng.random()
+            if log is None:
+                HabitLog.objects.create(habit=self.habit, log_date=day, occurrences=rng.randint(0, 3))
+            elif action < 0.5:
+                log.delete()
+            elif action < 0.8:
+                log.occurrences = rng.randint(0, 3)
+                log.save()
+            else:
+                target = self.day(rng.randrange(-3, 40))
+                if not HabitLog.objects.filter(habit=self.habit, log_date=target).exists():
+                    log.log_date = target
+                    log.save()
+            with self.subTest(step=step):
+                self.state()
+
+    def test_live_streak_with_future_dated_logs(self):
+        self.assertEqual(streaks.live_streak(3, self.day(1), self.today), 0)
+        self.assertEqual(streaks.live_streak(3, self.today, self.today), 3)
+        self.assertEqual(streaks.live_streak(0, None, self.today), 0)
+        self.log(2, 1, 0, -1)
+        current, longest, last = self.state()
+        self.assertEqual(streaks.live_streak(current, last, self.today, self.habit.id, longest), 3)
+        # a future run that does not reach today leaves the run ending today to the rollups
+        self.log(-3)
+        current, longest, last = self.state()
+        self.assertEqual((current, last), (1, self.day(-3)))
+        self.assertEqual(streaks.live_streak(current, last, self.today, self.habit.id, longest), 3)
+        self.assertEqual(streaks.live_streak(current, last, self.today), 0)
+        HabitLog.objects.get(habit=self.habit, log_date=self.today).delete()
+        current, longest, last = self.state()
+        self.assertEqual(streaks.live_streak(current, last, self.today, self.habit.id, longest), 0)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.log(0)
+        report = client.get(reverse("habit-report", kwargs={"pk": self.habit.id})).data
+        self.assertEqual(report["current_streak_days"], 3)
+
+
+class BulkLogTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("bulk", 2, 5)
+        cls.habit, cls.second = Habit.objects.filter(user=cls.user).order_by("id")
+        cls.foreign = Habit.objects.get(user=seed_user("bulk-other", 1, 1))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = today_utc_date()
+
+    def post(self, rows, habit=None):
+        url = reverse("habit-logs-bulk", kwargs={"pk": habit.id}) if habit else reverse("habitlog-bulk")
+        return self.client.post(url, rows, format="json")
+
+    def test_creates_and_updates_logs_and_rollups(self):
+        HabitLog.objects.filter(habit=self.habit, log_date=self.today).update(note="kept")
+        old = str(self.today - timedelta(days=100))
+        response = self.post([{"log_date": str(self.today), "occurrences": 9},
+                              {"log_date": old, "occurrences": 2, "note": "backfilled"},
+                              {"log_date": old, "occurrences": 3}], habit=self.habit)
+        self.assertEqual(response.data, {"upserted": 2, "habits": 1})
+        today_log = HabitLog.objects.get(habit=self.habit, log_date=self.today)
+        self.assertEqual((today_log.occurrences, today_log.note), (9, "kept"))
+        self.assertEqual(HabitLog.objects.get(habit=self.habit, log_date=old).occurrences, 3)
+        self.assertEqual(HabitDailyStat.objects.get(habit=self.habit, day=old).occurrences, 3)
+
+        response = self.post([{"habit": self.habit.id, "log_date": old, "occurrences": 0},
+                              {"habit": self.second.id, "log_date": old}])
+        self.assertEqual(response.data, {"upserted": 2, "habits": 2})
+        self.assertFalse(HabitDailyStat.objects.filter(habit=self.habit, day=old).exists())
+        self.assertEqual(HabitDailyStat.objects.get(habit=self.second, day=old).occurrences, 1)
+
+    def test_other_users_habits_and_bad_rows_write_nothing(self):
+        before = HabitLog.objects.count()
+        day = str(self.today)
+        for rows in ([{"habit": self.habit.id, "log_date": day}, {"habit": self.foreign.id, "log_date": day}],
+                     [{"log_date": day}], [], [{"habit": self.habit.id, "log_date": "soon"}], {"not": "a list"}):
+            with self.subTest(rows=rows):
+                self.assertEqual(self.post(rows).status_code, 400)
+        self.assertEqual(self.post([{"log_date": str(self.today)}], habit=self.foreign).status_code, 404)
+        self.assertEqual(HabitLog.objects.count(), before)
+
+    def test_row_cap(self):
+        with mock.patch.object(HabitLogBulkSerializer, "MAX_ROWS", 3):
+            rows = [{"log_date": str(self.today - timedelta(days=n))} for n in range(4)]
+            self.assertEqual(self.post(rows, habit=self.habit).status_code, 400)
+            self.assertEqual(self.post(rows[:3], habit=self.habit).status_code, 200)
+        # a full batch fits the default request body limit
+        row = {"habit": 2 ** 31 - 1, "log_date": "2025-12-31", "occurrences": 1000, "note": "x" * 80}
+        body = json.dumps([row] * HabitLogBulkSerializer.MAX_ROWS)
+        self.assertLess(len(body), settings.DATA_UPLOAD_MAX_MEMORY_SIZE)
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("exporter", 2, 30)
+        cls.other = seed_user("exporter-other", 1, 30)
+        JournalEntry.objects.filter(user=cls.user).update(entry='said "no", then\nwent for a walk')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, **params):
+        response = self.client.get(reverse("export"), params)
+        self.assertEqual(response.status_code, 200, params)
+        return response, b"".join(response.streaming_content)
+
+    def test_csv_holds_only_the_callers_rows(self):
+        response, body = self.export(fmt="csv", dataset="logs")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="badhabit-exporter-logs.csv"', response["Content-Disposition"])
+        rows = list(csv.DictReader(body.decode().splitlines()))
+        logs = HabitLog.objects.filter(habit__user=self.user)
+        self.assertEqual(len(rows), logs.count())
+        self.assertEqual({int(r["habit_id"]) for r in rows}, set(logs.values_list("habit_id", flat=True)))
+        self.assertEqual(list(rows[0]), ["id", "habit_id", "habit_name", "log_date", "occurrences", "note",
+                                         "created_at"])
+
+        journal = list(csv.DictReader(self.export(fmt="csv", dataset="journal")[1].decode().splitlines(keepends=True)))
+        self.assertEqual(journal[0]["entry"], 'said "no", then\nwent for a walk')
+
+    def test_ndjson_and_gzip(self):
+        _, body = self.export()
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        counts = Counter(r["type"] for r in records)
+        self.assertEqual(counts, {"habits": 2, "logs": HabitLog.objects.filter(habit__user=self.user).count(),
+                                  "journal": 2, "badges": UserBadge.objects.filter(user=self.user).count()})
+        other_habits = set(Habit.objects.filter(user=self.other).values_list("id", flat=True))
+        self.assertFalse([r for r in records if r.get("habit_id") in other_habits
+                          or (r["type"] == "habits" and r["id"] in other_habits)])
+
+        response, compressed = self.export(gzip="1")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertEqual(gzip.decompress(compressed), body)
+        # every chunk is flushed, so a client can decode the stream as it arrives
+        chunks = list(exporters.stream(self.user, "ndjson", ["logs"], gzip=True))
+        decoder = zlib.decompressobj(31)
+        self.assertEqual(decoder.decompress(chunks[0]), next(exporters.stream(self.user, "ndjson", ["logs"])))
+
+    def test_bad_parameters_and_command(self):
+        for params in ({"fmt": "xml"}, {"fmt": "csv", "dataset": "logs,habits"}, {"dataset": "passwords"}):
+            with self.subTest(params):
+                self.assertEqual(self.client.get(reverse("export"), params).status_code, 400)
+        with tempfile.NamedTemporaryFile(suffix=".ndjson.gz") as out:
+            call_command("export_user_data", "exporter", "--gzip", "--dataset", "habits", "-o", out.name,
+                         stderr=StringIO())
+            lines = gzip.decompress(out.read()).decode().splitlines()
+        self.assertEqual([json.loads(line)["name"] for line in lines], ["habit 0", "habit 1"])
+
+
+class ImportLogsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("importer", 1, 1)
+        cls.habit = Habit.objects.get(user=cls.user)
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "logs.ndjson")
+
+    def write(self, lines):
+        with open(self.path, "w") as fh:
+            fh.write("\n".join(lines) + "\n")
+
+    def record(self, n, occurrences=3, habit="habit 0"):
+        day = date(2020, 1, 1) + timedelta(days=n)
+        return json.dumps({"habit": habit, "log_date": str(day), "occurrences": occurrences})
+
+    def run_import(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_logs", self.path, "--user", "importer", "--chunk-size", "2", *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def imported(self):
+        logs = HabitLog.objects.filter(habit=self.habit, log_date__year=2020)
+        return dict(logs.values_list("log_date", "occurrences"))
+
+    def test_bad_lines_count_against_the_error_budget(self):
+        self.write([self.record(0), "{not json", self.record(1, habit="unknown"), '["a", "list"]', self.record(2)])
+        with self.assertRaisesMessage(CommandError, "Too many bad rows"):
+            self.run_import("--max-errors", "2")
+        out, err = self.run_import("--max-errors", "3")
+        self.assertIn("3 skipped", out)
+        self.assertIn("{not json", err)
+        self.assertEqual(len(self.imported()), 2)
+        self.assertEqual(HabitDailyStat.objects.filter(habit=self.habit, day__year=2020).count(), 2)
+
+    def test_resume_continues_after_the_last_checkpoint(self):
+        self.write([self.record(n) for n in range(6)])
+        flush = import_logs.Command._flush
+        calls = []
+
+        def crash_on_second_chunk(command, *args):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("worker killed")
+            return flush(command, *args)
+        with mock.patch.object(import_logs.Command, "_flush", crash_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.run_import()
+        self.assertEqual(len(self.imported()), 2)
+        self.assertTrue(os.path.exists(f"{self.path}.checkpoint"))
+
+        # rewrite the already imported lines in place: a resumed run must not read them again
+        with open(self.path) as fh:
+            text = fh.read()
+        first_chunk = len(self.record(0)) * 2 + 2
+        with open(self.path, "w") as fh:
+            fh.write(text[:first_chunk].replace('"occurrences": 3', '"occurrences": 7') + text[first_chunk:])
+        out, _ = self.run_import("--resume")
+        self.assertIn("Resuming at byte", out)
+        self.assertEqual(sorted(self.imported().values()), [3] * 6)
+        self.assertFalse(os.path.exists(f"{self.path}.checkpoint"))
+
+    def test_reimport_without_a_note_column_keeps_notes(self):
+        self.write([json.dumps({"habit": "habit 0", "log_date": "2020-01-01", "occurrences": 1, "note": "kept"}),
+                    json.dumps({"habit": "habit 0", "log_date": "2020-01-02", "occurrences": 1, "note": "old"})])
+        self.run_import()
+        self.write([self.record(0, occurrences=4),
+                    json.dumps({"habit": "habit 0", "log_date": "2020-01-02", "occurrences": 5, "note": "new"})])
+        self.run_import()
+        logs = HabitLog.objects.filter(habit=self.habit, log_date__year=2020).order_by("log_date")
+        self.assertEqual(list(logs.values_list("occurrences", "note")), [(4, "kept"), (5, "new")])
+
+
+class HabitFieldsTests(TestCase):
+    """?fields= and ?expand= shape the habit list without adding queries per habit."""
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.small = seed_user("fields-small", 2, 10)
+        cls.large = seed_user("fields-large", 8, 40)
+
+    def get(self, user, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("habit-list"), params)
+        return response, len(queries)
+
+    def habits(self, response):
+        return response.data["results"] if "results" in response.data else response.data
+
+    def test_payload_shape(self):
+        lean = self.habits(self.get(self.large)[0])[0]
+        self.assertIn("logs_count", lean)
+        self.assertFalse(set(HabitSerializer.EXPANDABLE) & set(lean))
+
+        picked = self.habits(self.get(self.large, fields="id,name")[0])
+        self.assertEqual({tuple(h) for h in picked}, {("id", "name")})
+
+        expanded = self.habits(self.get(self.large, fields="id,logs_count", expand="logs,nope", expand_limit="5")[0])
+        self.assertEqual(set(expanded[0]), {"id", "logs_count", "logs"})
+        for habit in expanded:
+            self.assertEqual(habit["logs_count"], 40)
+            self.assertEqual(len(habit["logs"]), 5)
+            self.assertEqual({log["habit"] for log in habit["logs"]}, {habit["id"]})
+
+    def test_query_count_does_not_grow_with_habits(self):
+        params = {"expand": ",".join(HabitSerializer.EXPANDABLE), "expand_limit": "3"}
+        small, large = self.get(self.small, **params), self.get(self.large, **params)
+        self.assertEqual(len(self.habits(large[0])), 8)
+        self.assertEqual(small[1], large[1])
+        self.assertEqual(self.get(self.small, fields="id")[1], self.get(self.large, fields="id")[1])
+
+    def test_bad_expand_limit(self):
+        for limit in ("abc", "-1", "0", "101", ""):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.get(self.small, expand="logs", expand_limit=limit)[0].status_code, 400)
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("pager", 3, 20)
+        seed_user("pager-other", 2, 20)
+        cls.habit = Habit.objects.filter(user=cls.user).order_by("id").first()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, **params):
+        rows, page = [], self.client.get(url, {"page_size": 7, **params}).data
+        while True:
+            self.assertLessEqual(len(page["results"]), 7)
+            rows += page["results"]
+            if not page["next"]:
+                return rows
+            page = self.client.get(page["next"]).data
+
+    def test_pages_cover_every_row_once_in_order(self):
+        logs = HabitLog.objects.filter(habit__user=self.user).order_by("-log_date", "-id")
+        self.assertEqual([r["id"] for r in self.walk(reverse("habitlog-list"))],
+                         list(logs.values_list("id", flat=True)))
+        per_habit = self.walk(reverse("habit-logs", kwargs={"pk": self.habit.id}))
+        self.assertEqual([r["id"] for r in per_habit], list(logs.filter(habit=self.habit).values_list("id", flat=True)))
+        entries = JournalEntry.objects.filter(user=self.user).order_by("-created_at", "-id")
+        self.assertEqual([r["id"] for r in self.walk(reverse("journal-list"))],
+                         list(entries.values_list("id", flat=True)))
+
+    def test_malformed_cursors_are_not_found(self):
+        url = reverse("habitlog-list")
+        for cursor in ("%%%", "bm90IGpzb24", encode_cursor({"log_date": "2024-01-01"}), encode_cursor(["2024-01-01"]),
+                       encode_cursor(["someday", 1]), encode_cursor(["2024-01-01", "x"]),
+                       encode_cursor([{"a": 1}, 2]), encode_cursor([None, 1]), encode_cursor(["2024-13-01", 1])):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(url, {"cursor": cursor}).status_code, 404)
+        journal = self.client.get(reverse("journal-list"), {"cursor": encode_cursor(["noon", 1])})
+        self.assertEqual(journal.status_code, 404)
+        self.assertEqual(self.client.get(url, {"cursor": encode_cursor(["2024-01-01", 1])}).status_code, 200)
+
+    def test_log_pages_are_read_in_index_order(self):
+        self.assertEqual(set(HabitLog.objects.values_list("user_id", "habit__user_id").distinct()),
+                         {(uid, uid) for uid in HabitLog.objects.values_list("habit__user_id", flat=True)})
+        if connection.vendor != "sqlite":
+            self.skipTest("plan text is SQLite's")
+        ordering = HabitLogPagination.ordering
+        after = Q(log_date__lt=date(2024, 1, 1)) | Q(log_date=date(2024, 1, 1), id__lt=10)
+        for index, qs in (("habitlog_user_keyset_idx", HabitLog.objects.filter(user=self.user)),
+                          ("habits_habitlog_habit_id_log_date", self.habit.logs.all())):
+            for page in (qs, qs.filter(after)):
+                with self.subTest(index, cursor=page is not qs):
+                    plan = page.order_by(*ordering)[:8].explain()
+                    self.assertNotIn("TEMP B-TREE", plan)
+                    self.assertIn(index, plan)
+
+
+class BadgeRuleTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.today = today_utc_date()
+        cls.user = get_user_model().objects.create_user("badger")
+        cls.health = Habit.objects.create(user=cls.user, name="soda", category="health")
+        Habit.objects.bulk_create([Habit(user=cls.user, name=f"habit {i}", category="other") for i in range(3)])
+        HabitLog.objects.bulk_create([HabitLog(habit=cls.health, log_date=cls.today - timedelta(days=n),
+                                               occurrences=2) for n in range(29)])
+        rebuild_derived([cls.health.id])
+        # rebuild_derived already ran the rules; start each test with nothing held and nothing queued
+        UserBadge.objects.filter(user=cls.user).delete()
+        Achievement.objects.filter(user=cls.user).delete()
+        PendingBadgeCheck.objects.all().delete()
+
+    def setUp(self):
+        badges.reset_catalog()
+
+    def awards(self):
+        held = set(UserBadge.objects.filter(user=self.user).values_list("badge__name", flat=True))
+        return held | set(Achievement.objects.filter(user=self.user).values_list("name", flat=True))
+
+    def log_day(self, n):
+        HabitLog.objects.create(habit=self.health, log_date=self.today - timedelta(days=n), occurrences=2)
+
+    def test_user_stats(self):
+        other = get_user_model().objects.create_user("no-habits")
+        stats = badges.user_stats([self.user.id, other.id])
+        self.assertEqual(dict(stats[self.user.id]), {"habits": 4, "best_streak": 29, "habit_days": 29,
+                                                     "habit_days:health": 29, "total_occurrences": 58})
+        self.assertEqual(dict(stats[other.id]), {})
+
+    def test_thresholds(self):
+        self.assertEqual(badges.evaluate([self.user.id]), 2)
+        self.assertEqual(self.awards(), {"First Habit Created", "One Week Streak"})
+        self.log_day(29)  # 30 days: the month streak and the health achievement, still four habits
+        Habit.objects.create(user=self.user, name="collector")
+        self.assertEqual(badges.evaluate([self.user.id]), 5)
+        self.assertEqual(self.awards(), {"First Habit Created", "One Week Streak", "One Month Streak",
+                                         "Health Watch", "Habit Collector"})
+
+    def test_held_awards_are_not_duplicated(self):
+        UserBadge.objects.create(user=self.user, badge_id=badges.catalog()["One Week Streak"])
+        self.assertEqual(badges.evaluate([self.user.id, self.user.id]), 2)
+        self.assertEqual(badges.evaluate([self.user.id]), 2)
+        self.assertEqual(UserBadge.objects.filter(user=self.user).count(), 2)
+        # awards stay once the metric drops back under the threshold
+        Habit.objects.filter(user=self.user).delete()
+        badges.evaluate([self.user.id])
+        self.assertEqual(self.awards(), {"First Habit Created", "One Week Streak"})
+
+    def test_only_users_with_new_awards_are_bumped(self):
+        other = get_user_model().objects.create_user("no-awards")
+
+        def version(user):
+            return UserDataVersion.objects.filter(user=user).values_list("version", flat=True).first()
+
+        before = version(self.user), version(other)
+        badges.evaluate([self.user.id, other.id])
+        self.assertEqual((version(self.user), version(other)), (before[0] + 1, before[1]))
+        badges.evaluate([self.user.id, other.id])
+        self.assertEqual(version(self.user), before[0] + 1)
+
+    def test_pending_rows_survive_a_failed_evaluation(self):
+        badges.mark_dirty([self.user.id])
+        with mock.patch.object(badges, "user_stats", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                badges.evaluate_pending()
+        self.assertEqual(self.awards(), set())
+        self.assertTrue(PendingBadgeCheck.objects.filter(user=self.user).exists())
+        self.assertEqual(badges.evaluate_pending(), 1)
+        self.assertEqual(self.awards(), {"First Habit Created", "One Week Streak"})
+        self.assertFalse(PendingBadgeCheck.objects.exists())
+
+    def test_users_marked_during_evaluation_stay_queued(self):
+        badges.mark_dirty([self.user.id])
+        evaluate = badges.evaluate
+
+        def write_meanwhile(user_ids):
+            if not HabitLog.objects.filter(habit=self.health, log_date=self.today - timedelta(days=29)).exists():
+                self.log_day(29)  # marks the user again while the batch is being evaluated
+            return evaluate(user_ids)
+
+        with mock.patch.object(badges, "evaluate", side_effect=write_meanwhile) as patched:
+            self.assertEqual(badges.evaluate_pending(), 2)
+        self.assertEqual(patched.call_count, 2)
+        self.assertIn("One Month Streak", self.awards())
+        self.assertFalse(PendingBadgeCheck.objects.exists())
+
+
+class ReportCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("cached", 3, 30)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.habit = Habit.objects.filter(user=self.user).order_by("id").first()
+
+    def test_repeat_polls_are_served_from_cache(self):
+        url = reverse("habit-analytics", kwargs={"habit_id": self.habit.id})
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(caching.stats()["habit-analytics"], {"hits": 1, "misses": 1})
+
+    def test_writes_invalidate(self):
+        url = reverse("habit-report", kwargs={"pk": self.habit.id})
+        before = self.client.get(url).data["daily_count"]
+        self.client.post(reverse("habit-logs", kwargs={"pk": self.habit.id}),
+                         {"log_date": str(today_utc_date()), "occurrences": before + 3}, format="json")
+        self.assertEqual(self.client.get(url).data["daily_count"], before + 3)
+
+        self.client.patch(reverse("habit-detail", kwargs={"pk": self.habit.id}), {"name": "renamed"}, format="json")
+        self.assertEqual(self.client.get(url).data["habit_name"], "renamed")
+
+    def test_writes_from_other_processes_show_within_the_local_timeout(self):
+        url = reverse("habit-report", kwargs={"pk": self.habit.id})
+        before = self.client.get(url).data["daily_count"]
+        # a management command or celery worker: same database, its own local-memory cache
+        with mock.patch.object(caching, "cache", LocMemCache("other-process", {})):
+            HabitLog.objects.update_or_create(habit=self.habit, log_date=today_utc_date(),
+                                              defaults={"occurrences": before + 3})
+        self.assertEqual(self.client.get(url).data["daily_count"], before)
+        later = time.time() + caching.LOCAL_VERSION_TIMEOUT + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(self.client.get(url).data["daily_count"], before + 3)
+
+    def test_rebuilt_stats_invalidate(self):
+        url = reverse("habit-report", kwargs={"pk": self.habit.id})
+        before = self.client.get(url).data["total_occurrences"]
+        # a raw backfill skips the signals and earns no new award; only rebuild_derived can invalidate
+        HabitLog.objects.filter(habit=self.habit, occurrences__gt=0).update(occurrences=F("occurrences") + 1)
+        rebuild_derived([self.habit.id])
+        self.assertGreater(self.client.get(url).data["total_occurrences"], before)
+
+    def test_other_users_habits_are_not_served(self):
+        other = APIClient()
+        other.force_authenticate(seed_user("other", 1, 1))
+        self.client.get(reverse("habit-report", kwargs={"pk": self.habit.id}))
+        self.assertEqual(other.get(reverse("habit-report", kwargs={"pk": self.habit.id})).status_code, 404)
+
+
+class LeaderboardTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [get_user_model().objects.create_user(f"ranked-{i}") for i in range(7)]
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create([LeaderboardEntry(board=LeaderboardEntry.TOTAL, user=user, score=score)
+                                              for user, score in zip(cls.users, (5, 9, 9, 3, 9, 0, 1))])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+        self.url = reverse("leaderboard", kwargs={"board": LeaderboardEntry.TOTAL})
+
+    def test_cursor_pages_walk_the_whole_board_in_rank_order(self):
+        rows, url = [], f"{self.url}?limit=2"
+        while url:
+            data = self.client.get(url).data
+            self.assertLessEqual(len(data["leaderboard"]), 2)
+            rows += data["leaderboard"]
+            url = data["next"]
+        expected = sorted(LeaderboardEntry.objects.values_list("score", "user_id"), key=lambda e: (-e[0], e[1]))
+        self.assertEqual([(r["score"], r["user_id"]) for r in rows], expected)
+        self.assertEqual([r["rank"] for r in rows], list(range(1, 8)))
+        for row in rows:
+            with self.subTest(rank=row["rank"]):
+                user = get_user_model().objects.get(id=row["user_id"])
+                self.assertEqual(leaderboards.rank_of(LeaderboardEntry.TOTAL, user)["rank"], row["rank"])
+
+    def test_rank_lookup_is_bounded(self):
+        rank_url = reverse("leaderboard-rank", kwargs={"board": LeaderboardEntry.TOTAL})
+        self.assertEqual(self.client.get(rank_url).data, {"rank": 4, "exact": True, "user_id": self.users[0].id,
+                                                           "username": "ranked-0", "score": 5})
+        with mock.patch.object(leaderboards, "MAX_EXACT_RANK", 2):
+            self.assertEqual(leaderboards.rank_of(LeaderboardEntry.TOTAL, self.users[0])["rank"], 3)
+            self.assertFalse(leaderboards.rank_of(LeaderboardEntry.TOTAL, self.users[0])["exact"])
+            self.assertTrue(leaderboards.rank_of(LeaderboardEntry.TOTAL, self.users[2])["exact"])
+
+    def test_bad_limit_and_cursor(self):
+        for limit in ("abc", "-1", "0", "101", "2.5"):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.client.get(self.url, {"limit": limit}).status_code, 400)
+        self.assertEqual(len(self.client.get(self.url, {"limit": "100"}).data["leaderboard"]), 7)
+        self.assertEqual(self.client.get(self.url, {"cursor": "garbage"}).status_code, 404)
+
+    def test_streak_board_agrees_with_live_streak(self):
+        today = date(2024, 3, 10)
+        user = self.users[1]
+        Habit.objects.bulk_create([
+            Habit(user=user, name="today", current_streak=3, longest_streak=3, last_logged_date=today),
+            # a run that started two days ago and was logged ahead into tomorrow
+            Habit(user=user, name="ahead", current_streak=4, longest_streak=4, last_logged_date=today + timedelta(days=1)),
+            Habit(user=user, name="lapsed", current_streak=9, longest_streak=9, last_logged_date=today - timedelta(days=1)),
+        ])
+        scores = leaderboards.compute_scores([user.id], today)[LeaderboardEntry.STREAK]
+        self.assertEqual(scores, {user.id: 3})
+        Habit.objects.filter(user=user, name="ahead").update(current_streak=6)
+        self.assertEqual(leaderboards.compute_scores([user.id], today)[LeaderboardEntry.STREAK], {user.id: 5})
+
+
+class SeriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("series", 2, 400)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.habit = Habit.objects.filter(user=self.user).order_by("id").first()
+
+    def get(self, **params):
+        return self.client.get(reverse("habit-series", kwargs={"pk": self.habit.id}), params)
+
+    def test_buckets_match_the_daily_rows(self):
+        end = today_utc_date() - timedelta(days=3)
+        start, end = str(end - timedelta(days=380)), str(end)
+        daily = self.get(resolution="day", **{"from": start, "to": end}).data
+        for resolution in ("week", "month", "year"):
+            with self.subTest(resolution):
+                data = self.get(resolution=resolution, **{"from": start, "to": end}).data
+                self.assertLessEqual(data["from"], start)
+                self.assertGreaterEqual(data["to"], end)
+                expected = HabitDailyStat.objects.filter(habit=self.habit, day__range=(data["from"], data["to"]))
+                self.assertEqual(data["total"], sum(expected.values_list("occurrences", flat=True)))
+                self.assertGreater(data["total"], daily["total"] // 2)
+                self.assertEqual([p["start"] for p in data["points"]], sorted(p["start"] for p in data["points"]))
+        self.assertEqual(len(daily["points"]), 381)
+
+    def test_long_monthly_range_reads_one_row_per_month(self):
+        cache.clear()
+        with self.assertNumQueries(3):  # data marker, habit, month rollups
+            data = self.get(resolution="month", **{"from": "2016-01-01", "to": "2025-12-31"}).data
+        self.assertEqual(len(data["points"]), 120)
+
+    def test_multi_habit_and_invalid_params(self):
+        data = self.client.get(reverse("habit-series-list"), {"resolution": "week"}).data
+        self.assertEqual(len(data["habits"]), 2)
+        single = self.get(resolution="week").data
+        self.assertEqual(data["habits"][0]["points"], single["points"])
+        for params in ({"resolution": "hour"}, {"from": "yesterday"}, {"from": "2025-02-01", "to": "2025-01-01"},
+                       {"resolution": "day", "from": "1900-01-01"}):
+            with self.subTest(params):
+                self.assertEqual(self.get(**params).status_code, 400)
+        self.assertEqual(self.client.get(reverse("habit-series-list"), {"ids": "x"}).status_code, 400)
+
+    def test_ranges_at_the_ends_of_the_calendar(self):
+        first = self.get(resolution="day", to="0001-01-05").data
+        self.assertEqual((first["from"], len(first["points"])), ("0001-01-01", 5))
+        self.assertEqual(self.get(resolution="week", to="0001-01-05").data["from"], "0001-01-01")
+        for resolution, points in (("day", 31), ("month", 1), ("year", 1)):
+            with self.subTest(resolution):
+                last = self.get(resolution=resolution, **{"from": "9999-12-01", "to": "9999-12-31"}).data
+                self.assertEqual((last["to"], len(last["points"])), ("9999-12-31", points))
+        # the week of 9999-12-31 ends in a year date cannot hold
+        self.assertEqual(self.get(resolution="week", **{"from": "9999-12-01", "to": "9999-12-31"}).status_code, 400)
+        self.assertEqual(self.get(resolution="week", **{"from": "9999-12-01", "to": "9999-12-26"}).status_code, 200)
+
+
+class RecomputeStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.users = [seed_user(f"recompute-{i}", 1, 10) for i in range(3)]
+
+    def streaks(self):
+        return list(Habit.objects.order_by("user_id").values_list("longest_streak", flat=True))
+
+    def recompute(self, *args):
+        out = StringIO()
+        call_command("recompute_stats", "--shard-size", "1", "--batch-size", "1", *args, stdout=out)
+        return out.getvalue()
+
+    def test_resumes_after_the_last_checkpoint(self):
+        expected = self.streaks()
+        Habit.objects.update(longest_streak=0, current_streak=0)
+        first, second, third = (u.id for u in self.users)
+        # a previous run that got through the first user and crashed before finishing the second shard
+        RecomputeCheckpoint.objects.bulk_create([
+            RecomputeCheckpoint(job="recompute-stats", first_user_id=first, last_user_id=first,
+                                processed_through=first),
+            RecomputeCheckpoint(job="recompute-stats", first_user_id=second, last_user_id=third),
+        ])
+        output = self.recompute()
+        self.assertIn("rows/s", output)
+        self.assertEqual(self.streaks(), [0] + expected[1:])
+        self.assertFalse(RecomputeCheckpoint.objects.filter(finished_at__isnull=True).exists())
+        self.assertIn("already done", self.recompute())
+
+        self.recompute("--restart")
+        self.assertEqual(self.streaks(), expected)
+        self.assertEqual(RecomputeCheckpoint.objects.count(), 3)
+
+
+@skipIf(settings.DATABASES["replica"]["TEST"].get("MIRROR"), "the replica's test database mirrors default")
+@override_settings(DATABASE_READ_REPLICA="replica")
+class ReplicaRoutingTests(TestCase):
+    # "replica" is a second test database (the stand-in from settings); its copy of the habit has a different name
+    databases = {"default", "replica"}
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("routed", 1, 5)
+        cls.habit = Habit.objects.get(user=cls.user)
+        get_user_model().objects.using("replica").bulk_create([get_user_model()(id=cls.user.id, username="routed")])
+        Habit.objects.using("replica").bulk_create([Habit(id=cls.habit.id, user_id=cls.user.id, name="on the replica")])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def analytics_name(self):
+        return self.client.get(reverse("habit-analytics", kwargs={"habit_id": self.habit.id})).data["name"]
+
+    def test_analytics_read_the_replica_until_the_user_writes(self):
+        self.assertEqual(self.analytics_name(), "on the replica")
+        self.assertIn(b"on the replica", b"".join(self.client.get(reverse("export"), {"dataset": "habits"}).streaming_content))
+        self.assertEqual(self.client.get(reverse("habit-detail", kwargs={"pk": self.habit.id})).data["name"], self.habit.name)
+
+        self.client.post(reverse("habit-logs", kwargs={"pk": self.habit.id}),
+                         {"log_date": str(today_utc_date()), "occurrences": 2}, format="json")
+        self.assertEqual(self.analytics_name(), self.habit.name)
+        cache.clear()  # the pin expires (and the entry cached from default goes)
+        self.assertEqual(self.analytics_name(), "on the replica")
+
+
+class IncrementTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("tapper", 1, 3)
+        cls.habit = Habit.objects.get(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("habit-increment", kwargs={"pk": self.habit.id})
+
+    def tap(self, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, data, format="json")
+
+    def test_taps_add_up_and_refresh_rollups_off_the_request(self):
+        day = today_utc_date() - timedelta(days=10)
+        with mock.patch.object(tasks.sync_increment_task, "delay") as schedule:
+            totals = [self.tap(by=by, log_date=str(day)).data["occurrences"] for by in (1, 1, 3)]
+        self.assertEqual(totals, [1, 2, 5])
+        self.assertEqual(HabitLog.objects.get(habit=self.habit, log_date=day).occurrences, 5)
+        # one refresh is queued for the three taps, and nothing derived moved before it runs
+        schedule.assert_called_once_with(self.habit.id, str(day))
+        self.assertFalse(HabitDailyStat.objects.filter(habit=self.habit, day=day).exists())
+        tasks.sync_increment_task.apply(schedule.call_args.args)
+        self.assertEqual(HabitDailyStat.objects.get(habit=self.habit, day=day).occurrences, 5)
+
+        # today was seeded empty; a tap extends the run of the two days before it
+        with mock.patch.object(tasks.sync_increment_task, "delay", side_effect=tasks.sync_increment_task) as schedule:
+            self.tap()
+            self.tap(log_date=str(day))
+        self.assertEqual(schedule.call_count, 2)
+        self.assertEqual(Habit.objects.get(id=self.habit.id).current_streak, 3)
+
+    def test_one_statement_per_tap(self):
+        with mock.patch.object(tasks.sync_increment_task, "delay"), CaptureQueriesContext(connection) as queries:
+            self.tap()
+        sql = [q["sql"] for q in queries if not q["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))]
+        # the upsert, the data-version bump and, after commit, its cached marker; no rollup or streak work
+        self.assertEqual(len(sql), 3, sql)
+        self.assertTrue(sql[0].startswith('INSERT INTO "habits_habitlog"') and "ON CONFLICT" in sql[0], sql[0])
+
+    def test_other_users_habit_and_bad_input(self):
+        other = APIClient()
+        other.force_authenticate(seed_user("not-the-owner", 1, 1))
+        self.assertEqual(other.post(self.url, {}, format="json").status_code, 404)
+        self.assertEqual(self.client.post(self.url, {"by": 0}, format="json").status_code, 400)
+        for pk in ("abc", "1.5", "-1"):
+            with self.subTest(pk):
+                self.assertEqual(self.client.post(f"/api/habits/{pk}/increment/", {}, format="json").status_code, 404)
+
+    @override_settings(INCREMENT_COALESCE_SECONDS=5)
+    def test_coalesced_taps_are_written_once_per_window(self):
+        today = today_utc_date()
+        before = HabitLog.objects.get(habit=self.habit, log_date=today).occurrences
+        with mock.patch.object(tasks.flush_increment_task, "apply_async") as schedule:
+            pending = [self.client.post(self.url, {}, format="json").data["pending"] for _ in range(3)]
+            self.assertEqual(pending, [1, 2, 3])
+            self.assertEqual(schedule.call_count, 1)
+            self.assertEqual(HabitLog.objects.get(habit=self.habit, log_date=today).occurrences, before)
+
+            self.assertEqual(increments.flush(self.habit.id, self.user.id, today), before + 3)
+            self.assertIsNone(increments.flush(self.habit.id, self.user.id, today))
+            self.client.post(self.url, {}, format="json")
+            self.assertEqual(schedule.call_count, 2)
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("etag", 2, 10)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+        self.url = reverse("habit-list") + "?expand=logs"
+
+    def test_unchanged_resource_is_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertIn("ETag", first.headers)
+        # only the JWT user lookup runs; no habit queries, no serialization
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first.headers["ETag"])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+        self.assertEqual(second.headers["ETag"], first.headers["ETag"])
+
+        since = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first.headers["Last-Modified"])
+        self.assertEqual(since.status_code, 304)
+
+    def test_any_write_changes_the_validators(self):
+        etag = self.client.get(self.url).headers["ETag"]
+        habit = Habit.objects.filter(user=self.user).first()
+        self.client.post(reverse("journal-list"), {"entry": "tempted", "habit": habit.id}, format="json")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+
+class FlakyBackend(notifications.MemoryBackend):
+    """Fails every message whose key is in ``failing``; tracks how many sends ran at once."""
+
+    def __init__(self, failing=(), **options):
+        super().__init__(**options)
+        self.failing = set(failing)
+        self.in_flight = self.peak = 0
+
+    async def send(self, message):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if message.key in self.failing:
+                raise ConnectionError(f"gateway down for {message.key}")
+            await super().send(message)
+        finally:
+            self.in_flight -= 1
+
+
+class NotificationTests(SimpleTestCase):
+
+    def setUp(self):
+        notifications.MemoryBackend.outbox.clear()
+        self.addCleanup(notifications.MemoryBackend.outbox.clear)
+
+    def messages(self, n):
+        return [notifications.Message(to=None, body=f"message {i}", key=i) for i in range(n)]
+
+    @override_settings(NOTIFICATION_BACKEND="habits.notifications.MemoryBackend", NOTIFICATION_OPTIONS={})
+    def test_send_batch_uses_the_configured_backend(self):
+        stats = notifications.send_batch(self.messages(3))
+        self.assertEqual((stats["backend"], stats["sent"], stats["failed"], stats["errors"]),
+                         ("MemoryBackend", 3, 0, []))
+        self.assertEqual(sorted(m.key for m in notifications.MemoryBackend.outbox), [0, 1, 2])
+
+    def test_failures_are_counted_not_raised(self):
+        backend = FlakyBackend(failing=range(0, 30, 2), concurrency=4)
+        stats = backend.send_batch(self.messages(30))
+        self.assertEqual((stats["sent"], stats["failed"]), (15, 15))
+        self.assertEqual(sorted(key for key, _ in stats["errors"]), list(range(0, 30, 2)))
+        self.assertIn("ConnectionError: gateway down for 4", dict(stats["errors"])[4])
+        self.assertEqual(len(notifications.MemoryBackend.outbox), 15)
+        self.assertEqual(backend.peak, 4)
+        # only the first 20 errors are kept
+        self.assertEqual(len(FlakyBackend(failing=range(25)).send_batch(self.messages(25))["errors"]), 20)
+
+    def test_http_backend_retries_server_errors(self):
+        attempts = Counter()
+
+        async def receive(request):
+            key = (await request.json())["key"]
+            attempts[key] += 1
+            # every message fails once; message 0 always fails
+            if key == 0 or attempts[key] == 1:
+                return web.Response(status=503)
+            return web.json_response({"status": "queued"}, status=201)
+
+        async def run():
+            app = web.Application()
+            app.router.add_post("/messages", receive)
+            async with TestServer(app) as server:
+                backend = notifications.HttpBackend(url=str(server.make_url("/messages")), attempts=3, concurrency=5)
+                return await backend.send_batch_async(self.messages(10))
+
+        stats = asyncio.run(run())
+        self.assertEqual((stats["sent"], stats["failed"]), (9, 1))
+        self.assertEqual(stats["errors"][0][0], 0)
+        self.assertEqual(attempts[0], 3)
+        self.assertEqual(sum(attempts.values()), 3 + 9 * 2)
+
+
+class ReminderDispatchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        user = get_user_model().objects.create_user("reminded")
+        cls.habit = Habit.objects.create(user=user, name="snooze")
+        cls.minute = datetime(2026, 1, 5, 8, 0, tzinfo=dt_timezone.utc)
+        Reminder.objects.bulk_create([Reminder(habit=cls.habit, reminder_time=time_of_day(8, 0, s))
+                                      for s in (0, 0, 0, 15, 15, 30, 45, 59)])
+        Reminder.objects.create(habit=cls.habit, reminder_time=time_of_day(8, 1))  # the next minute
+
+    def setUp(self):
+        self.sent = Counter()
+
+    def enqueue(self, ids, minute):
+        self.assertEqual(minute, self.minute)
+        self.sent.update(ids)
+
+    def due(self):
+        return set(Reminder.objects.filter(reminder_time__hour=8, reminder_time__minute=0).values_list("id", flat=True))
+
+    def test_restart_after_reminders_changed(self):
+        def crash(ids, minute):
+            self.enqueue(ids, minute)
+            raise RuntimeError("scheduler died")
+
+        with self.assertRaises(RuntimeError):
+            reminders.dispatch_minute(self.minute, crash, batch_size=3)
+        # removing a claimed reminder would shift every later batch boundary by one
+        Reminder.objects.filter(id=min(self.sent)).delete()
+        Reminder.objects.create(habit=self.habit, reminder_time=time_of_day(8, 0, 50))
+        self.assertEqual(reminders.dispatch_minute(self.minute, self.enqueue, batch_size=3), 6)
+        self.assertEqual(set(self.sent), self.due() | {min(self.sent)})
+        self.assertEqual(max(self.sent.values()), 1)
+        self.assertEqual(reminders.dispatch_minute(self.minute, self.enqueue, batch_size=3), 0)
+
+    def test_overlapping_schedulers_send_each_reminder_once(self):
+        def enqueue_and_overlap(ids, minute):
+            self.enqueue(ids, minute)
+            if len(self.sent) == len(ids):
+                # a second scheduler with another batch size runs while the first is mid-minute
+                reminders.dispatch_minute(minute, self.enqueue, batch_size=2)
+
+        self.assertEqual(reminders.dispatch_minute(self.minute, enqueue_and_overlap, batch_size=3), 3)
+        self.assertEqual(set(self.sent), self.due())
+        self.assertEqual(max(self.sent.values()), 1)
+        self.assertEqual(ReminderDispatch.objects.filter(minute=self.minute, complete=True).count(), 1)
+
+    @override_settings(NOTIFICATION_BACKEND="habits.notifications.MemoryBackend", NOTIFICATION_OPTIONS={})
+    def test_new_reminders_are_sent_at_their_time_not_on_creation(self):
+        client = APIClient()
+        client.force_authenticate(self.habit.user)
+        with mock.patch.object(tasks.send_sms_reminder_task, "delay") as texted:
+            response = client.post(reverse("habit-reminders", kwargs={"pk": self.habit.id}),
+                                   {"reminder_time": "07:30:00", "message": "drink water"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        texted.assert_not_called()
+
+        self.addCleanup(notifications.MemoryBackend.outbox.clear)
+        minute = self.minute.replace(hour=7, minute=30)
+        at = mock.patch("habits.reminders.timezone.now", return_value=minute + timedelta(seconds=20))
+        deliver_now = mock.patch.object(tasks.deliver_reminders_task, "delay", side_effect=tasks.deliver_reminders_task)
+        with at, deliver_now as deliver:
+            self.assertEqual(tasks.dispatch_reminders_task(), 1)
+        deliver.assert_called_once_with([response.data["id"]], minute.isoformat())
+        self.assertEqual([m.body for m in notifications.MemoryBackend.outbox], ["Hello reminded! drink water"])
+
+    def test_catch_up_skips_completed_minutes(self):
+        now = self.minute + timedelta(minutes=1, seconds=20)
+        def enqueue(ids, minute):
+            self.sent.update(ids)
+
+        sent = reminders.dispatch(enqueue, now=now, catch_up=2)
+        self.assertEqual(list(sent.values()), [0, 8, 1])
+        self.assertEqual(reminders.dispatch(enqueue, now=now, catch_up=2), dict.fromkeys(sent, 0))
+        self.assertEqual(len(self.sent), 9)
+
+
+class AsyncViewTests(TransactionTestCase):
+    """The async endpoints serve the same payloads as their sync counterparts."""
+
+    def setUp(self):
+        badges.reset_catalog()
+        cache.clear()
+        self.user = seed_user("async", 3, 40)
+        self.habit = Habit.objects.filter(user=self.user).order_by("id").first()
+        self.auth = {"authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+
+    async def test_matches_sync_payloads(self):
+        pairs = [
+            ("habit-report", "async-habit-report", {"pk": self.habit.id}),
+            ("habit-analytics", "async-habit-analytics", {"habit_id": self.habit.id}),
+            ("user-habits-summary", "async-user-habits-summary", None),
+            ("leaderboard", "async-leaderboard", {"board": "total"}),
+            ("leaderboard-rank", "async-leaderboard-rank", {"board": "7d"}),
+        ]
+        client = AsyncClient()
+        for sync_name, async_name, kwargs in pairs:
+            with self.subTest(async_name):
+                expected = await client.get(reverse(sync_name, kwargs=kwargs), headers=self.auth)
+                response = await client.get(reverse(async_name, kwargs=kwargs), headers=self.auth)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected.json())
+
+    async def test_dashboard_and_conditional_get(self):
+        client = AsyncClient()
+        response = await client.get(reverse("async-dashboard"), headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["habits"]), 3)
+        self.assertEqual(len(data["recent_logs"]), 10)
+        self.assertTrue(data["badges"])
+
+        again = await client.get(reverse("async-dashboard"),
+                                 headers={**self.auth, "if-none-match": response.headers["ETag"]})
+        self.assertEqual(again.status_code, 304)
+
+    async def test_requires_a_valid_token(self):
+        url = reverse("async-reports-summary")
+        self.assertEqual((await AsyncClient().get(url)).status_code, 401)
+        self.assertEqual((await AsyncClient().get(url, headers={"authorization": "Bearer nope"})).status_code, 401)
+        self.assertEqual((await AsyncClient().post(url, headers=self.auth)).status_code, 405)
+
+    async def test_bad_leaderboard_limit(self):
+        url = reverse("async-leaderboard", kwargs={"board": "total"})
+        self.assertEqual((await AsyncClient().get(url, {"limit": "abc"}, headers=self.auth)).status_code, 400)
+        self.assertEqual((await AsyncClient().get(url, {"limit": "-5"}, headers=self.auth)).status_code, 400)
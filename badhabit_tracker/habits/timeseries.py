@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+import numpy as np
+from .utils import today_utc_date
+
+
+class OccurrenceSeries:
+    """Dense per-day occurrence counts for one habit, indexed by day offset from ``start``.
+
+    Days outside [start, end] count as zero, so callers can ask for any window.
+    """
+
+    def __init__(self, start: date, values):
+        self.start = start
+        self.values = np.asarray(values, dtype=np.int64)
+        self._prefix = None
+
+    @classmethod
+    def from_pairs(cls, pairs, start: date = None, end: date = None):
+        """Build from (date, occurrences) pairs; duplicate days are summed."""
+        pairs = list(pairs)
+        if not pairs and (start is None or end is None):
+            return cls(start or today_utc_date(), [])
+        ordinals = np.fromiter((d.toordinal() for d, _ in pairs), dtype=np.int64, count=len(pairs))
+        counts = np.fromiter((v or 0 for _, v in pairs), dtype=np.int64, count=len(pairs))
+        lo = start.toordinal() if start else int(ordinals.min())
+        hi = end.toordinal() if end else int(ordinals.max())
+        keep = (ordinals >= lo) & (ordinals <= hi)
+        values = np.bincount(ordinals[keep] - lo, weights=counts[keep], minlength=hi - lo + 1)
+        return cls(date.fromordinal(lo), values.astype(np.int64))
+
+    @classmethod
+    def from_days(cls, days, start: date = None, end: date = None):
+        return cls.from_pairs(((d, 1) for d in days), start, end)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=len(self.values) - 1)
+
+    def offset(self, d: date) -> int:
+        return d.toordinal() - self.start.toordinal()
+
+    @property
+    def prefix(self):
+        # prefix[i] is the sum of values[:i]
+        if self._prefix is None:
+            self._prefix = np.concatenate(([0], np.cumsum(self.values)))
+        return self._prefix
+
+    def window_sum(self, start: date, end: date) -> int:
+        return int(self.window_sums([start], [end])[0])
+
+    def window_sums(self, starts, ends):
+        """Inclusive [start, end] totals for many windows at once, via the cumulative sum."""
+        n = len(self.values)
+        lo = np.clip(np.array([self.offset(d) for d in starts], dtype=np.int64), 0, n)
+        hi = np.clip(np.array([self.offset(d) for d in ends], dtype=np.int64) + 1, 0, n)
+        return np.where(hi > lo, self.prefix[hi] - self.prefix[np.minimum(lo, hi)], 0)
+
+    def total(self) -> int:
+        return int(self.prefix[-1])
+
+    def runs(self):
+        """Return (starts, lengths) of the runs of consecutive active days."""
+        active = np.concatenate(([0], (self.values > 0).astype(np.int8), [0]))
+        edges = np.diff(active)
+        starts = np.flatnonzero(edges == 1)
+        return starts, np.flatnonzero(edges == -1) - starts
+
+    def streaks(self, upto_date: date = None):
+        """Same contract as ``utils.compute_streaks``: (current streak ending at upto_date, longest run)."""
+        starts, lengths = self.runs()
+        longest = int(lengths.max()) if len(lengths) else 0
+        if upto_date is None:
+            upto_date = today_utc_date()
+        current = 0
+        at = self.offset(upto_date)
+        if 0 <= at < len(self.values) and self.values[at] > 0:
+            run = np.searchsorted(starts, at, side="right") - 1
+            current = int(at - starts[run] + 1)
+        return current, longest
+
+    def slice(self, start: date, end: date):
+        """Dense counts for [start, end], zero-filled outside the stored range."""
+        out = np.zeros((end - start).days + 1, dtype=np.int64)
+        lo, hi = self.offset(start), self.offset(end) + 1
+        src_lo, src_hi = max(lo, 0), min(hi, len(self.values))
+        if src_hi > src_lo:
+            out[src_lo - lo:src_hi - lo] = self.values[src_lo:src_hi]
+        return out
+
+    def series(self, start: date, end: date):
+        """[{"date", "occurrences"}] for every day in [start, end], as the report endpoints return it."""
+        out = []
+        day, one_day = start, timedelta(days=1)
+        for v in self.slice(start, end).tolist():
+            out.append({"date": day.isoformat(), "occurrences": v})
+            day += one_day
+        return out
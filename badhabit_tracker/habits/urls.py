@@ -5,7 +5,7 @@ from .views import (
     HabitViewSet, HabitLogViewSet, ReplacementPlanViewSet,
     RegisterView, logout_view, ReportsView, UserHabitsSummaryView, AchievementViewSet, ReportsSummaryView, HabitAnalyticsView,
     AchievementShareView, ActivityShareCreateView,
-    LeaderboardTopUsersView, LeaderboardTopStreaksView, ReminderViewSet, JournalEntryViewSet, BadgeViewSet, UserBadgeViewSet
+    LeaderboardTopUsersView, LeaderboardTopStreaksView, LeaderboardView, LeaderboardRankView, ExportView, ReminderViewSet, JournalEntryViewSet, BadgeViewSet, UserBadgeViewSet
 
 )
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
@@ -33,5 +33,8 @@ urlpatterns = [
     path("activity/share/", ActivityShareCreateView.as_view(), name="activity-share"),
     path("leaderboards/top-users/", LeaderboardTopUsersView.as_view(), name="leaderboard-top-users"),
     path("leaderboards/top-streaks/", LeaderboardTopStreaksView.as_view(), name="leaderboard-top-streaks"),
+    path("leaderboards/<str:board>/", LeaderboardView.as_view(), name="leaderboard"),
+    path("leaderboards/<str:board>/me/", LeaderboardRankView.as_view(), name="leaderboard-rank"),
+    path("export/", ExportView.as_view(), name="export"),
     path("", include(router.urls)),
 ]
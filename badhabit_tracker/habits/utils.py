@@ -17,10 +17,22 @@ def start_of_month(dt: date):
 
 def end_of_month(dt: date) -> date:
     if dt.month == 12:
-        next_month = dt.replace(year=dt.year + 1, month=1, day=1)
-    else:
-        next_month = dt.replace(month=dt.month + 1, day=1)
-    return next_month - timedelta(days=1)
+        return dt.replace(day=31)  # not via next January, which does not exist for 9999
+    return dt.replace(month=dt.month + 1, day=1) - timedelta(days=1)
+
+def start_of_year(dt: date) -> date:
+    return dt.replace(month=1, day=1)
+
+
+def end_of_year(dt: date) -> date:
+    return dt.replace(month=12, day=31)
+
+
+def start_of_prev_month(dt: date) -> date:
+    month_start = start_of_month(dt)
+    if month_start.month == 1:
+        return month_start.replace(year=month_start.year - 1, month=12)
+    return month_start.replace(month=month_start.month - 1)
 
 def daterange(start_date: date, end_date: date):
     for n in range((end_date - start_date).days + 1):
@@ -1,32 +1,71 @@
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Count, Sum, Max
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Count, Prefetch, OuterRef, Subquery, IntegerField
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets, permissions, generics, status
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated
-from django.contrib.auth.models import User
-from .models import Habit, HabitLog, ReplacementPlan, Achievement, ActivityShare, Reminder, JournalEntry, Badge, UserBadge
+from .models import Habit, HabitLog, ReplacementPlan, Achievement, ActivityShare, Reminder, JournalEntry, Badge, UserBadge, LeaderboardEntry
 from .serializers import (
     HabitSerializer, HabitLogSerializer, ReplacementPlanSerializer,RegisterSerializer, UserSerializer, AchievementSerializer, ActivityShareSerializer, ReminderSerializer, JournalEntrySerializer,
-        BadgeSerializer, UserBadgeSerializer
+        BadgeSerializer, UserBadgeSerializer, HabitLogBulkSerializer, HabitLogIncrementSerializer
 )
-from datetime import timedelta, date
-from .utils import today_utc_date, start_of_week, start_of_month, daterange, compute_streaks, safe_percent_change
-from .tasks import send_sms_reminder_task
+from . import leaderboards, bulk, exporters, caching, reports, increments, tasks
+from .utils import today_utc_date
+from .pagination import HabitLogPagination, CreatedAtPagination
+from .conditional import ConditionalGetMixin
+from .routing import ReplicaReadMixin, stream_from, current_alias
+
+NESTED_LIMIT = 20
+MAX_NESTED_LIMIT = 100
+HABIT_RELATIONS = {
+    'logs': HabitLog,
+    'plans': ReplacementPlan,
+    'reminders': Reminder,
+    'journal_entries': JournalEntry,
+}
 
 class RegisterView(generics.CreateAPIView):
     permission_classes = (AllowAny,)
     serializer_class = RegisterSerializer
 
 # Habit viewset (user-scoped)
-class HabitViewSet(viewsets.ModelViewSet):
+class HabitViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = HabitSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    replica_actions = ('report', 'series', 'series_list')
+    # increment works on the raw pk without get_object(); anything but digits is a 404 at the router
+    lookup_value_regex = r'\d+'
 
     def get_queryset(self):
-        return Habit.objects.filter(user=self.request.user)
+        qs = Habit.objects.filter(user=self.request.user)
+        if self.action in ('list', 'retrieve'):
+            qs = self._with_relations(qs)
+        return qs
+
+    def _with_relations(self, qs):
+        fields, expand = HabitSerializer.requested(self.request)
+        for name in HabitSerializer.COUNTS:
+            if fields is None or name in fields:
+                model = HABIT_RELATIONS[name[:-len('_count')]]
+                counts = model.objects.filter(habit=OuterRef('pk')).order_by().values('habit').annotate(n=Count('pk')).values('n')
+                qs = qs.annotate(**{name: Coalesce(Subquery(counts, output_field=IntegerField()), 0)})
+        limit = self.request.query_params.get('expand_limit', str(NESTED_LIMIT))
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_NESTED_LIMIT:
+            raise ValidationError({'expand_limit': [f"Must be an integer from 1 to {MAX_NESTED_LIMIT}."]})
+        limit = int(limit)
+        for name in expand:
+            model = HABIT_RELATIONS[name]
+            # sliced prefetches are bounded per habit (window function), not over the whole list
+            qs = qs.prefetch_related(Prefetch(name, queryset=model.objects.all()[:limit],
+                                              to_attr=HabitSerializer.EXPANDABLE[name]))
+        return qs
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -36,13 +75,10 @@ class HabitViewSet(viewsets.ModelViewSet):
     def logs(self, request, pk=None):
         habit = self.get_object()
         if request.method == 'GET':
-            qs = habit.logs.all().order_by('-log_date')
-            page = self.paginate_queryset(qs)
-            if page is not None:
-                serializer = HabitLogSerializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
-            serializer = HabitLogSerializer(qs, many=True)
-            return Response(serializer.data)
+            paginator = HabitLogPagination()
+            page = paginator.paginate_queryset(habit.logs.all(), request, view=self)
+            serializer = HabitLogSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         else:  # POST
             data = request.data.copy()
             serializer = HabitLogSerializer(data=data)
@@ -61,6 +97,34 @@ class HabitViewSet(viewsets.ModelViewSet):
                 return Response(s.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['post'], url_path='logs/bulk')
+    def logs_bulk(self, request, pk=None):
+        habit = self.get_object()
+        return _bulk_upsert_logs(request, habit=habit)
+
+    # /api/habits/{id}/increment/ {"by": 1, "log_date": optional, default today}: one atomic upsert per tap
+    @action(detail=True, methods=['post'], url_path='increment')
+    def increment(self, request, pk=None):
+        serializer = HabitLogIncrementSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        log_date = serializer.validated_data.get('log_date') or today_utc_date()
+        by = serializer.validated_data['by']
+        if settings.INCREMENT_COALESCE_SECONDS:
+            if not Habit.objects.filter(pk=pk, user=request.user).exists():
+                return Response({"detail": "No Habit matches the given query."}, status=404)
+            pending, opened = increments.coalesce(int(pk), log_date, by)
+            if opened:
+                tasks.flush_increment_task.apply_async((int(pk), request.user.id, log_date.isoformat()),
+                                                       countdown=settings.INCREMENT_COALESCE_SECONDS)
+            return Response({"habit_id": int(pk), "log_date": log_date, "pending": pending},
+                            status=status.HTTP_202_ACCEPTED)
+        occurrences = increments.increment(int(pk), request.user.id, log_date, by)
+        if occurrences is None:
+            return Response({"detail": "No Habit matches the given query."}, status=404)
+        if increments.open_sync(int(pk), log_date):
+            transaction.on_commit(lambda: tasks.sync_increment_task.delay(int(pk), log_date.isoformat()))
+        return Response({"habit_id": int(pk), "log_date": log_date, "occurrences": occurrences})
+
     @action(detail=True, methods=['get', 'post'], url_path='plans')
     def plans(self, request, pk=None):
         habit = self.get_object()
@@ -83,9 +147,10 @@ class HabitViewSet(viewsets.ModelViewSet):
     def reminders(self, request, pk=None):
         habit = self.get_object()
         if request.method == 'GET':
-            qs = habit.reminders.all()
-            serializer = ReminderSerializer(qs, many=True)
-            return Response(serializer.data)
+            paginator = CreatedAtPagination()
+            page = paginator.paginate_queryset(habit.reminders.all(), request, view=self)
+            serializer = ReminderSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         else:
             data = request.data.copy()
             serializer = ReminderSerializer(data=data)
@@ -98,57 +163,50 @@ class HabitViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'], url_path='report', permission_classes=[permissions.IsAuthenticated])
     def report(self, request, pk=None):
-        habit = self.get_object()
-        today = today_utc_date()
-
-        start_30 = today - timedelta(days=29)
-        week_start = start_of_week(today)
-        month_start = start_of_month(today)
-
-        earliest_needed = today - timedelta(days=365)
-        logs_qs = HabitLog.objects.filter(habit=habit, log_date__gte=earliest_needed).order_by('log_date')
-
-        occurrences_by_date = {}
-        for log in logs_qs:
-            d = log.log_date
-            occurrences_by_date[d] = occurrences_by_date.get(d, 0) + (log.occurrences or 0)
-
-        daily_count = occurrences_by_date.get(today, 0)
-        weekly_count = sum(v for k, v in occurrences_by_date.items() if k >= week_start and k <= today)
-        monthly_count = sum(v for k, v in occurrences_by_date.items() if k >= month_start and k <= today)
-        total_logs = sum(occurrences_by_date.values())
-
-        last_30_series = []
-        for d in daterange(start_30, today):
-            last_30_series.append({"date": d.isoformat(), "occurrences": occurrences_by_date.get(d, 0)})
-
-        total_last_30 = sum(item["occurrences"] for item in last_30_series)
-        avg_daily_last_30 = total_last_30 / 30.0
-
-        dates_with_logs = {d for d, v in occurrences_by_date.items() if v > 0}
-        current_streak, longest_streak = compute_streaks(dates_with_logs, upto_date=today)
-
-        data = {
-            "habit_id": habit.id,
-            "habit_name": habit.name,
-            "daily_count": daily_count,
-            "weekly_count": weekly_count,
-            "monthly_count": monthly_count,
-            "total_occurrences": total_logs,
-            "avg_daily_last_30": round(avg_daily_last_30, 2),
-            "last_30_days": last_30_series,
-            "current_streak_days": current_streak,
-            "longest_streak_days": longest_streak,
-        }
+        # keyed by habit id, so a hit skips get_object(); only the owner's computed reports are ever stored
+        data = caching.cached("habit-report", request.user.id, lambda: reports.habit_report(self.get_object()), pk)
         return Response(data, status=status.HTTP_200_OK)
 
-
-class HabitLogViewSet(viewsets.ModelViewSet):
+    # /api/habits/{id}/series/?resolution=day|week|month|year&from=&to=, bucket counts from the rollup pyramid
+    @action(detail=True, methods=['get'], url_path='series')
+    def series(self, request, pk=None):
+        resolution, starts = reports.series_range(request.query_params)
+
+        def compute():
+            habit = self.get_object()
+            return reports.habit_series([(habit.id, habit.name)], resolution, starts)
+        data = caching.cached("habit-series", request.user.id, compute, pk, resolution, starts[0], starts[-1])
+        habit = data["habits"][0]
+        return Response({**habit, **{k: v for k, v in data.items() if k != "habits"}})
+
+    # /api/habits/series/?ids=1,2,3&resolution=&from=&to= - several habits (default: all of the user's) in one query
+    @action(detail=False, methods=['get'], url_path='series', url_name='series-list')
+    def series_list(self, request):
+        resolution, starts = reports.series_range(request.query_params)
+        try:
+            ids = sorted({int(i) for i in request.query_params.get("ids", "").split(",") if i})
+        except ValueError:
+            return Response({"ids": ["Pass comma-separated habit ids."]}, status=400)
+        if len(ids) > reports.MAX_SERIES_HABITS:
+            return Response({"ids": [f"At most {reports.MAX_SERIES_HABITS} habits per request."]}, status=400)
+
+        def compute():
+            habits = Habit.objects.filter(user=request.user).order_by('id')
+            if ids:
+                habits = habits.filter(id__in=ids)
+            habits = list(habits.values_list('id', 'name')[:reports.MAX_SERIES_HABITS])
+            return reports.habit_series(habits, resolution, starts)
+        key = ",".join(map(str, ids)) or "all"
+        return Response(caching.cached("habits-series", request.user.id, compute, key, resolution, starts[0], starts[-1]))
+
+
+class HabitLogViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = HabitLogSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = HabitLogPagination
 
     def get_queryset(self):
-        return HabitLog.objects.filter(habit__user=self.request.user)
+        return HabitLog.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         habit = serializer.validated_data.get('habit')
@@ -156,7 +214,40 @@ class HabitLogViewSet(viewsets.ModelViewSet):
             raise PermissionError("Cannot create logs for this habit")
         serializer.save()
 
-class ReplacementPlanViewSet(viewsets.ModelViewSet):
+    # cross-habit backfill via /api/logs/bulk/, every entry names its habit
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        return _bulk_upsert_logs(request)
+
+
+def _bulk_upsert_logs(request, habit=None):
+    serializer = HabitLogBulkSerializer(data=request.data, many=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    entries = serializer.validated_data
+
+    if habit is not None:
+        for entry in entries:
+            entry.pop('habit', None)
+            entry['habit_id'] = habit.id
+            entry['user_id'] = habit.user_id
+    else:
+        if any('habit' not in entry for entry in entries):
+            return Response({"habit": ["Every entry needs a habit id."]}, status=status.HTTP_400_BAD_REQUEST)
+        habit_ids = {entry['habit'] for entry in entries}
+        owned = set(Habit.objects.filter(user=request.user, id__in=habit_ids).values_list('id', flat=True))
+        unknown = sorted(habit_ids - owned)
+        if unknown:
+            return Response({"habit": [f"Unknown habit ids: {unknown}"]}, status=status.HTTP_400_BAD_REQUEST)
+        for entry in entries:
+            entry['habit_id'] = entry.pop('habit')
+            entry['user_id'] = request.user.id
+
+    changes = bulk.upsert_logs(entries)
+    return Response({"upserted": sum(len(days) for days in changes.values()), "habits": len(changes)},
+                    status=status.HTTP_200_OK)
+
+class ReplacementPlanViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ReplacementPlanSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
@@ -176,38 +267,17 @@ def logout_view(request):
     return Response({"detail": "Logout successful"}, status=status.HTTP_200_OK)
 
 
-class ReportsView(generics.GenericAPIView):
+class ReportsView(ReplicaReadMixin, ConditionalGetMixin, generics.GenericAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get(self, request, *args, **kwargs):
-        habits = Habit.objects.filter(user=request.user).annotate(
-            total_logs=Count("logs"),
-            last_log=Max("logs__log_date")
-        ).values("id", "name", "category", "target_frequency", "total_logs", "last_log")
-        return Response({"habits": list(habits)})
+        return Response(caching.cached("reports", request.user.id, lambda: reports.habit_totals(request.user)))
 
-class UserHabitsSummaryView(generics.GenericAPIView):
+class UserHabitsSummaryView(ReplicaReadMixin, ConditionalGetMixin, generics.GenericAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get(self, request):
-        today = today_utc_date()
-        week_start = start_of_week(today)
-        month_start = start_of_month(today)
-
-        habits = Habit.objects.filter(user=request.user)
-        summary = []
-        for habit in habits:
-            total_logs = HabitLog.objects.filter(habit=habit).aggregate(total=Sum('occurrences'))['total'] or 0
-            last_log = HabitLog.objects.filter(habit=habit).order_by('-log_date').first()
-            last_log_date = last_log.log_date.isoformat() if last_log else None
-
-            summary.append({
-                "habit_id": habit.id,
-                "name": habit.name,
-                "total_occurrences": total_logs,
-                "last_log_date": last_log_date,
-            })
-        return Response({"habits": summary})
+        return Response(reports.habit_occurrence_totals(request.user))
 
 
 class AchievementViewSet(viewsets.ReadOnlyModelViewSet):
@@ -217,103 +287,20 @@ class AchievementViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return Achievement.objects.filter(user=self.request.user)
     
-class ReportsSummaryView(generics.GenericAPIView):
+class ReportsSummaryView(ReplicaReadMixin, ConditionalGetMixin, generics.GenericAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get(self, request):
-        user = request.user
-        today = today_utc_date()
-        week_start = start_of_week(today)
-        prev_week_start = week_start - timedelta(days=7)
-        prev_week_end = week_start - timedelta(days=1)
-        month_start = start_of_month(today)
-        if month_start.month == 1:
-            prev_month_start = month_start.replace(year=month_start.year-1, month=12)
-        else:
-            prev_month_start = month_start.replace(month=month_start.month-1)
-        prev_month_end = month_start - timedelta(days=1)
-
-        habits = Habit.objects.filter(user=user).order_by('-created_at')
-        out = []
-        for h in habits:
-            logs = h.logs.all()
-            occ_map = {}
-            for l in logs:
-                occ_map[l.log_date] = occ_map.get(l.log_date, 0) + (l.occurrences or 0)
-
-            today_count = occ_map.get(today, 0)
-            week_count = sum(v for d, v in occ_map.items() if d >= week_start and d <= today)
-            prev_week_count = sum(v for d, v in occ_map.items() if d >= prev_week_start and d <= prev_week_end)
-            month_count = sum(v for d, v in occ_map.items() if d >= month_start and d <= today)
-            prev_month_count = sum(v for d, v in occ_map.items() if d >= prev_month_start and d <= prev_month_end)
-
-            total = sum(occ_map.values())
-            dates_with = {d for d, v in occ_map.items() if v > 0}
-            current_streak, longest_streak = compute_streaks(dates_with, upto_date=today)
-
-            out.append({
-                "habit_id": h.id,
-                "name": h.name,
-                "today_count": today_count,
-                "week_count": week_count,
-                "week_percent_change": safe_percent_change(week_count, prev_week_count),
-                "month_count": month_count,
-                "month_percent_change": safe_percent_change(month_count, prev_month_count),
-                "total_occurrences": total,
-                "current_streak": current_streak,
-                "longest_streak": longest_streak,
-            })
-        return Response({"habits": out})
-
-class HabitAnalyticsView(generics.GenericAPIView):
+        return Response(caching.cached("reports-summary", request.user.id, lambda: reports.habits_summary(request.user)))
+
+class HabitAnalyticsView(ReplicaReadMixin, ConditionalGetMixin, generics.GenericAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get(self, request, habit_id):
-        user = request.user
-        habit = Habit.objects.filter(id=habit_id, user=user).first()
-        if not habit:
+        data = caching.cached("habit-analytics", request.user.id,
+                              lambda: reports.habit_analytics(request.user, habit_id), habit_id)
+        if data is None:
             return Response({"detail": "Not found"}, status=404)
-
-        today = today_utc_date()
-        start_30 = today - timedelta(days=29)
-        earliest = today - timedelta(days=365)
-        logs = habit.logs.filter(log_date__gte=earliest).order_by('log_date')
-
-        occ_map = {}
-        for l in logs:
-            occ_map[l.log_date] = occ_map.get(l.log_date, 0) + (l.occurrences or 0)
-
-        last_30 = [{"date": d.isoformat(), "occurrences": occ_map.get(d, 0)} for d in daterange(start_30, today)]
-        dates_with = {d for d, v in occ_map.items() if v > 0}
-        current_streak, longest_streak = compute_streaks(dates_with, upto_date=today)
-
-        week_start = start_of_week(today)
-        prev_week_start = week_start - timedelta(days=7)
-        prev_week_end = week_start - timedelta(days=1)
-
-        week_count = sum(v for d, v in occ_map.items() if d >= week_start and d <= today)
-        prev_week_count = sum(v for d, v in occ_map.items() if d >= prev_week_start and d <= prev_week_end)
-        month_start = start_of_month(today)
-        if month_start.month == 1:
-            prev_month_start = month_start.replace(year=month_start.year-1, month=12)
-        else:
-            prev_month_start = month_start.replace(month=month_start.month-1)
-        prev_month_end = month_start - timedelta(days=1)
-        month_count = sum(v for d, v in occ_map.items() if d >= month_start and d <= today)
-        prev_month_count = sum(v for d, v in occ_map.items() if d >= prev_month_start and d <= prev_month_end)
-
-        data = {
-            "habit_id": habit.id,
-            "name": habit.name,
-            "last_30_days": last_30,
-            "current_streak": current_streak,
-            "longest_streak": longest_streak,
-            "week_count": week_count,
-            "week_percent_change": safe_percent_change(week_count, prev_week_count),
-            "month_count": month_count,
-            "month_percent_change": safe_percent_change(month_count, prev_month_count),
-            "total_occurrences": sum(occ_map.values()),
-        }
         return Response(data)
 
 class AchievementShareView(generics.CreateAPIView):
@@ -340,56 +327,79 @@ class ActivityShareCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(user_from=self.request.user)
 
-class LeaderboardTopUsersView(generics.GenericAPIView):
+def _leaderboard_page(request, board, score_key):
+    return Response(leaderboards.page(board, score_key, request.query_params, request.build_absolute_uri()))
+
+
+class LeaderboardTopUsersView(ReplicaReadMixin, generics.GenericAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get(self, request):
-        limit = int(request.query_params.get("limit", 10))
-        users = User.objects.all()
-        leaderboard = []
-        for u in users:
-            total = HabitLog.objects.filter(habit__user=u).aggregate(total=Sum('occurrences'))['total'] or 0
-            leaderboard.append({"user_id": u.id, "username": u.username, "total_occurrences": total})
-        leaderboard.sort(key=lambda x: x["total_occurrences"], reverse=True)
-        return Response({"leaderboard": leaderboard[:limit]})
+        return _leaderboard_page(request, LeaderboardEntry.TOTAL, "total_occurrences")
 
 
-class LeaderboardTopStreaksView(generics.GenericAPIView):
+class LeaderboardTopStreaksView(ReplicaReadMixin, generics.GenericAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get(self, request):
-        limit = int(request.query_params.get("limit", 10))
-        today = today_utc_date()
-        users = User.objects.all()
-        out = []
-        for u in users:
-            user_habits = Habit.objects.filter(user=u)
-            best_current = 0
-            for h in user_habits:
-                dates_with = {l.log_date for l in h.logs.all() if (l.occurrences or 0) > 0}
-                current_streak, _ = compute_streaks(dates_with, upto_date=today)
-                if current_streak > best_current:
-                    best_current = current_streak
-            out.append({"user_id": u.id, "username": u.username, "current_streak": best_current})
-        out.sort(key=lambda x: x["current_streak"], reverse=True)
-        return Response({"leaderboard": out[:limit]})
+        return _leaderboard_page(request, LeaderboardEntry.STREAK, "current_streak")
+
+
+class LeaderboardView(ReplicaReadMixin, generics.GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, board):
+        if board not in leaderboards.BOARDS:
+            return Response({"detail": "Not found"}, status=404)
+        return _leaderboard_page(request, board, "score")
+
+
+class LeaderboardRankView(ReplicaReadMixin, generics.GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, board):
+        if board not in leaderboards.BOARDS:
+            return Response({"detail": "Not found"}, status=404)
+        entry = leaderboards.rank_of(board, request.user)
+        if entry is None:
+            return Response({"detail": "Not ranked yet"}, status=404)
+        return Response(entry)
     
-class ReminderViewSet(viewsets.ModelViewSet):
+class ExportView(ReplicaReadMixin, generics.GenericAPIView):
+    """Stream the caller's history: ?fmt=csv|ndjson&dataset=habits,logs,journal,badges&gzip=1"""
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        fmt = request.query_params.get("fmt", "ndjson")
+        if fmt not in exporters.FORMATS:
+            return Response({"fmt": [f"Choose one of {', '.join(exporters.FORMATS)}."]}, status=400)
+        default = "logs" if fmt == "csv" else ",".join(exporters.DATASETS)
+        datasets = [d for d in request.query_params.get("dataset", default).split(",") if d]
+        unknown = [d for d in datasets if d not in exporters.DATASETS]
+        if unknown or not datasets or (fmt == "csv" and len(datasets) != 1):
+            return Response({"dataset": ["Pick datasets from habits, logs, journal, badges (exactly one for csv)."]}, status=400)
+        gzip = request.query_params.get("gzip") in ("1", "true")
+
+        # the body is produced after the view returns, so carry the replica choice into the iteration
+        response = StreamingHttpResponse(stream_from(current_alias(), exporters.stream(request.user, fmt, datasets, gzip=gzip)),
+                                         content_type="application/gzip" if gzip else exporters.CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = f'attachment; filename="{exporters.filename(request.user, fmt, datasets, gzip)}"'
+        return response
+
+
+class ReminderViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ReminderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtPagination
 
     def get_queryset(self):
         return Reminder.objects.filter(habit__user=self.request.user)
 
-    def perform_create(self, serializer):
-        reminder = serializer.save()
-        send_sms_reminder_task.delay(reminder.habit.user.username, reminder.message)
-        return reminder
-
 
-class JournalEntryViewSet(viewsets.ModelViewSet):
+class JournalEntryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = JournalEntrySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtPagination
 
     def get_queryset(self):
         return JournalEntry.objects.filter(user=self.request.user)
@@ -409,4 +419,4 @@ class UserBadgeViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return UserBadge.objects.filter(user=self.request.user)
\ No newline at end of file
+        return UserBadge.objects.filter(user=self.request.user).select_related("badge")
\ No newline at end of file
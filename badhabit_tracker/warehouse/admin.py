@@ -0,0 +1,38 @@
+from django.contrib import admin
+from habits.admin import LargeTableAdmin
+from .models import DimUser, DimCohort, FactHabitDay, LoadState
+
+
+class ReadOnlyAdmin(LargeTableAdmin):
+    # warehouse rows are written by warehouse.etl only
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(FactHabitDay)
+class FactHabitDayAdmin(ReadOnlyAdmin):
+    list_display = ("day", "category", "user_id", "habit_id", "cohort_week", "occurrences")
+    list_filter = ("category",)
+    search_fields = ("=user_id", "=habit_id")
+    date_hierarchy = "day"
+    ordering = ("-day",)
+
+
+@admin.register(DimUser)
+class DimUserAdmin(ReadOnlyAdmin):
+    list_display = ("user_id", "signup_date", "cohort_week")
+    search_fields = ("=user_id",)
+
+
+@admin.register(DimCohort)
+class DimCohortAdmin(ReadOnlyAdmin):
+    list_display = ("week_start", "users")
+
+
+@admin.register(LoadState)
+class LoadStateAdmin(ReadOnlyAdmin):
+    list_display = ("name", "watermark", "loaded_at", "rows_loaded")
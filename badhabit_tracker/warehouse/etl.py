@@ -0,0 +1,151 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from habits import routing
+from habits.models import Habit, HabitLog
+from habits.utils import start_of_week
+from .models import DimUser, DimCohort, FactHabitDay, LoadState
+
+User = get_user_model()
+
+STATE = "habit_logs"
+BATCH_SIZE = 2000
+# a row written by a transaction that was still open at the last run (or not yet on the replica) carries an
+# updated_at just below its watermark; every run re-reads this margin, which the idempotent upserts make harmless
+OVERLAP = timedelta(minutes=10)
+
+
+def _cohort(date_joined):
+    day = date_joined.date()
+    return day, start_of_week(day)
+
+
+def _upsert_facts(rows):
+    FactHabitDay.objects.bulk_create(rows, batch_size=BATCH_SIZE, update_conflicts=True,
+                                     unique_fields=("habit_id", "day"),
+                                     update_fields=("user_id", "category", "cohort_week", "occurrences"))
+
+
+def _log_pages(source, since):
+    """Yield the HabitLog rows of ``source`` updated after ``since`` (all if None), BATCH_SIZE at a time.
+
+    Pages are keyed on (updated_at, id), so each one is a range of habitlog_updated_idx.
+    """
+    fields = ("id", "updated_at", "habit_id", "log_date", "occurrences",
+              "habit__user_id", "habit__category", "habit__user__date_joined")
+    logs = HabitLog.objects.using(source).order_by("updated_at", "id")
+    if since is not None:
+        logs = logs.filter(updated_at__gt=since)
+    page = list(logs.values_list(*fields)[:BATCH_SIZE])
+    while page:
+        yield page
+        updated_at, last_id = page[-1][1], page[-1][0]
+        after = Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=last_id)
+        page = list(logs.filter(after).values_list(*fields)[:BATCH_SIZE])
+
+
+def _load_facts(page):
+    """Upsert one fact per log row of ``page``; returns {user_id: date_joined} of their users."""
+    users, facts = {}, []
+    for _, _, habit_id, day, occurrences, user_id, category, joined in page:
+        users[user_id] = joined
+        facts.append(FactHabitDay(user_id=user_id, habit_id=habit_id, category=category,
+                                  cohort_week=_cohort(joined)[1], day=day, occurrences=occurrences or 0))
+    _upsert_facts(facts)
+    return users
+
+
+def _load_users(users):
+    """Insert the user dimension rows of ``users`` ({user_id: date_joined}); refresh and return their cohort weeks."""
+    rows = [DimUser(user_id=uid, signup_date=signup, cohort_week=week)
+            for uid, (signup, week) in ((uid, _cohort(joined)) for uid, joined in users.items())]
+    DimUser.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    weeks = {row.cohort_week for row in rows}
+    sizes = DimUser.objects.filter(cohort_week__in=weeks).values_list("cohort_week").annotate(n=Count("user_id"))
+    DimCohort.objects.bulk_create([DimCohort(week_start=week, users=n) for week, n in sizes], batch_size=BATCH_SIZE,
+                                  update_conflicts=True, unique_fields=("week_start",), update_fields=("users",))
+    return weeks
+
+
+def _recategorise(habits):
+    """Carry category edits of ``habits`` (a Habit queryset) over to their existing facts."""
+    by_category = defaultdict(list)
+    for habit_id, category in habits.values_list("id", "category").iterator(chunk_size=BATCH_SIZE):
+        by_category[category].append(habit_id)
+    changed = 0
+    for category, ids in by_category.items():
+        for i in range(0, len(ids), BATCH_SIZE):
+            changed += (FactHabitDay.objects.filter(habit_id__in=ids[i:i + BATCH_SIZE])
+                        .exclude(category=category).update(category=category))
+    return changed
+
+
+def _reset():
+    """Empty the warehouse tables a batch at a time and forget the watermark."""
+    LoadState.objects.update_or_create(name=STATE, defaults={"watermark": None})
+    for model in (FactHabitDay, DimUser, DimCohort):
+        while True:
+            keys = list(model.objects.values_list("pk", flat=True)[:BATCH_SIZE])
+            if not keys:
+                break
+            model.objects.filter(pk__in=keys).delete()
+
+
+def load(full=False):
+    """Load HabitLog, Habit and User rows changed since the last run into the warehouse tables.
+
+    Source rows are read from the read replica when there is one. Each batch commits on its own and moves
+    the watermark up to its last log, so a run that stops part way resumes from there.
+
+    ``full`` empties the warehouse and reloads everything; run it now and then to drop facts of deleted
+    logs, habits and users, which the updated_at watermark cannot see.
+    """
+    started = time.perf_counter()
+    now = timezone.now()
+    source = routing.read_alias()
+    state, _ = LoadState.objects.get_or_create(name=STATE)
+    if full or state.watermark is None:
+        _reset()
+        since = None
+        habits, users = Habit.objects.none(), User.objects.using(source).all()
+    else:
+        since = state.watermark - OVERLAP
+        habits = Habit.objects.using(source).filter(updated_at__gt=since)
+        users = User.objects.using(source).filter(date_joined__gt=since)
+
+    # habit edits and new users do not move the watermark: a run that fails redoes them
+    recategorised = _recategorise(habits)
+    seen, weeks, batch = set(), set(), {}
+    for uid, joined in users.values_list("id", "date_joined").iterator(chunk_size=BATCH_SIZE):
+        batch[uid] = joined
+        if len(batch) >= BATCH_SIZE:
+            weeks |= _load_users(batch)
+            seen.update(batch)
+            batch = {}
+    weeks |= _load_users(batch)
+    seen.update(batch)
+
+    facts = 0
+    for page in _log_pages(source, since):
+        with transaction.atomic():
+            batch = _load_facts(page)
+            weeks |= _load_users(batch)
+            LoadState.objects.filter(name=STATE).update(watermark=page[-1][1],
+                                                        rows_loaded=F("rows_loaded") + len(page))
+        seen.update(batch)
+        facts += len(page)
+
+    LoadState.objects.filter(name=STATE).update(watermark=now, loaded_at=timezone.now())
+    return {
+        "mode": "full" if since is None else "incremental",
+        "facts": facts,
+        "users": len(seen),
+        "cohorts": len(weeks),
+        "recategorised": recategorised,
+        "watermark": now.isoformat(),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from warehouse import etl
+
+
+class Command(BaseCommand):
+    help = "Load habit logs, habits and users changed since the last run into the analytics warehouse tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true",
+                            help="Empty and reload the warehouse (also drops facts of deleted rows)")
+
+    def handle(self, *args, **options):
+        stats = etl.load(full=options["full"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['mode']} load: {stats['facts']} facts, {stats['users']} users, {stats['cohorts']} cohorts, "
+            f"{stats['recategorised']} facts recategorised in {stats['seconds']:.2f}s (watermark {stats['watermark']})."))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DimCohort',
+            fields=[
+                ('week_start', models.DateField(primary_key=True, serialize=False)),
+                ('users', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('-week_start',),
+            },
+        ),
+        migrations.CreateModel(
+            name='DimUser',
+            fields=[
+                ('user_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('signup_date', models.DateField()),
+                ('cohort_week', models.DateField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LoadState',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('loaded_at', models.DateTimeField(blank=True, null=True)),
+                ('rows_loaded', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FactHabitDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('habit_id', models.IntegerField()),
+                ('category', models.CharField(max_length=20)),
+                ('cohort_week', models.DateField()),
+                ('day', models.DateField()),
+                ('occurrences', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'day'], name='fact_category_day_idx'), models.Index(fields=['cohort_week', 'day', 'user_id'], name='fact_cohort_day_idx')],
+                'unique_together': {('habit_id', 'day')},
+            },
+        ),
+    ]
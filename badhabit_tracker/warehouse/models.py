@@ -0,0 +1,56 @@
+from django.db import models
+
+# Star schema for cross-user analytics, filled by warehouse.etl from the OLTP tables. Keys are plain ids,
+# not foreign keys: nothing here joins back to (or locks) habits/auth rows, and the tables could live
+# in a separate database.
+
+
+class DimUser(models.Model):
+    user_id = models.IntegerField(primary_key=True)
+    signup_date = models.DateField()
+    cohort_week = models.DateField(db_index=True)  # Monday of the signup week
+
+    def __str__(self):
+        return f"user {self.user_id} (cohort {self.cohort_week})"
+
+
+class DimCohort(models.Model):
+    week_start = models.DateField(primary_key=True)
+    users = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ("-week_start",)
+
+    def __str__(self):
+        return f"cohort {self.week_start}: {self.users} users"
+
+
+class FactHabitDay(models.Model):
+    """One habit's occurrences on one day, with its user, category and cohort denormalised for grouping."""
+    user_id = models.IntegerField()
+    habit_id = models.IntegerField()
+    category = models.CharField(max_length=20)
+    cohort_week = models.DateField()
+    day = models.DateField()
+    occurrences = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("habit_id", "day")
+        indexes = [
+            models.Index(fields=["category", "day"], name="fact_category_day_idx"),
+            models.Index(fields=["cohort_week", "day", "user_id"], name="fact_cohort_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.habit_id} @ {self.day}: {self.occurrences}"
+
+
+class LoadState(models.Model):
+    """High-water mark of an incremental load: source rows updated after ``watermark`` are still to load."""
+    name = models.CharField(max_length=50, primary_key=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+    loaded_at = models.DateTimeField(null=True, blank=True)
+    rows_loaded = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} @ {self.watermark}"
@@ -0,0 +1,62 @@
+from collections import defaultdict
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from .models import DimCohort, FactHabitDay, LoadState
+from . import etl
+
+# Platform-wide analytics; everything here reads the warehouse tables only.
+
+TRUNCATE = {"week": TruncWeek, "month": TruncMonth}
+RESOLUTIONS = ("day", *TRUNCATE)
+
+
+def category_trends(start, end, resolution="week"):
+    """Occurrences, active users and active habits per category and ``resolution`` bucket over [start, end]."""
+    facts = FactHabitDay.objects.filter(day__range=(start, end), occurrences__gt=0)
+    bucket = TRUNCATE[resolution]("day") if resolution in TRUNCATE else "day"
+    rows = (facts.annotate(bucket=bucket).values_list("category", "bucket")
+            .annotate(occurrences=Sum("occurrences"), users=Count("user_id", distinct=True),
+                      habits=Count("habit_id", distinct=True))
+            .order_by("category", "bucket"))
+    categories = defaultdict(list)
+    for category, start_day, occurrences, users, habits in rows:
+        categories[category].append({"start": start_day.isoformat(), "occurrences": occurrences,
+                                     "active_users": users, "active_habits": habits})
+    return {"resolution": resolution, "from": start.isoformat(), "to": end.isoformat(), "categories": categories}
+
+
+def cohort_retention(start, end, weeks=12):
+    """Share of each signup-week cohort in [start, end] active (any occurrence) in each of its first ``weeks`` weeks."""
+    cohorts = list(DimCohort.objects.filter(week_start__range=(start, end)).order_by("week_start")
+                   .values_list("week_start", "users"))
+    active = defaultdict(dict)
+    if cohorts:
+        rows = (FactHabitDay.objects.filter(cohort_week__range=(cohorts[0][0], cohorts[-1][0]), occurrences__gt=0)
+                .annotate(week=TruncWeek("day")).values_list("cohort_week", "week")
+                .annotate(users=Count("user_id", distinct=True)))
+        for cohort_week, week, users in rows:
+            offset = (week - cohort_week).days // 7
+            if 0 <= offset < weeks:
+                active[cohort_week][offset] = users
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "weeks": weeks,
+        "cohorts": [{
+            "week_start": week_start.isoformat(),
+            "users": size,
+            "active": [active[week_start].get(n, 0) for n in range(weeks)],
+            "retention": [round(active[week_start].get(n, 0) / size, 4) if size else 0.0 for n in range(weeks)],
+        } for week_start, size in cohorts],
+    }
+
+
+def status():
+    state = LoadState.objects.filter(name=etl.STATE).first()
+    return {
+        "watermark": state.watermark.isoformat() if state and state.watermark else None,
+        "loaded_at": state.loaded_at.isoformat() if state and state.loaded_at else None,
+        "rows_loaded": state.rows_loaded if state else 0,
+        "facts": FactHabitDay.objects.count(),
+        "cohorts": DimCohort.objects.count(),
+    }
@@ -0,0 +1,7 @@
+from celery import shared_task
+from . import etl
+
+
+@shared_task
+def load_warehouse_task(full=False):
+    return etl.load(full=full)
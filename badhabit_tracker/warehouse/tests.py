@@ -0,0 +1,143 @@
+from datetime import timedelta
+from unittest import mock, skipIf
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from habits import badges
+from habits.models import Habit, HabitLog
+from habits.seeding import seed_user
+from habits.utils import today_utc_date, start_of_week
+from . import etl
+from .models import DimCohort, FactHabitDay, LoadState
+
+
+class EtlTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        cls.user = seed_user("etl", 2, 20)
+        cls.habit = Habit.objects.filter(user=cls.user).order_by("id").first()
+        # seeded rows predate the first load by more than the overlap the next load re-reads
+        yesterday = timezone.now() - timedelta(days=1)
+        HabitLog.objects.update(updated_at=yesterday)
+        Habit.objects.update(updated_at=yesterday)
+        get_user_model().objects.update(date_joined=yesterday)
+
+    def test_full_then_incremental(self):
+        stats = etl.load()
+        self.assertEqual(stats["mode"], "full")
+        self.assertEqual(stats["facts"], HabitLog.objects.count())
+        signup_week = start_of_week((timezone.now() - timedelta(days=1)).date())
+        self.assertEqual(DimCohort.objects.get(week_start=signup_week).users, 1)
+
+        today = today_utc_date()
+        log = HabitLog.objects.get(habit=self.habit, log_date=today)
+        log.occurrences = 42
+        log.save()
+        HabitLog.objects.create(habit=self.habit, log_date=today - timedelta(days=100), occurrences=3)
+        self.habit.category = "health"
+        self.habit.save()
+        get_user_model().objects.create_user("newcomer")
+
+        stats = etl.load()
+        # habit edits are carried over before the changed logs load, to all 20 facts the habit had
+        self.assertEqual((stats["mode"], stats["facts"], stats["recategorised"]), ("incremental", 2, 20))
+        self.assertEqual(FactHabitDay.objects.get(habit_id=self.habit.id, day=today).occurrences, 42)
+        self.assertEqual(FactHabitDay.objects.filter(habit_id=self.habit.id, category="health").count(), 21)
+        self.assertEqual(sum(DimCohort.objects.values_list("users", flat=True)), 2)
+        self.assertEqual(FactHabitDay.objects.count(), HabitLog.objects.count())
+
+    def test_batches_commit_and_move_the_watermark(self):
+        upsert = etl._upsert_facts
+        calls = []
+
+        def fail_on_third_batch(rows):
+            calls.append(len(rows))
+            if len(calls) == 3:
+                raise RuntimeError("worker killed")
+            upsert(rows)
+        with mock.patch.object(etl, "BATCH_SIZE", 15), mock.patch.object(etl, "_upsert_facts", fail_on_third_batch):
+            with self.assertRaises(RuntimeError):
+                etl.load(full=True)
+        self.assertEqual(FactHabitDay.objects.count(), 30)
+        first_30 = HabitLog.objects.order_by("updated_at", "id")[29]
+        self.assertEqual(LoadState.objects.get(name=etl.STATE).watermark, first_30.updated_at)
+
+        stats = etl.load()
+        self.assertEqual(stats["mode"], "incremental")
+        self.assertEqual(FactHabitDay.objects.count(), HabitLog.objects.count())
+        if connection.vendor == "sqlite":
+            since = timezone.now() - etl.OVERLAP
+            plan = HabitLog.objects.filter(updated_at__gt=since).order_by("updated_at", "id")[:15].explain()
+            self.assertIn("habitlog_updated_idx", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+@skipIf(settings.DATABASES["replica"]["TEST"].get("MIRROR"), "the replica's test database mirrors default")
+@override_settings(DATABASE_READ_REPLICA="replica")
+class EtlReplicaTests(TestCase):
+    # "replica" is a second test database holding one log, in another category than default's copy
+    databases = {"default", "replica"}
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        user = seed_user("etl-replica", 1, 5)
+        habit = Habit.objects.get(user=user)
+        get_user_model().objects.using("replica").bulk_create([get_user_model()(id=user.id, username=user.username,
+                                                                                 date_joined=user.date_joined)])
+        Habit.objects.using("replica").bulk_create([Habit(id=habit.id, user_id=user.id, name="h", category="finance")])
+        HabitLog.objects.using("replica").bulk_create([HabitLog(habit_id=habit.id, user_id=user.id,
+                                                                log_date=today_utc_date(), occurrences=4)])
+
+    def test_source_rows_come_from_the_replica(self):
+        stats = etl.load(full=True)
+        self.assertEqual((stats["facts"], stats["users"]), (1, 1))
+        self.assertEqual(list(FactHabitDay.objects.values_list("category", "occurrences")), [("finance", 4)])
+
+
+class WarehouseApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        badges.reset_catalog()
+        seed_user("cohort", 2, 30)
+        cls.staff = get_user_model().objects.create_user("staff", is_staff=True)
+        etl.load()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_endpoints_read_only_warehouse_tables(self):
+        for name in ("warehouse-categories", "warehouse-cohorts", "warehouse-status"):
+            with self.subTest(name), CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+            self.assertFalse([q["sql"] for q in queries if "habits_" in q["sql"] or "auth_" in q["sql"]])
+
+    def test_payloads(self):
+        trends = self.client.get(reverse("warehouse-categories"), {"resolution": "month"}).data
+        total = sum(row["occurrences"] for row in trends["categories"]["other"])
+        self.assertEqual(total, sum(FactHabitDay.objects.values_list("occurrences", flat=True)))
+
+        cohorts = self.client.get(reverse("warehouse-cohorts"), {"weeks": 4}).data["cohorts"]
+        this_week = [c for c in cohorts if c["week_start"] == start_of_week(today_utc_date()).isoformat()]
+        # seeded history predates the signup, so only week 0 of the current cohort can be active
+        self.assertEqual(this_week[0]["users"], 2)
+        self.assertEqual(this_week[0]["active"], [1, 0, 0, 0])
+        self.assertEqual(this_week[0]["retention"][0], 0.5)
+
+    def test_staff_only_and_validation(self):
+        user = APIClient()
+        user.force_authenticate(get_user_model().objects.get(username="cohort"))
+        self.assertEqual(user.get(reverse("warehouse-status")).status_code, 403)
+        for params in ({"resolution": "hour"}, {"from": "2020-01-01"}, {"to": "later"}):
+            with self.subTest(params):
+                self.assertEqual(self.client.get(reverse("warehouse-categories"), params).status_code, 400)
+        self.assertEqual(self.client.get(reverse("warehouse-cohorts"), {"weeks": 0}).status_code, 400)
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import CategoryTrendsView, CohortRetentionView, WarehouseStatusView
+
+# mounted at /api/warehouse/; staff only
+urlpatterns = [
+    path("categories/", CategoryTrendsView.as_view(), name="warehouse-categories"),
+    path("cohorts/", CohortRetentionView.as_view(), name="warehouse-cohorts"),
+    path("status/", WarehouseStatusView.as_view(), name="warehouse-status"),
+]
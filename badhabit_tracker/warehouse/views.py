@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from habits.routing import ReplicaReadMixin
+from habits.utils import today_utc_date, start_of_week
+from . import queries
+
+MAX_RANGE_DAYS = 3 * 366
+MAX_RETENTION_WEEKS = 104
+
+
+def _date(params, name, default):
+    try:
+        return date.fromisoformat(params[name]) if params.get(name) else default
+    except ValueError:
+        raise ValidationError({name: ["Use YYYY-MM-DD."]})
+
+
+def _range(params, default_days):
+    end = _date(params, "to", today_utc_date())
+    start = _date(params, "from", end - timedelta(days=default_days - 1))
+    if start > end:
+        raise ValidationError({"from": ["Must not be after 'to'."]})
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValidationError({"from": [f"At most {MAX_RANGE_DAYS} days per request."]})
+    return start, end
+
+
+class CategoryTrendsView(ReplicaReadMixin, generics.GenericAPIView):
+    """?from=&to=&resolution=day|week|month - platform-wide activity per habit category."""
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        resolution = request.query_params.get("resolution", "week")
+        if resolution not in queries.RESOLUTIONS:
+            raise ValidationError({"resolution": [f"Choose one of {', '.join(queries.RESOLUTIONS)}."]})
+        start, end = _range(request.query_params, 12 * 7)
+        return Response(queries.category_trends(start, end, resolution))
+
+
+class CohortRetentionView(ReplicaReadMixin, generics.GenericAPIView):
+    """?from=&to= (signup weeks) &weeks=N - weekly retention of signup-week cohorts."""
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        start, end = _range(request.query_params, 12 * 7)
+        try:
+            weeks = int(request.query_params.get("weeks", 12))
+        except ValueError:
+            raise ValidationError({"weeks": ["Pass a number of weeks."]})
+        if not 1 <= weeks <= MAX_RETENTION_WEEKS:
+            raise ValidationError({"weeks": [f"Between 1 and {MAX_RETENTION_WEEKS}."]})
+        return Response(queries.cohort_retention(start_of_week(start), end, weeks))
+
+
+class WarehouseStatusView(ReplicaReadMixin, generics.GenericAPIView):
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        return Response(queries.status())